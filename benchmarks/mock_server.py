@@ -0,0 +1,249 @@
+# pyCosmicWrap is a Cosmos API/RPC python Wrapper
+# ChihuahuaChain - https://github.com/ChihuahuaChain/pyCosmicWrap
+#
+# License GNU General Public License v3.0
+#
+# https://choosealicense.com/licenses/gpl-3.0/
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# local Cosmos LCD and Tendermint RPC serving synthetic fixtures, or recorded ones from a directory,
+# with configurable latency and error injection. both APIs are served on the same port.
+#
+#     python benchmarks/mock_server.py --port 26657 --latency 0.01 --error-rate 0.02
+
+import argparse
+import base64
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_PAGE_LIMIT = 100
+GENESIS_CHUNK_SIZE = 16 * 1024 * 1024
+
+
+# synthetic chain state, everything is derived from the entry index so that pages are built on demand.
+class Fixtures:
+    def __init__(self, validators: int = 100, delegations: int = 100000, balances: int = 20, txs: int = 10,
+                 genesis_accounts: int = 100000, height: int = 1000000, directory=None):
+        self.validators = validators
+        self.delegations = delegations
+        self.balances = balances
+        self.txs = txs
+        self.genesis_accounts = genesis_accounts
+        self.height = height
+        self.directory = directory
+        self.genesis_body = None
+        self.lock = threading.Lock()
+
+    def validator(self, index: int):
+        tokens = str(10 ** 9 * (self.validators - index))
+        return {'operator_address': 'chihuahuavaloper1mock%06d' % index, 'status': 'BOND_STATUS_BONDED',
+                'tokens': tokens, 'delegator_shares': tokens + '.000000000000000000', 'jailed': False,
+                'description': {'moniker': 'validator-%d' % index},
+                'commission': {'commission_rates': {'rate': '0.050000000000000000'}}}
+
+    def delegation(self, validator: str, index: int):
+        amount = str(1000000 + index)
+        return {'delegation': {'delegator_address': 'chihuahua1mock%08d' % index, 'validator_address': validator,
+                               'shares': amount + '.000000000000000000'},
+                'balance': {'denom': 'uhuahua', 'amount': amount}}
+
+    def balance(self, index: int):
+        return {'denom': 'uhuahua' if index == 0 else 'ibc/%064X' % index, 'amount': str(10 ** 6 + index)}
+
+    def block(self, height: int):
+        txs = [base64.b64encode(b'%d-%d' % (height, index) * 40).decode() for index in range(self.txs)]
+        return {'block_id': {'hash': '%064X' % height},
+                'block': {'header': {'chain_id': 'mock-1', 'height': str(height), 'time': '2023-01-01T00:00:00Z'},
+                          'data': {'txs': txs}, 'last_commit': {'height': str(height - 1), 'signatures': []}}}
+
+    def block_results(self, height: int):
+        event = {'type': 'transfer', 'attributes': [{'key': 'recipient', 'value': 'chihuahua1mock', 'index': True},
+                                                    {'key': 'amount', 'value': '1uhuahua', 'index': True}]}
+        return {'height': str(height), 'txs_results': [{'code': 0, 'gas_used': '50000', 'events': [event]}
+                                                      for _ in range(self.txs)],
+                'begin_block_events': [], 'end_block_events': []}
+
+    # the genesis document, built once as it is large.
+    def genesis(self):
+        with self.lock:
+            if self.genesis_body is None:
+                accounts = self.genesis_accounts
+                balances = [{'address': 'chihuahua1mock%08d' % index, 'coins': [self.balance(0)]}
+                            for index in range(accounts)]
+                document = {'genesis_time': '2023-01-01T00:00:00Z', 'chain_id': 'mock-1', 'initial_height': '1',
+                            'app_state': {'bank': {'balances': balances, 'supply': []},
+                                          'staking': {'validators': [self.validator(index)
+                                                                     for index in range(self.validators)]}}}
+                self.genesis_body = json.dumps(document).encode()
+            return self.genesis_body
+
+    # recorded response of a path, None when there is none.
+    def recorded(self, path: str):
+        if self.directory is None:
+            return None
+        file = os.path.join(self.directory, path.strip('/') + '.json')
+        if not os.path.isfile(file):
+            return None
+        with open(file, 'rb') as recorded:
+            return recorded.read()
+
+
+# page of count entries built by entry, answering the key, offset, limit and count_total parameters.
+def page(field: str, count: int, entry, query):
+    limit = int(query.get('pagination.limit', [DEFAULT_PAGE_LIMIT])[0])
+    if 'pagination.key' in query:
+        start = int(base64.b64decode(query['pagination.key'][0]))
+    else:
+        start = int(query.get('pagination.offset', [0])[0])
+    end = min(count, start + limit)
+    next_key = base64.b64encode(str(end).encode()).decode() if end < count else None
+    total = str(count) if query.get('pagination.count_total', ['false'])[0] == 'true' else '0'
+    return {field: [entry(index) for index in range(start, end)], 'pagination': {'next_key': next_key, 'total': total}}
+
+
+def rpc_response(result, request_id=-1):
+    return {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # headers and body are written apart, with Nagle every response would wait for a delayed ACK.
+    disable_nagle_algorithm = True
+    fixtures = None
+    latency = 0.0
+    jitter = 0.0
+    error_rate = 0.0
+    error_status = 503
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    # sleeps the injected latency and tells whether the request must fail.
+    def _inject(self):
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+        if self.error_rate and random.random() < self.error_rate:
+            self._send(self.error_status, b'{"code": 8, "message": "injected error"}', {'Retry-After': '0'})
+            return True
+        return False
+
+    def do_GET(self):
+        if self._inject():
+            return
+        url = urlparse(self.path)
+        recorded = self.fixtures.recorded(url.path)
+        if recorded is not None:
+            return self._send(200, recorded)
+        result = self.route(url.path, parse_qs(url.query))
+        if result is None:
+            return self._send(404, b'{"code": 5, "message": "not found"}')
+        self._send(200, result if isinstance(result, bytes) else json.dumps(result).encode())
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        if self._inject():
+            return
+        responses = [self.call(call) for call in (body if isinstance(body, list) else [body])]
+        self._send(200, json.dumps(responses if isinstance(body, list) else responses[0]).encode())
+
+    # answers a JSON-RPC call with the result of the matching GET route.
+    def call(self, call):
+        params = {name: [str(value)] for name, value in (call.get('params') or {}).items()}
+        result = self.route('/' + call['method'], params)
+        if not isinstance(result, dict):
+            return {'jsonrpc': '2.0', 'id': call.get('id'), 'error': {'code': -32601, 'message': 'Method not found'}}
+        return rpc_response(result['result'], call.get('id'))
+
+    def route(self, path: str, query):
+        fixtures = self.fixtures
+        height = int(query.get('height', [fixtures.height])[0])
+        if path == '/cosmos/staking/v1beta1/validators':
+            return page('validators', fixtures.validators, fixtures.validator, query)
+        if path.startswith('/cosmos/staking/v1beta1/validators/') and path.endswith('/delegations'):
+            validator = path.split('/')[-2]
+            return page('delegation_responses', fixtures.delegations,
+                        lambda index: fixtures.delegation(validator, index), query)
+        if path.startswith('/cosmos/bank/v1beta1/balances/'):
+            return page('balances', fixtures.balances, fixtures.balance, query)
+        if path == '/cosmos/base/tendermint/v1beta1/blocks/latest':
+            return fixtures.block(fixtures.height)
+        if path == '/block':
+            return rpc_response(fixtures.block(height))
+        if path == '/block_results':
+            return rpc_response(fixtures.block_results(height))
+        if path == '/status':
+            return rpc_response({'node_info': {'network': 'mock-1'},
+                                 'sync_info': {'latest_block_height': str(fixtures.height)}})
+        if path == '/genesis':
+            return b'{"jsonrpc": "2.0", "id": -1, "result": {"genesis": ' + fixtures.genesis() + b'}}'
+        if path == '/genesis_chunked':
+            body = fixtures.genesis()
+            total = (len(body) + GENESIS_CHUNK_SIZE - 1) // GENESIS_CHUNK_SIZE
+            chunk = int(query.get('chunk', [0])[0])
+            data = body[chunk * GENESIS_CHUNK_SIZE:(chunk + 1) * GENESIS_CHUNK_SIZE]
+            return rpc_response({'chunk': str(chunk), 'total': str(total), 'data': base64.b64encode(data).decode()})
+        return None
+
+
+# starts the server on a background thread and returns it with its url, port 0 picking a free one.
+def serve(fixtures: Fixtures, port: int = 0, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+          error_status: int = 503):
+    handler = type('MockHandler', (Handler,), {'fixtures': fixtures, 'latency': latency, 'jitter': jitter,
+                                               'error_rate': error_rate, 'error_status': error_status})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, 'http://127.0.0.1:%d' % server.server_address[1]
+
+
+def arguments(parser=None):
+    parser = parser or argparse.ArgumentParser(description='mock Cosmos LCD and Tendermint RPC')
+    parser.add_argument('--port', type=int, default=0)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='random seconds added on top of latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of requests failing')
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--validators', type=int, default=100)
+    parser.add_argument('--delegations', type=int, default=100000, help='delegations of every validator')
+    parser.add_argument('--balances', type=int, default=20, help='coins of every account')
+    parser.add_argument('--txs', type=int, default=10, help='transactions of every block')
+    parser.add_argument('--genesis-accounts', type=int, default=100000)
+    parser.add_argument('--fixtures', help='directory of recorded responses, served by path before synthetic ones')
+    return parser
+
+
+def fixtures_of(args):
+    return Fixtures(args.validators, args.delegations, args.balances, args.txs, args.genesis_accounts,
+                    directory=args.fixtures)
+
+
+if __name__ == '__main__':
+    args = arguments().parse_args()
+    server, url = serve(fixtures_of(args), args.port, args.latency, args.jitter, args.error_rate, args.error_status)
+    print('listening on ' + url, flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,247 @@
+# pyCosmicWrap is a Cosmos API/RPC python Wrapper
+# ChihuahuaChain - https://github.com/ChihuahuaChain/pyCosmicWrap
+#
+# License GNU General Public License v3.0
+#
+# https://choosealicense.com/licenses/gpl-3.0/
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# benchmark scenarios of pyCosmicWrap against a local mock_server, reporting the requests per second, the
+# p50 and p99 request latencies and the peak RSS of every scenario. every scenario runs in a fresh process
+# so that its peak memory is its own, and the checkout under src is measured rather than an installed copy.
+#
+#     python benchmarks/run.py                                     # every scenario
+#     python benchmarks/run.py delegators genesis --latency 0.02   # some of them, on a slower node
+#     python benchmarks/run.py --json results.json                 # keep the results
+#     python benchmarks/run.py --baseline results.json             # fail on regressions against them
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from mock_server import arguments  # noqa: E402
+from pycosmicwrap import CosmicWrap, Metrics  # noqa: E402
+
+VALIDATOR = 'chihuahuavaloper1mock000000'
+FIRST_HEIGHT = 1000
+
+# scenarios by name, each one is called with the client and the arguments and returns the number of
+# entries it read.
+SCENARIOS = {}
+
+
+def scenario(name: str):
+    def register(fn):
+        SCENARIOS[name] = fn
+        return fn
+
+    return register
+
+
+@scenario('delegators')
+def delegators(client, args):
+    return len(client.query_delegators(VALIDATOR))
+
+
+@scenario('delegators_parallel')
+def delegators_parallel(client, args):
+    return len(client.query_delegators(VALIDATOR, concurrency=args.concurrency))
+
+
+@scenario('blocks')
+def blocks(client, args):
+    for height in range(FIRST_HEIGHT, FIRST_HEIGHT + args.blocks):
+        client.query_block(height)
+    return args.blocks
+
+
+@scenario('blocks_batched')
+def blocks_batched(client, args):
+    return len(client.query_block_many(range(FIRST_HEIGHT, FIRST_HEIGHT + args.blocks),
+                                       concurrency=args.concurrency))
+
+
+@scenario('balances')
+def balances(client, args):
+    addresses = ['chihuahua1mock%08d' % index for index in range(args.addresses)]
+    return len(client.query_balances_many(addresses, concurrency=args.concurrency))
+
+
+@scenario('genesis')
+def genesis(client, args):
+    return len(client.query_genesis()['result']['genesis']['app_state']['bank']['balances'])
+
+
+@scenario('genesis_stream')
+def genesis_stream(client, args):
+    return sum(1 for _ in client.iter_genesis('app_state.bank.balances'))
+
+
+# peak resident memory of the process in bytes.
+def peak_rss():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+# value under which a share of the sorted values fall.
+def percentile(values, share: float):
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(share * len(values)))]
+
+
+# runs a scenario in this process and returns its measures.
+def measure(name: str, url: str, args):
+    latencies = []
+    statuses = []
+    metrics = Metrics()
+    metrics.add_hooks(after=lambda record: (latencies.append(record.elapsed), statuses.append(record.status)))
+    client = CosmicWrap(url, url, 'uhuahua', pool_size=args.concurrency, metrics=metrics)
+    baseline = peak_rss()
+    started = time.perf_counter()
+    entries = SCENARIOS[name](client, args)
+    seconds = time.perf_counter() - started
+    client.close()
+    latencies.sort()
+    return {'scenario': name, 'entries': entries, 'requests': len(statuses),
+            'errors': sum(1 for status in statuses if status != 200), 'seconds': seconds,
+            'rps': len(statuses) / seconds if seconds else None,
+            'p50_ms': percentile(latencies, 0.5) * 1000 if latencies else None,
+            'p99_ms': percentile(latencies, 0.99) * 1000 if latencies else None,
+            'peak_rss_mb': peak_rss() / 2 ** 20, 'rss_growth_mb': (peak_rss() - baseline) / 2 ** 20}
+
+
+# starts the mock server in its own process, so that its memory is not counted, and returns it with its url.
+def start_server(args):
+    command = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mock_server.py'),
+               '--latency', str(args.latency), '--jitter', str(args.jitter), '--error-rate', str(args.error_rate),
+               '--error-status', str(args.error_status), '--validators', str(args.validators),
+               '--delegations', str(args.delegations), '--balances', str(args.balances), '--txs', str(args.txs),
+               '--genesis-accounts', str(args.genesis_accounts)]
+    if args.fixtures:
+        command += ['--fixtures', args.fixtures]
+    server = subprocess.Popen(command, stdout=subprocess.PIPE, universal_newlines=True)
+    return server, server.stdout.readline().split()[-1]
+
+
+# runs a scenario in a fresh process and returns its measures, or its error when it failed.
+def run(name: str, url: str, argv):
+    child = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', name, '--url', url] + argv,
+                           stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    lines = child.stdout.splitlines()
+    if lines:
+        try:
+            return json.loads(lines[-1])
+        except ValueError:
+            pass
+    errors = child.stderr.strip().splitlines()
+    return {'scenario': name, 'error': errors[-1] if errors else 'exit status %d' % child.returncode}
+
+
+# an exception along with the ones it was raised from.
+def describe(error):
+    causes = []
+    while error is not None:
+        causes.append(repr(error))
+        error = error.__cause__ or error.__context__
+    return ' <- '.join(causes)
+
+
+def cell(value, digits=1):
+    return '-' if value is None else '%.*f' % (digits, value) if isinstance(value, float) else str(value)
+
+
+# prints the measures of the scenarios as a table, followed by the scenarios that failed.
+def report(results):
+    columns = ('scenario', 'entries', 'requests', 'errors', 'seconds', 'rps', 'p50_ms', 'p99_ms', 'peak_rss_mb')
+    rows = [columns] + [tuple(cell(result.get(column), 3 if column == 'seconds' else 1) for column in columns)
+                        for result in results if 'error' not in result]
+    widths = [max(len(row[index]) for row in rows) for index in range(len(columns))]
+    for row in rows:
+        print('  '.join(value.ljust(width) if index == 0 else value.rjust(width)
+                        for index, (value, width) in enumerate(zip(row, widths))))
+    for result in results:
+        if 'error' in result:
+            print('failed: %s: %s' % (result['scenario'], result['error']))
+
+
+# regressions of results against the ones of a previous run, beyond tolerance as a share.
+def regressions(results, baseline, tolerance: float):
+    previous = {result['scenario']: result for result in baseline}
+    found = []
+    for result in results:
+        before = previous.get(result['scenario'])
+        if before is None or 'error' in before:
+            continue
+        if 'error' in result:
+            found.append('%s: failed, %s' % (result['scenario'], result['error']))
+            continue
+        if before.get('rps') and result.get('rps') is not None and result['rps'] < before['rps'] * (1 - tolerance):
+            found.append('%s: rps %.1f -> %.1f' % (result['scenario'], before['rps'], result['rps']))
+        for measure_name in ('p99_ms', 'peak_rss_mb'):
+            if before.get(measure_name) and result.get(measure_name) is not None and \
+                    result[measure_name] > before[measure_name] * (1 + tolerance):
+                found.append('%s: %s %.1f -> %.1f' % (result['scenario'], measure_name, before[measure_name],
+                                                      result[measure_name]))
+    return found
+
+
+def main():
+    parser = arguments(argparse.ArgumentParser(description='pyCosmicWrap benchmarks against a local mock node'))
+    parser.add_argument('scenarios', nargs='*', help='scenarios to run, all of them by default: ' +
+                                                     ', '.join(SCENARIOS))
+    parser.add_argument('--concurrency', type=int, default=8, help='threads of the parallel scenarios')
+    parser.add_argument('--blocks', type=int, default=500, help='blocks fetched by the block scenarios')
+    parser.add_argument('--addresses', type=int, default=200, help='addresses of the balances scenario')
+    parser.add_argument('--json', help='file the results are written to')
+    parser.add_argument('--baseline', help='results of a previous run to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='share a measure may degrade by')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--url', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        try:
+            print(json.dumps(measure(args.child, args.url, args)))
+        except Exception as error:
+            print(json.dumps({'scenario': args.child, 'error': describe(error)}))
+            return 1
+        return 0
+    names = args.scenarios or list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error('unknown scenarios: ' + ', '.join(unknown))
+    argv = ['--concurrency', str(args.concurrency), '--blocks', str(args.blocks), '--addresses', str(args.addresses)]
+    server, url = start_server(args)
+    try:
+        results = [run(name, url, argv) for name in names]
+    finally:
+        server.terminate()
+    report(results)
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            found = regressions(results, json.load(file), args.tolerance)
+        for regression in found:
+            print('regression: ' + regression)
+        if found:
+            return 1
+    return 1 if any('error' in result for result in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1 +1,7 @@
 from .wrapper import CosmicWrap
+from .async_wrapper import AsyncCosmicWrap
+from .batch import BatchItem, BatchResult
+from .cache import PERMANENT, ResponseCache
+from .metrics import Metrics
+from .scheduler import RequestFailed, Scheduler
+from .store import BlockStore
@@ -0,0 +1,718 @@
+# pyCosmicWrap is a Cosmos API/RPC python Wrapper
+# ChihuahuaChain - https://github.com/ChihuahuaChain/pyCosmicWrap
+#
+# License GNU General Public License v3.0
+#
+# https://choosealicense.com/licenses/gpl-3.0/
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import asyncio
+import base64
+import functools
+import time
+
+from .batch import DEFAULT_BATCH_CONCURRENCY, BatchItem, BatchResult, batch_args
+from .cache import PERMANENT, ResponseCache, cache_key, cacheable
+from .concurrency import async_bounded_map
+from .decoding import loads
+from .endpoints import LCD_STATUS, RPC_STATUS, async_host_transport
+from .jsonrpc import DEFAULT_CHUNK_SIZE, batch_body, chunks, height_call, match_responses
+from .metrics import Metrics, collect_scheduler, instrument, transport_collector
+from .models import FIELD_MODELS
+from .pagination import AsyncPageIterator
+from .pinning import PINNED_HEIGHT, HeightPin, height_headers
+from .scanner import AsyncBlockScanner
+from .scheduler import AsyncScheduler, RequestFailed, retry_after
+from .snapshot import async_build_snapshot
+from .streaming import (DEFAULT_STREAM_CHUNK, async_iter_json_items, async_iter_json_raw, async_write_stream,
+                        split_path)
+from .subscription import NEW_BLOCK, AsyncSubscription
+from .tracker import AsyncStateTracker
+from .wrapper import PROPOSAL_STATUSES
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# failures to reach the host, the GETs failing with them are retried.
+NETWORK_ERRORS = (aiohttp.ClientConnectionError, asyncio.TimeoutError) if aiohttp is not None else ()
+
+
+# adds the time spent opening a connection to the RequestRecord of the request, if any.
+async def _connection_started(session, context, params):
+    context.connection_started = time.perf_counter()
+
+
+async def _connection_created(session, context, params):
+    if context.trace_request_ctx is not None:
+        context.trace_request_ctx.connect += time.perf_counter() - context.connection_started
+
+
+# one aiohttp session shared by every host of an AsyncCosmicWrap.
+# the session and the semaphore are created on first use so the pool can be built
+# outside of a running event loop, concurrency bounds the requests in flight.
+# with trace the time spent opening connections is measured.
+class AsyncPool:
+    def __init__(self, pool_size: int = 100, concurrency: int = 100, keep_alive: bool = True, gzip: bool = True,
+                 trace: bool = False):
+        if aiohttp is None:
+            raise ImportError('AsyncCosmicWrap requires aiohttp, install it with pip install pycosmicwrap[async]')
+        self.pool_size = pool_size
+        self.concurrency = concurrency
+        self.keep_alive = keep_alive
+        self.gzip = gzip
+        self.trace = trace
+        self.session = None
+        self.semaphore = None
+
+    def _open(self):
+        connector = aiohttp.TCPConnector(limit=self.pool_size, force_close=not self.keep_alive)
+        headers = {'Accept-Encoding': 'gzip, deflate' if self.gzip else 'identity'}
+        trace_configs = []
+        if self.trace:
+            trace_config = aiohttp.TraceConfig()
+            trace_config.on_connection_create_start.append(_connection_started)
+            trace_config.on_connection_create_end.append(_connection_created)
+            trace_configs.append(trace_config)
+        self.session = aiohttp.ClientSession(connector=connector, headers=headers, trace_configs=trace_configs)
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+
+    # sends a request and returns the status, the headers and the raw body of the response.
+    # record is the RequestRecord the wait and transfer times are set on, if any.
+    async def request(self, method: str, url: str, timeout=60, record=None, **kwargs):
+        if self.session is None:
+            self._open()
+        if isinstance(timeout, tuple):
+            timeout = aiohttp.ClientTimeout(sock_connect=timeout[0], sock_read=timeout[1])
+        else:
+            timeout = aiohttp.ClientTimeout(total=timeout)
+        async with self.semaphore:
+            started = time.perf_counter()
+            async with self.session.request(method, url, timeout=timeout, trace_request_ctx=record,
+                                            **kwargs) as response:
+                received = time.perf_counter()
+                body = await response.read()
+        if record is not None:
+            record.wait = received - started - record.connect
+            record.transfer = time.perf_counter() - received
+        return response.status, response.headers, body
+
+    # sends a GET and yields the raw response body in chunks of up to chunk_size bytes as they arrive,
+    # timeout bounds every read, not the whole download. RequestFailed is raised on a status other than 2xx.
+    async def stream(self, url: str, params=None, timeout=60, chunk_size: int = DEFAULT_STREAM_CHUNK):
+        if self.session is None:
+            self._open()
+        if not isinstance(timeout, tuple):
+            timeout = (timeout, timeout)
+        timeout = aiohttp.ClientTimeout(sock_connect=timeout[0], sock_read=timeout[1])
+        async with self.semaphore:
+            async with self.session.get(url, params=params, timeout=timeout) as response:
+                if not 200 <= response.status < 300:
+                    raise RequestFailed(response.status, retry_after(response.headers))
+                async for chunk in response.content.iter_chunked(chunk_size):
+                    yield chunk
+
+    # closes the session and every pooled connection.
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+# non-blocking counterpart of Transport, bound to a single host of a shared AsyncPool.
+class AsyncTransport:
+    network_errors = NETWORK_ERRORS
+
+    def __init__(self, base_url: str, pool: AsyncPool, timeout=60, scheduler_options=None, metrics=None):
+        self.base_url = base_url.rstrip('/')
+        self.pool = pool
+        self.timeout = timeout
+        self.scheduler = AsyncScheduler(**(scheduler_options or {}))
+        self.metrics = metrics
+
+    async def _send(self, method: str, path: str, retry: bool, **kwargs):
+        if self.metrics is not None:
+            send = functools.partial(self._measured, method, path, kwargs)
+        else:
+            send = functools.partial(self.pool.request, method, self.base_url + path, **kwargs)
+        return await self.scheduler.call(send, NETWORK_ERRORS, retry)
+
+    async def _measured(self, method: str, path: str, kwargs):
+        record = self.metrics.start(self.base_url, method, path, kwargs.get('params'))
+        try:
+            status, headers, body = await self.pool.request(method, self.base_url + path, record=record, **kwargs)
+        except Exception as error:
+            record.error = error
+            self.metrics.finish(record)
+            raise
+        record.status = status
+        record.size = len(body)
+        self.metrics.finish(record)
+        return status, headers, body
+
+    def collect(self, metrics, role: str):
+        collect_scheduler(metrics, role, self.base_url, self.scheduler)
+        metrics.gauge('pool_size', (('role', role), ('host', self.base_url)), self.pool.pool_size)
+
+    # sends a GET to the host and returns the raw response body.
+    async def get(self, path: str, params=None, timeout=None, headers=None):
+        timeout = self.timeout if timeout is None else timeout
+        return await self._send('GET', path, True, params=params, headers=headers, timeout=timeout)
+
+    # sends a POST with a JSON body to the host and returns the raw response body, it is never retried.
+    async def post(self, path: str, data, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        headers = {'Content-Type': 'application/json'}
+        return await self._send('POST', path, False, data=data, headers=headers, timeout=timeout)
+
+    # sends a GET to the host and yields the raw response body in chunks as they arrive.
+    async def stream(self, path: str, params=None, timeout=None, chunk_size: int = DEFAULT_STREAM_CHUNK):
+        timeout = self.timeout if timeout is None else timeout
+        await self.scheduler.throttle()
+        async for chunk in self.pool.stream(self.base_url + path, params=params, timeout=timeout,
+                                            chunk_size=chunk_size):
+            yield chunk
+
+    # the connections belong to the shared pool, which is closed by the client.
+    async def close(self):
+        pass
+
+
+class AsyncCosmicWrap:
+    # mirrors CosmicWrap with coroutines, the LCD and the RPC share one connection pool and at most
+    # concurrency requests are in flight at once. transport is called once per url with the pool.
+    # lcd and rpc are a url or a list of urls spread by an AsyncEndpointPool configured with endpoint_options.
+    # cache is an optional ResponseCache, or True for one with the default policies, and store an optional
+    # BlockStore keeping blocks, block results and transactions on disk across runs.
+    # with models the entries of balances, validators, delegations, votes and unbondings are returned as
+    # the compact objects of pycosmicwrap.models instead of dicts.
+    # scheduler_options configure the AsyncScheduler pacing and retrying the requests of every url.
+    # metrics is an optional Metrics, or True for a new one, measuring every request.
+    def __init__(self, lcd, rpc, denom: str, timeout=60, pool_size: int = 100, concurrency: int = 100,
+                 keep_alive: bool = True, gzip: bool = True, transport=AsyncTransport, cache=None,
+                 store=None, endpoint_options=None, models: bool = False, scheduler_options=None, metrics=None):
+        self.lcd = lcd
+        self.rpc = rpc
+        self.denom = denom
+        self.cache = ResponseCache() if cache is True else cache
+        self.store = store
+        self.models = models
+        self.metrics = Metrics() if metrics is True else metrics
+        self._loads = loads if self.metrics is None else self.metrics.loads
+        self.pool = AsyncPool(pool_size=pool_size, concurrency=concurrency, keep_alive=keep_alive, gzip=gzip,
+                              trace=self.metrics is not None)
+        options = dict(timeout=timeout)
+        if scheduler_options is not None:
+            options['scheduler_options'] = scheduler_options
+        if self.metrics is not None:
+            options['metrics'] = self.metrics
+        self.lcd_transport = async_host_transport(lcd, transport, self.pool, LCD_STATUS, endpoint_options, **options)
+        self.rpc_transport = async_host_transport(rpc, transport, self.pool, RPC_STATUS, endpoint_options, **options)
+        if self.metrics is not None:
+            self.metrics.collectors.append(transport_collector(('lcd', self.lcd_transport),
+                                                               ('rpc', self.rpc_transport)))
+            instrument(self)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    # closes the shared connection pool.
+    async def close(self):
+        await self.lcd_transport.close()
+        await self.rpc_transport.close()
+        await self.pool.close()
+
+    # compares the latest heights of the endpoints of each host given as a list of urls, leaving aside
+    # the lagging ones, and returns the height of every endpoint by host.
+    async def check_endpoints(self):
+        return {host: await transport.check_heights() for host, transport in
+                (('lcd', self.lcd_transport), ('rpc', self.rpc_transport)) if hasattr(transport, 'check_heights')}
+
+    # sends a GET to the LCD and decodes the JSON body, pinned to height or else to the height of at_height.
+    async def _lcd_get(self, path, params=None, timeout=None, height=None):
+        height = PINNED_HEIGHT.get() if height is None else height
+        return await self._get(self.lcd, self.lcd_transport, path, params, timeout, height)
+
+    # sends a GET to the RPC and decodes the JSON body.
+    async def _rpc_get(self, path, params=None, timeout=None):
+        return await self._get(self.rpc, self.rpc_transport, path, params, timeout)
+
+    # serves the request from the cache when its path has a policy, then from the store when the path
+    # is a stored record, before asking the node. successful responses are kept in both, the ones pinned
+    # to a height for good as the state of a past height never changes.
+    async def _get(self, host, transport, path, params, timeout, height=None):
+        ttl = None if self.cache is None else PERMANENT if height is not None else self.cache.policy(path)
+        record = self.store.locate(path) if self.store is not None and not params else None
+        if ttl is None and record is None:
+            return self._loads(await self._fetch(transport, path, params, timeout, height))
+        key = cache_key(host, path, params, height)
+        body = self.cache.get(key) if ttl is not None else None
+        if body is None and record is not None:
+            body = self.store.get(*record)
+            if body is not None and ttl is not None:
+                self.cache.put(key, body, ttl)
+        if body is not None:
+            return self._loads(body)
+        body = await self._fetch(transport, path, params, timeout, height)
+        result = self._loads(body)
+        if cacheable(result):
+            if ttl is not None:
+                self.cache.put(key, body, ttl)
+            if record is not None:
+                self.store.put(record[0], record[1], body, result)
+        return result
+
+    # the headers are only passed when pinned so that custom transports without them keep working.
+    @staticmethod
+    async def _fetch(transport, path, params, timeout, height):
+        if height is None:
+            return await transport.get(path, params, timeout)
+        return await transport.get(path, params, timeout, height_headers(height))
+
+    # lazily walks a paginated LCD endpoint, yielding the entries listed under field.
+    # the pages are read at the height pinned when it is created, wherever it is consumed.
+    def _paginate(self, path, field, params=None, limit=None, key=None, concurrency=None, ordered=True,
+                  timeout=None):
+        model = FIELD_MODELS.get(field) if self.models else None
+        get = functools.partial(self._lcd_get, timeout=timeout, height=PINNED_HEIGHT.get())
+        if self.metrics is not None:
+            get = self.metrics.paged(get)
+        return AsyncPageIterator(get, path, field, params, limit, key, concurrency, ordered, model)
+
+    # runs method once per item of args with at most concurrency calls in flight and returns a BatchResult
+    # keyed by item, method is the name of a query or any coroutine function and an item is a single
+    # argument or a tuple of arguments.
+    async def batch(self, method, args, concurrency=DEFAULT_BATCH_CONCURRENCY):
+        return BatchResult([item async for item in self.iter_batch(method, args, concurrency)])
+
+    # same as batch, yielding a BatchItem per item as soon as its call completes.
+    async def iter_batch(self, method, args, concurrency=DEFAULT_BATCH_CONCURRENCY, ordered=False):
+        method = getattr(self, method) if isinstance(method, str) else method
+        async for item, task in async_bounded_map(lambda item: method(*batch_args(item)), args, concurrency,
+                                                  ordered=ordered):
+            yield BatchItem.from_future(item, task)
+
+    # queries the balance of all coins for a single account.
+    async def query_balances(self, address: str, concurrency=None, timeout=None):
+        return [entry async for entry in self.iter_balances(address, concurrency=concurrency, timeout=timeout)]
+
+    # iterates over the balance of all coins for a single account page by page.
+    def iter_balances(self, address: str, limit=None, key=None, concurrency=None, ordered=True, timeout=None):
+        endpoint = '/cosmos/bank/v1beta1/balances/'
+        return self._paginate(endpoint + address, 'balances',
+                              limit=limit, key=key, concurrency=concurrency, ordered=ordered, timeout=timeout)
+
+    # queries the balances of many addresses concurrently, returning a BatchResult keyed by address.
+    async def query_balances_many(self, addresses, concurrency=DEFAULT_BATCH_CONCURRENCY, timeout=None):
+        return await self.batch(functools.partial(self.query_balances, timeout=timeout), addresses, concurrency)
+
+    # queries the balance of a given denom for a single account.
+    async def query_balances_by_denom(self, address, denom, timeout=None):
+        endpoint = '/cosmos/bank/v1beta1/balances/'
+        return await self._lcd_get(endpoint + address + '/by_denom?denom=' + denom, timeout=timeout)
+
+    # queries the total supply of all coins.
+    async def query_supply(self, timeout=None):
+        endpoint = '/cosmos/bank/v1beta1/supply'
+        return await self._lcd_get(endpoint, timeout=timeout)
+
+    # queries the total supply of a given denom.
+    async def query_supply_by_denom(self, denom, timeout=None):
+        denom = self.denom if denom is None else denom
+        endpoint = '/cosmos/bank/v1beta1/supply/'
+        return await self._lcd_get(endpoint + denom, timeout=timeout)
+
+    # queries the community pool coins.
+    async def query_community_pool(self, timeout=None):
+        endpoint = '/cosmos/distribution/v1beta1/community_pool'
+        return await self._lcd_get(endpoint, timeout=timeout)
+
+    # queries the total rewards accrued by every validator.
+    async def query_rewards(self, address, timeout=None):
+        endpoint = '/cosmos/distribution/v1beta1/delegators/'
+        return await self._lcd_get(endpoint + address + '/rewards', timeout=timeout)
+
+    # queries the rewards of many addresses concurrently, returning a BatchResult keyed by address.
+    async def query_rewards_many(self, addresses, concurrency=DEFAULT_BATCH_CONCURRENCY, timeout=None):
+        return await self.batch(functools.partial(self.query_rewards, timeout=timeout), addresses, concurrency)
+
+    # queries the total rewards accrued by a given validator.
+    async def query_rewards_by_validator(self, address, validator, timeout=None):
+        endpoint = '/cosmos/distribution/v1beta1/delegators/'
+        return await self._lcd_get(endpoint + address + '/rewards/' + validator, timeout=timeout)
+
+    # queries the validators of a delegator.
+    async def query_delegator_validators(self, address, timeout=None):
+        endpoint = '/cosmos/distribution/v1beta1/delegators/'
+        return await self._lcd_get(endpoint + address + '/validators', timeout=timeout)
+
+    # queries withdraw address of a delegator.
+    async def query_withdraw_address(self, address, timeout=None):
+        endpoint = '/cosmos/distribution/v1beta1/delegators/'
+        return await self._lcd_get(endpoint + address + '/withdraw_address', timeout=timeout)
+
+    # queries params of the distribution module.
+    async def query_distribution_params(self, timeout=None):
+        endpoint = '/cosmos/distribution/v1beta1/params'
+        return await self._lcd_get(endpoint, timeout=timeout)
+
+    # queries accumulated commission for a validator.
+    async def query_commission(self, validator, timeout=None):
+        endpoint = '/cosmos/distribution/v1beta1/validators/'
+        return await self._lcd_get(endpoint + validator + '/commission', timeout=timeout)
+
+    # queries accumulated rewards for a validator.
+    async def query_outstanding_rewards(self, address, timeout=None):
+        endpoint = '/cosmos/distribution/v1beta1/validators/'
+        return await self._lcd_get(endpoint + address + '/outstanding_rewards', timeout=timeout)
+
+    # queries all proposals
+    async def query_proposals(self, status=None, concurrency=None, timeout=None):
+        return [entry async for entry in self.iter_proposals(status, concurrency=concurrency, timeout=timeout)]
+
+    # iterates over all proposals page by page, optionally filtered by status
+    def iter_proposals(self, status=None, limit=None, key=None, concurrency=None, ordered=True, timeout=None):
+        endpoint = '/cosmos/gov/v1beta1/proposals'
+        params = {'proposalStatus': PROPOSAL_STATUSES[status]} if status in PROPOSAL_STATUSES else None
+        return self._paginate(endpoint, 'proposals', params,
+                              limit=limit, key=key, concurrency=concurrency, ordered=ordered, timeout=timeout)
+
+    # queries a proposal by a given id
+    async def query_proposals_by_id(self, proposal_id, timeout=None):
+        endpoint = '/cosmos/gov/v1beta1/proposals/'
+        return await self._lcd_get(endpoint + str(proposal_id), timeout=timeout)
+
+    # queries the tally of a proposal by a given id
+    async def query_tally(self, proposal_id, timeout=None):
+        endpoint = '/cosmos/gov/v1beta1/proposals/'
+        return await self._lcd_get(endpoint + str(proposal_id) + '/tally', timeout=timeout)
+
+    # queries the votes of a proposal by a given id
+    async def query_votes(self, proposal_id, concurrency=None, timeout=None):
+        return [entry async for entry in self.iter_votes(proposal_id, concurrency=concurrency, timeout=timeout)]
+
+    # iterates over the votes of a proposal by a given id page by page.
+    def iter_votes(self, proposal_id, limit=None, key=None, concurrency=None, ordered=True, timeout=None):
+        endpoint = '/cosmos/gov/v1beta1/proposals/'
+        return self._paginate(endpoint + str(proposal_id) + '/votes', 'votes',
+                              limit=limit, key=key, concurrency=concurrency, ordered=ordered, timeout=timeout)
+
+    # queries a voter of a given proposal.
+    async def query_votes_by_address(self, proposal_id, address, timeout=None):
+        endpoint = '/cosmos/gov/v1beta1/proposals/'
+        return await self._lcd_get(endpoint + str(proposal_id) + '/votes/' + address, timeout=timeout)
+
+    # queries the slashing parameters
+    async def query_slashing_params(self, timeout=None):
+        endpoint = '/cosmos/slashing/v1beta1/params'
+        return await self._lcd_get(endpoint, timeout=timeout)
+
+    # queries delegations of a given address
+    async def query_delegations_by_address(self, address, concurrency=None, timeout=None):
+        return [entry async for entry in self.iter_delegations_by_address(address, concurrency=concurrency,
+                                                                          timeout=timeout)]
+
+    # iterates over delegations of a given address page by page.
+    def iter_delegations_by_address(self, address, limit=None, key=None, concurrency=None, ordered=True, timeout=None):
+        endpoint = '/cosmos/staking/v1beta1/delegations/'
+        return self._paginate(endpoint + address, 'delegation_responses',
+                              limit=limit, key=key, concurrency=concurrency, ordered=ordered, timeout=timeout)
+
+    # queries the delegations of many addresses concurrently, returning a BatchResult keyed by address.
+    async def query_delegations_by_address_many(self, addresses, concurrency=DEFAULT_BATCH_CONCURRENCY, timeout=None):
+        return await self.batch(functools.partial(self.query_delegations_by_address, timeout=timeout),
+                                addresses, concurrency)
+
+    # queries redelegations by a given address
+    async def query_redelegation_by_address(self, address, concurrency=None, timeout=None):
+        return [entry async for entry in self.iter_redelegation_by_address(address, concurrency=concurrency,
+                                                                           timeout=timeout)]
+
+    # iterates over redelegations by a given address page by page.
+    def iter_redelegation_by_address(self, address, limit=None, key=None, concurrency=None, ordered=True, timeout=None):
+        endpoint = '/cosmos/staking/v1beta1/delegators/'
+        return self._paginate(endpoint + address + '/redelegations', 'redelegation_responses',
+                              limit=limit, key=key, concurrency=concurrency, ordered=ordered, timeout=timeout)
+
+    # queries unbondings by a given address
+    async def query_unbonding_by_address(self, address, concurrency=None, timeout=None):
+        return [entry async for entry in self.iter_unbonding_by_address(address, concurrency=concurrency,
+                                                                        timeout=timeout)]
+
+    # iterates over unbondings by a given address page by page.
+    def iter_unbonding_by_address(self, address, limit=None, key=None, concurrency=None, ordered=True, timeout=None):
+        endpoint = '/cosmos/staking/v1beta1/delegators/'
+        return self._paginate(endpoint + address + '/unbonding_delegations', 'unbonding_responses',
+                              limit=limit, key=key, concurrency=concurrency, ordered=ordered, timeout=timeout)
+
+    # queries the unbondings of many addresses concurrently, returning a BatchResult keyed by address.
+    async def query_unbonding_by_address_many(self, addresses, concurrency=DEFAULT_BATCH_CONCURRENCY, timeout=None):
+        return await self.batch(functools.partial(self.query_unbonding_by_address, timeout=timeout),
+                                addresses, concurrency)
+
+    # queries delegator data
+    async def query_delegator_data(self, address, concurrency=None, timeout=None):
+        return [entry async for entry in self.iter_delegator_data(address, concurrency=concurrency, timeout=timeout)]
+
+    # iterates over delegator data page by page.
+    def iter_delegator_data(self, address, limit=None, key=None, concurrency=None, ordered=True, timeout=None):
+        endpoint = '/cosmos/staking/v1beta1/delegators/'
+        return self._paginate(endpoint + address + '/validators', 'validators',
+                              limit=limit, key=key, concurrency=concurrency, ordered=ordered, timeout=timeout)
+
+    # queries delegator data of a given address on a given validator
+    async def query_delegator_data_by_validator(self, address, validator, timeout=None):
+        endpoint = '/cosmos/staking/v1beta1/delegators/'
+        return await self._lcd_get(endpoint + address + '/validators/' + validator, timeout=timeout)
+
+    # queries staking parameters
+    async def query_staking_params(self, timeout=None):
+        endpoint = '/cosmos/staking/v1beta1/params'
+        return await self._lcd_get(endpoint, timeout=timeout)
+
+    # queries staking pool
+    async def query_staking_pool(self, timeout=None):
+        endpoint = '/cosmos/staking/v1beta1/pool'
+        return await self._lcd_get(endpoint, timeout=timeout)
+
+    # queries all the validators
+    async def query_all_validators(self, concurrency=None, timeout=None):
+        return [entry async for entry in self.iter_all_validators(concurrency=concurrency, timeout=timeout)]
+
+    # iterates over all the validators page by page.
+    def iter_all_validators(self, limit=None, key=None, concurrency=None, ordered=True, timeout=None):
+        endpoint = '/cosmos/staking/v1beta1/validators'
+        return self._paginate(endpoint, 'validators',
+                              limit=limit, key=key, concurrency=concurrency, ordered=ordered, timeout=timeout)
+
+    # queries a validator by a given address
+    async def query_validator_by_address(self, address, timeout=None):
+        endpoint = '/cosmos/staking/v1beta1/validators/'
+        return await self._lcd_get(endpoint + address, timeout=timeout)
+
+    # queries delegators of a given validator
+    async def query_delegators(self, validator, concurrency=None, timeout=None):
+        return [entry async for entry in self.iter_delegators(validator, concurrency=concurrency, timeout=timeout)]
+
+    # iterates over delegators of a given validator page by page.
+    def iter_delegators(self, validator, limit=None, key=None, concurrency=None, ordered=True, timeout=None):
+        endpoint = '/cosmos/staking/v1beta1/validators/'
+        return self._paginate(endpoint + validator + '/delegations', 'delegation_responses',
+                              limit=limit, key=key, concurrency=concurrency, ordered=ordered, timeout=timeout)
+
+    # queries a validator for a specific delegator address
+    async def query_delegators_by_address(self, validator, address, timeout=None):
+        endpoint = '/cosmos/staking/v1beta1/validators/'
+        return await self._lcd_get(endpoint + validator + '/delegations/' + address, timeout=timeout)
+
+    # queries a validator for a specific unbonding address
+    async def query_validator_unbonding_by_address(self, validator, address, timeout=None):
+        endpoint = '/cosmos/staking/v1beta1/validators/'
+        return await self._lcd_get(endpoint + validator + '/delegations/' + address + '/unbonding_delegation',
+                                   timeout=timeout)
+
+    # queries all the unbonding of a give validator
+    async def query_unbonding_from(self, validator, concurrency=None, timeout=None):
+        return [entry async for entry in self.iter_unbonding_from(validator, concurrency=concurrency, timeout=timeout)]
+
+    # iterates over all the unbonding of a given validator page by page.
+    def iter_unbonding_from(self, validator, limit=None, key=None, concurrency=None, ordered=True, timeout=None):
+        endpoint = '/cosmos/staking/v1beta1/validators/'
+        return self._paginate(endpoint + validator + '/unbonding_delegations', 'unbonding_responses',
+                              limit=limit, key=key, concurrency=concurrency, ordered=ordered, timeout=timeout)
+
+    # queries params of the mint module.
+    async def query_mint_params(self, timeout=None):
+        endpoint = '/cosmos/mint/v1beta1/params'
+        return await self._lcd_get(endpoint, timeout=timeout)
+
+    # queries inflation.
+    async def query_inflation(self, timeout=None):
+        endpoint = '/cosmos/mint/v1beta1/inflation'
+        return await self._lcd_get(endpoint, timeout=timeout)
+
+    # queries annual provisions.
+    async def query_annual_provisions(self, timeout=None):
+        endpoint = '/cosmos/mint/v1beta1/annual_provisions'
+        return await self._lcd_get(endpoint, timeout=timeout)
+
+    # queries a given transaction hash
+    async def query_tx(self, tx, timeout=None):
+        endpoint = '/cosmos/tx/v1beta1/txs/'
+        return await self._lcd_get(endpoint + tx, timeout=timeout)
+
+    # sends many JSON-RPC calls packed in POSTs of at most chunk_size calls, calls are (method, params) pairs
+    # and the responses come back in the same order. concurrency chunks are sent at once.
+    async def rpc_batch(self, calls, chunk_size=DEFAULT_CHUNK_SIZE, concurrency=1, timeout=None):
+        post = functools.partial(self._rpc_post_batch, timeout=timeout)
+        responses = []
+        async for _, task in async_bounded_map(post, chunks(calls, chunk_size), concurrency):
+            responses += task.result()
+        return responses
+
+    async def _rpc_post_batch(self, calls, timeout=None):
+        return match_responses(calls, self._loads(await self.rpc_transport.post('/', batch_body(calls), timeout)))
+
+    # queries abci info.
+    async def query_abci_info(self, timeout=None):
+        endpoint = '/abci_info?'
+        return await self._rpc_get(endpoint, timeout=timeout)
+
+    # queries block by height.
+    async def query_block(self, height, timeout=None):
+        endpoint = '/block?height='
+        return await self._rpc_get(endpoint + str(height), timeout=timeout)
+
+    # queries many blocks by height with batched JSON-RPC calls, in the order of heights.
+    async def query_block_many(self, heights, chunk_size=DEFAULT_CHUNK_SIZE, concurrency=1, timeout=None):
+        return await self.rpc_batch([height_call('block', height) for height in heights], chunk_size, concurrency,
+                                    timeout)
+
+    # queries block results by height.
+    async def query_block_results(self, height, timeout=None):
+        endpoint = '/block_results?height='
+        return await self._rpc_get(endpoint + str(height), timeout=timeout)
+
+    # queries many block results by height with batched JSON-RPC calls, in the order of heights.
+    async def query_block_results_many(self, heights, chunk_size=DEFAULT_CHUNK_SIZE, concurrency=1, timeout=None):
+        return await self.rpc_batch([height_call('block_results', height) for height in heights], chunk_size,
+                                    concurrency, timeout)
+
+    # scans blocks from start to end included in height order, fetching them concurrently.
+    # without an end it follows the chain tip, see AsyncBlockScanner for the checkpoint, window and batch options.
+    def scan_blocks(self, start, end=None, include_results=True, concurrency=8, window=None, checkpoint=None,
+                    checkpoint_every=100, poll_interval=5, batch_size=None, include_blocks=True):
+        return AsyncBlockScanner(self, start, end, include_results, concurrency, window, checkpoint, checkpoint_every,
+                                 poll_interval, batch_size, include_blocks)
+
+    # queries a commit.
+    async def query_commit(self, height, timeout=None):
+        endpoint = '/commit?height='
+        return await self._rpc_get(endpoint + str(height), timeout=timeout)
+
+    # queries many commits by height with batched JSON-RPC calls, in the order of heights.
+    async def query_commit_many(self, heights, chunk_size=DEFAULT_CHUNK_SIZE, concurrency=1, timeout=None):
+        return await self.rpc_batch([height_call('commit', height) for height in heights], chunk_size, concurrency,
+                                    timeout)
+
+    # queries consensus state.
+    async def query_consensus_state(self, timeout=None):
+        endpoint = '/consensus_state?'
+        return await self._rpc_get(endpoint, timeout=timeout)
+
+    # queries dump consensus state.
+    async def query_dump_consensus_state(self, timeout=None):
+        endpoint = '/dump_consensus_state?'
+        return await self._rpc_get(endpoint, timeout=timeout)
+
+    # queries genesis.
+    async def query_genesis(self, timeout=None):
+        endpoint = '/genesis?'
+        return await self._rpc_get(endpoint, timeout=timeout)
+
+    # where the genesis document is read from, the chunks of /genesis_chunked when the node serves it
+    # and the /genesis response otherwise, along with the path of the document in what is read.
+    async def _genesis_source(self, chunk_size):
+        try:
+            first = await self._rpc_get('/genesis_chunked?chunk=0')
+        except Exception:
+            first = None
+        if not isinstance(first, dict) or 'result' not in first:
+            return self.rpc_transport.stream('/genesis', None, None, chunk_size), ['result', 'genesis']
+        return self._genesis_chunks(first['result'], chunk_size), []
+
+    # the decoded /genesis_chunked chunks cut in pieces of up to chunk_size bytes.
+    async def _genesis_chunks(self, first, chunk_size):
+        response = {'result': first}
+        for chunk in range(int(first['total'])):
+            if chunk:
+                response = await self._rpc_get('/genesis_chunked?chunk=' + str(chunk))
+            data = base64.b64decode(response['result']['data'])
+            for start in range(0, len(data), chunk_size):
+                yield data[start:start + chunk_size]
+
+    # streams the raw genesis document without ever holding it whole, up to chunk_size bytes at a time of
+    # /genesis_chunked or of the /genesis response.
+    async def stream_genesis(self, chunk_size: int = DEFAULT_STREAM_CHUNK):
+        source, path = await self._genesis_source(chunk_size)
+        if not path:
+            async for chunk in source:
+                yield chunk
+            return
+        empty = True
+        async for text in async_iter_json_raw(source, path, 'error'):
+            empty = False
+            yield text.encode()
+        if empty:
+            raise Exception('no genesis in the /genesis response')
+
+    # downloads the genesis document to sink, a file path or anything with a write method,
+    # and returns its size in bytes.
+    async def download_genesis(self, sink, chunk_size: int = DEFAULT_STREAM_CHUNK):
+        return await async_write_stream(self.stream_genesis(chunk_size), sink)
+
+    # yields one by one the items of the genesis section at path, such as app_state.bank.balances or
+    # app_state.staking.delegations, memory staying proportional to a single item. sections that are
+    # objects yield (key, value) pairs.
+    async def iter_genesis(self, path: str, chunk_size: int = DEFAULT_STREAM_CHUNK):
+        source, prefix = await self._genesis_source(chunk_size)
+        async for item in async_iter_json_items(source, prefix + split_path(path), 'error' if prefix else None):
+            yield item
+
+    # yields one by one the transactions of a block without decoding the whole block.
+    def iter_block_txs(self, height, chunk_size: int = DEFAULT_STREAM_CHUNK):
+        source = self.rpc_transport.stream('/block', {'height': str(height)}, None, chunk_size)
+        return async_iter_json_items(source, 'result.block.data.txs', 'error')
+
+    # queries network info.
+    async def query_net_info(self, timeout=None):
+        endpoint = '/net_info?'
+        return await self._rpc_get(endpoint, timeout=timeout)
+
+    # queries the number of unconfirmed transactions.
+    async def query_num_unconfirmed_txs(self, timeout=None):
+        endpoint = '/num_unconfirmed_txs?'
+        return await self._rpc_get(endpoint, timeout=timeout)
+
+    # queries the node status.
+    async def query_status(self, timeout=None):
+        endpoint = '/status?'
+        return await self._rpc_get(endpoint, timeout=timeout)
+
+    # subscribes to the events matching query through the RPC websocket, NEW_BLOCK and TX being the most common
+    # ones, and returns an iterator over them that reconnects on failures and backfills the missed heights.
+    def subscribe(self, query=NEW_BLOCK, backfill=True, reconnect_delay=1, max_reconnect_delay=30, idle_timeout=60):
+        return AsyncSubscription(self, query, backfill, reconnect_delay, max_reconnect_delay, idle_timeout)
+
+    # pins the LCD queries run in the with block, in its tasks and paginated queries included, to height so
+    # that they all read the same state, whichever endpoint answers them. without a height the latest one
+    # is read first, which needs async with. the with statement returns the height.
+    def at_height(self, height=None):
+        return HeightPin(height, self._latest_height)
+
+    # latest height of the LCD, never pinned.
+    async def _latest_height(self):
+        return LCD_STATUS[1](await self._get(self.lcd, self.lcd_transport, LCD_STATUS[0], None, None))
+
+    # builds a DelegationSnapshot of every delegation on the chain as numpy columns, reading the delegations
+    # of concurrency validators at once, for vectorized analytics and arrow or parquet exports.
+    async def snapshot_delegations(self, concurrency=8):
+        return await async_build_snapshot(self, concurrency)
+
+    # keeps the delegations of the chain, and the balances of addresses, current block after block by applying
+    # the events of block results to a first full snapshot. see AsyncStateTracker for the options.
+    def track_state(self, addresses=None, path=None, concurrency=8, reconcile_every=100, sample_size=20, tolerance=1,
+                    checkpoint_every=100, poll_interval=5):
+        return AsyncStateTracker(self, addresses, path, concurrency, reconcile_every, sample_size, tolerance,
+                                 checkpoint_every, poll_interval)
@@ -0,0 +1,59 @@
+# pyCosmicWrap is a Cosmos API/RPC python Wrapper
+# ChihuahuaChain - https://github.com/ChihuahuaChain/pyCosmicWrap
+#
+# License GNU General Public License v3.0
+#
+# https://choosealicense.com/licenses/gpl-3.0/
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# number of calls of a batch running at once when no concurrency is given.
+DEFAULT_BATCH_CONCURRENCY = 8
+
+
+# an item of a batch is either a single argument or a tuple of arguments.
+def batch_args(item):
+    return item if isinstance(item, tuple) else (item,)
+
+
+# outcome of a single call of a batch, error holds the exception raised by that call if any.
+class BatchItem:
+    def __init__(self, key, result=None, error=None):
+        self.key = key
+        self.result = result
+        self.error = error
+
+    # builds the item from a completed future or asyncio task.
+    @classmethod
+    def from_future(cls, key, future):
+        error = future.exception()
+        return cls(key, None if error is not None else future.result(), error)
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        return 'BatchItem(%r, ok=%r)' % (self.key, self.ok)
+
+
+# results of a batch keyed by item, the calls that failed are kept in errors
+# so a single failure never discards the rest of the batch.
+class BatchResult(dict):
+    def __init__(self, items=()):
+        super().__init__()
+        self.errors = {}
+        for item in items:
+            self.add(item)
+
+    def add(self, item: BatchItem):
+        if item.ok:
+            self[item.key] = item.result
+        else:
+            self.errors[item.key] = item.error
@@ -0,0 +1,128 @@
+# pyCosmicWrap is a Cosmos API/RPC python Wrapper
+# ChihuahuaChain - https://github.com/ChihuahuaChain/pyCosmicWrap
+#
+# License GNU General Public License v3.0
+#
+# https://choosealicense.com/licenses/gpl-3.0/
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import threading
+import time
+from collections import OrderedDict
+
+# ttl of responses that can never change, they are only dropped by eviction or invalidation.
+PERMANENT = float('inf')
+
+# ttl in seconds of every cached endpoint, keyed by path prefix. paths missing from here are never cached.
+# blocks, block results and commits are only requested by height and a height that answers is final.
+DEFAULT_POLICIES = {
+    '/cosmos/distribution/v1beta1/params': 300,
+    '/cosmos/mint/v1beta1/params': 300,
+    '/cosmos/slashing/v1beta1/params': 300,
+    '/cosmos/staking/v1beta1/params': 300,
+    '/cosmos/mint/v1beta1/annual_provisions': 60,
+    '/cosmos/mint/v1beta1/inflation': 60,
+    '/cosmos/staking/v1beta1/pool': 60,
+    '/cosmos/tx/v1beta1/txs/': PERMANENT,
+    '/block?height=': PERMANENT,
+    '/block_results?height=': PERMANENT,
+    '/commit?height=': PERMANENT,
+}
+
+
+# builds the cache key of a request, host is a url or the list of urls of an endpoint pool
+# and height the height the request is pinned to, if any.
+def cache_key(host, path: str, params=None, height=None):
+    host = host if isinstance(host, str) else tuple(host)
+    return host, path, tuple(sorted(params.items())) if params else (), height
+
+
+# tells whether a decoded response is a successful one, LCD errors carry a non-zero code
+# and RPC errors an error member, neither of them is ever cached.
+def cacheable(result):
+    return isinstance(result, (dict, list)) and not (
+        isinstance(result, dict) and ('error' in result or result.get('code', 0) not in (0, None)))
+
+
+# thread-safe in-memory cache of raw response bodies with per-endpoint ttl policies.
+# entries are evicted least recently used first once there are more than max_entries of them
+# or once their bodies add up to more than max_bytes.
+class ResponseCache:
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 256 * 1024 * 1024, policies=None,
+                 clock=time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.policies = dict(DEFAULT_POLICIES if policies is None else policies)
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    # ttl of a path, None when it must not be cached.
+    def policy(self, path: str):
+        for prefix, ttl in self.policies.items():
+            if path.startswith(prefix):
+                return ttl
+        return None
+
+    # sets the ttl of every path starting with prefix, None stops caching them.
+    def set_policy(self, prefix: str, ttl):
+        if ttl is None:
+            self.policies.pop(prefix, None)
+        else:
+            self.policies[prefix] = ttl
+
+    # returns the body cached under key, None when it is missing or expired.
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] <= self.clock():
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    # caches body under key for ttl seconds.
+    def put(self, key, body: bytes, ttl):
+        if len(body) > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self._drop(key)
+            self.entries[key] = (self.clock() + ttl, body)
+            self.bytes += len(body)
+            while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+                self._drop(next(iter(self.entries)))
+                self.evictions += 1
+
+    def _drop(self, key):
+        self.bytes -= len(self.entries.pop(key)[1])
+
+    # drops every entry whose path starts with prefix, optionally only for a given host,
+    # and everything when neither is given. returns the number of entries dropped.
+    def invalidate(self, prefix: str = '', host=None):
+        with self.lock:
+            keys = [key for key in self.entries
+                    if key[1].startswith(prefix) and (host is None or key[0] == host)]
+            for key in keys:
+                self._drop(key)
+            return len(keys)
+
+    def stats(self):
+        with self.lock:
+            return {'entries': len(self.entries), 'bytes': self.bytes, 'hits': self.hits, 'misses': self.misses,
+                    'evictions': self.evictions}
@@ -0,0 +1,93 @@
+# pyCosmicWrap is a Cosmos API/RPC python Wrapper
+# ChihuahuaChain - https://github.com/ChihuahuaChain/pyCosmicWrap
+#
+# License GNU General Public License v3.0
+#
+# https://choosealicense.com/licenses/gpl-3.0/
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import asyncio
+import contextvars
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+# runs fn over items on a pool of concurrency threads and yields (item, future) pairs,
+# in the order of items when ordered, otherwise as soon as each call completes.
+# at most window calls are pending at once and new ones are only submitted as results
+# are consumed, so a slow consumer throttles the producer and memory stays bounded.
+# every call runs in a copy of the context of the caller, so a pinned height follows it.
+def bounded_map(fn, items, concurrency: int, window=None, ordered: bool = True):
+    window = window or concurrency * 2
+    items = iter(items)
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        try:
+            for item in items:
+                pending.append((item, executor.submit(contextvars.copy_context().run, fn, item)))
+                if len(pending) < window:
+                    continue
+                if ordered:
+                    yield pending.popleft()
+                else:
+                    yield from _pop_completed(pending)
+            while pending:
+                if ordered:
+                    yield pending.popleft()
+                else:
+                    yield from _pop_completed(pending)
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+
+def _pop_completed(pending):
+    done, _ = wait([future for _, future in pending], return_when=FIRST_COMPLETED)
+    completed = [entry for entry in pending if entry[1] in done]
+    for entry in completed:
+        pending.remove(entry)
+    return completed
+
+
+# asyncio counterpart of bounded_map, fn is a coroutine function and tasks replace threads.
+async def async_bounded_map(fn, items, concurrency: int, window=None, ordered: bool = True):
+    window = window or concurrency * 2
+    semaphore = asyncio.Semaphore(concurrency)
+    pending = deque()
+
+    async def call(item):
+        async with semaphore:
+            return await fn(item)
+
+    try:
+        for item in items:
+            pending.append((item, asyncio.ensure_future(call(item))))
+            if len(pending) < window:
+                continue
+            for entry in await _async_pop(pending, ordered):
+                yield entry
+        while pending:
+            for entry in await _async_pop(pending, ordered):
+                yield entry
+    finally:
+        for _, task in pending:
+            task.cancel()
+
+
+async def _async_pop(pending, ordered):
+    if ordered:
+        item, task = pending.popleft()
+        await asyncio.wait([task])
+        return [(item, task)]
+    done, _ = await asyncio.wait([task for _, task in pending], return_when=asyncio.FIRST_COMPLETED)
+    completed = [entry for entry in pending if entry[1] in done]
+    for entry in completed:
+        pending.remove(entry)
+    return completed
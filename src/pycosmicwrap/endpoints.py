@@ -0,0 +1,312 @@
+# pyCosmicWrap is a Cosmos API/RPC python Wrapper
+# ChihuahuaChain - https://github.com/ChihuahuaChain/pyCosmicWrap
+#
+# License GNU General Public License v3.0
+#
+# https://choosealicense.com/licenses/gpl-3.0/
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .decoding import loads
+from .streaming import DEFAULT_STREAM_CHUNK
+
+# path and reader of the latest height of an LCD.
+LCD_STATUS = ('/cosmos/base/tendermint/v1beta1/blocks/latest',
+              lambda result: int(result['block']['header']['height']))
+
+# path and reader of the latest height of an RPC.
+RPC_STATUS = ('/status', lambda result: int(result['result']['sync_info']['latest_block_height']))
+
+
+# builds the transport of a host, an EndpointPool spreading its requests when a list of urls is given.
+# pool_options are the EndpointPool options and options the ones of every transport.
+def host_transport(urls, transport, status, pool_options=None, **options):
+    if isinstance(urls, str):
+        return transport(urls, **options)
+    return EndpointPool(urls, transport, status, **dict(pool_options or {}, **options))
+
+
+# asyncio counterpart of host_transport, every transport shares the connection pool of the client.
+def async_host_transport(urls, transport, pool, status, pool_options=None, **options):
+    if isinstance(urls, str):
+        return transport(urls, pool, **options)
+    return AsyncEndpointPool(urls, transport, pool, status, **dict(pool_options or {}, **options))
+
+
+# latency and health of a single endpoint of an EndpointPool, latency and error_rate are
+# exponentially weighted moving averages, latency in seconds.
+class Endpoint:
+    def __init__(self, url: str, transport, alpha: float, samples: int = 100):
+        self.url = url
+        self.transport = transport
+        self.alpha = alpha
+        self.latency = None
+        self.error_rate = 0.0
+        self.failed_at = 0.0
+        self.height = None
+        self.lagging = False
+        self.samples = deque(maxlen=samples)
+
+    def record(self, elapsed: float, ok: bool):
+        if ok:
+            self.samples.append(elapsed)
+            self.latency = elapsed if self.latency is None else self.alpha * elapsed + (1 - self.alpha) * self.latency
+        else:
+            self.failed_at = time.monotonic()
+        self.error_rate = self.alpha * (0.0 if ok else 1.0) + (1 - self.alpha) * self.error_rate
+
+    # latency under which a share of percentile of the recent requests completed, None without enough samples.
+    def percentile(self, percentile: float, min_samples: int):
+        if len(self.samples) < min_samples:
+            return None
+        samples = sorted(self.samples)
+        return samples[min(len(samples) - 1, int(percentile * len(samples)))]
+
+    def __repr__(self):
+        return 'Endpoint(%r, latency=%r, error_rate=%.2f, height=%r, lagging=%r)' % (
+            self.url, self.latency, self.error_rate, self.height, self.lagging)
+
+
+# spreads the requests of a host over several endpoints serving the same chain. every request goes
+# to the fastest healthy endpoint and fails over to the next ones on errors. an endpoint is unhealthy
+# while its error rate is above max_error_rate, it is tried again cooldown seconds after its last
+# failure. every check_interval seconds the latest heights are compared in the background and the
+# endpoints more than max_lag blocks behind the best one are left aside. with a hedge_percentile a
+# duplicate request is sent to the next endpoint once the first one is slower than that share of
+# its recent requests, the first response wins. the endpoints do not retry the requests that could not
+# reach them, a GET fails over first and is only retried, as the scheduler of the first endpoint retries,
+# once no endpoint could be reached.
+class EndpointPool:
+    def __init__(self, urls, transport, status=RPC_STATUS, alpha: float = 0.3, max_error_rate: float = 0.5,
+                 cooldown: float = 30, max_lag: int = 5, check_interval: float = 30, hedge_percentile=None,
+                 hedge_min_samples: int = 20, **options):
+        self.endpoints = [Endpoint(url, transport(url, **options), alpha) for url in urls]
+        for endpoint in self.endpoints:
+            if getattr(endpoint.transport, 'scheduler', None) is not None:
+                endpoint.transport.scheduler.retry_errors = False
+        self.scheduler = getattr(self.endpoints[0].transport, 'scheduler', None)
+        self.network_errors = getattr(self.endpoints[0].transport, 'network_errors', ())
+        self.base_url = urls[0]
+        self.status = status
+        self.max_error_rate = max_error_rate
+        self.cooldown = cooldown
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.checked_at = 0.0
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.executor = None
+
+    # threads running the hedged requests and the background height checks, started on first use.
+    def _executor(self):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=max(4, 2 * len(self.endpoints)))
+        return self.executor
+
+    def _available(self, endpoint, now):
+        if endpoint.lagging:
+            return False
+        return endpoint.error_rate < self.max_error_rate or now - endpoint.failed_at > self.cooldown
+
+    # endpoints in the order they are tried, available ones by latency first, then the available ones
+    # without latency yet, which the background height checks measure, then the others by error rate as
+    # a last resort.
+    def ranked(self):
+        now = time.monotonic()
+        available = [endpoint for endpoint in self.endpoints if self._available(endpoint, now)]
+        measured = sorted((endpoint for endpoint in available if endpoint.latency is not None),
+                          key=lambda endpoint: endpoint.latency)
+        unknown = [endpoint for endpoint in available if endpoint.latency is None]
+        others = [endpoint for endpoint in self.endpoints if endpoint not in available]
+        others.sort(key=lambda endpoint: endpoint.error_rate)
+        return measured + unknown + others
+
+    def _check_due(self):
+        now = time.monotonic()
+        if self.check_interval is not None and now - self.checked_at > self.check_interval:
+            self.checked_at = now
+            return True
+        return False
+
+    # marks the endpoints lagging more than max_lag blocks behind the highest one.
+    def _mark_lagging(self):
+        heights = [endpoint.height for endpoint in self.endpoints if endpoint.height is not None]
+        best = max(heights) if heights else None
+        for endpoint in self.endpoints:
+            endpoint.lagging = best is not None and (endpoint.height is None or best - endpoint.height > self.max_lag)
+
+    # sends a GET to the best endpoint and returns the raw response body.
+    def get(self, path: str, params=None, timeout=None, headers=None):
+        if self._check_due():
+            self._executor().submit(self.check_heights)
+        args = (path, params, timeout) if headers is None else (path, params, timeout, headers)
+        attempt = 0
+        while True:
+            try:
+                if self.hedge_percentile is not None:
+                    return self._hedged('get', *args)
+                return self._failover(self.ranked(), 'get', *args)
+            except self.network_errors:
+                if self.scheduler is None or attempt >= self.scheduler.retries:
+                    raise
+            time.sleep(self.scheduler._backoff(attempt))
+            attempt += 1
+
+    # sends a POST to the best endpoint and returns the raw response body, it is never retried.
+    def post(self, path: str, data, timeout=None):
+        return self._failover(self.ranked(), 'post', path, data, timeout)
+
+    # streams a GET from the best endpoint, a stream that started cannot fail over.
+    def stream(self, path: str, params=None, timeout=None, chunk_size: int = DEFAULT_STREAM_CHUNK):
+        return self.ranked()[0].transport.stream(path, params, timeout, chunk_size)
+
+    def _call(self, endpoint, method, *args):
+        started = time.monotonic()
+        try:
+            body = getattr(endpoint.transport, method)(*args)
+        except Exception:
+            endpoint.record(time.monotonic() - started, False)
+            raise
+        endpoint.record(time.monotonic() - started, True)
+        return body
+
+    def _failover(self, endpoints, method, *args):
+        error = None
+        for endpoint in endpoints:
+            try:
+                return self._call(endpoint, method, *args)
+            except Exception as failure:
+                error = failure
+        raise error
+
+    def _hedged(self, method, *args):
+        endpoints = self.ranked()
+        delay = endpoints[0].percentile(self.hedge_percentile, self.hedge_min_samples)
+        if delay is None or len(endpoints) < 2:
+            return self._failover(endpoints, method, *args)
+        first = self._executor().submit(self._call, endpoints[0], method, *args)
+        done, _ = wait([first], timeout=delay)
+        if done and first.exception() is None:
+            return first.result()
+        second = self._executor().submit(self._failover, endpoints[1:], method, *args)
+        pending = {first, second}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+        raise second.exception()
+
+    # reads the latest height of every endpoint and marks the ones lagging behind.
+    def check_heights(self):
+        path, read_height = self.status
+        for endpoint in self.endpoints:
+            try:
+                endpoint.height = read_height(loads(self._call(endpoint, 'get', path, None, None)))
+            except Exception:
+                endpoint.height = None
+        self._mark_lagging()
+        return {endpoint.url: endpoint.height for endpoint in self.endpoints}
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+        for endpoint in self.endpoints:
+            endpoint.transport.close()
+
+
+# asyncio counterpart of EndpointPool, built over AsyncTransport objects.
+class AsyncEndpointPool(EndpointPool):
+    def __init__(self, urls, transport, pool, status=RPC_STATUS, alpha: float = 0.3, max_error_rate: float = 0.5,
+                 cooldown: float = 30, max_lag: int = 5, check_interval: float = 30, hedge_percentile=None,
+                 hedge_min_samples: int = 20, **options):
+        super().__init__(urls, lambda url, **kwargs: transport(url, pool, **kwargs), status, alpha, max_error_rate,
+                         cooldown, max_lag, check_interval, hedge_percentile, hedge_min_samples, **options)
+        self.check_task = None
+
+    async def get(self, path: str, params=None, timeout=None, headers=None):
+        if self._check_due():
+            self.check_task = asyncio.ensure_future(self.check_heights())
+        args = (path, params, timeout) if headers is None else (path, params, timeout, headers)
+        attempt = 0
+        while True:
+            try:
+                if self.hedge_percentile is not None:
+                    return await self._hedged('get', *args)
+                return await self._failover(self.ranked(), 'get', *args)
+            except self.network_errors:
+                if self.scheduler is None or attempt >= self.scheduler.retries:
+                    raise
+            await asyncio.sleep(self.scheduler._backoff(attempt))
+            attempt += 1
+
+    async def post(self, path: str, data, timeout=None):
+        return await self._failover(self.ranked(), 'post', path, data, timeout)
+
+    async def _call(self, endpoint, method, *args):
+        started = time.monotonic()
+        try:
+            body = await getattr(endpoint.transport, method)(*args)
+        except Exception:
+            endpoint.record(time.monotonic() - started, False)
+            raise
+        endpoint.record(time.monotonic() - started, True)
+        return body
+
+    async def _failover(self, endpoints, method, *args):
+        error = None
+        for endpoint in endpoints:
+            try:
+                return await self._call(endpoint, method, *args)
+            except Exception as failure:
+                error = failure
+        raise error
+
+    async def _hedged(self, method, *args):
+        endpoints = self.ranked()
+        delay = endpoints[0].percentile(self.hedge_percentile, self.hedge_min_samples)
+        if delay is None or len(endpoints) < 2:
+            return await self._failover(endpoints, method, *args)
+        first = asyncio.ensure_future(self._call(endpoints[0], method, *args))
+        done, _ = await asyncio.wait([first], timeout=delay)
+        if done and first.exception() is None:
+            return first.result()
+        second = asyncio.ensure_future(self._failover(endpoints[1:], method, *args))
+        pending = {first, second}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+            raise second.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def check_heights(self):
+        path, read_height = self.status
+        for endpoint in self.endpoints:
+            try:
+                endpoint.height = read_height(loads(await self._call(endpoint, 'get', path, None, None)))
+            except Exception:
+                endpoint.height = None
+        self._mark_lagging()
+        return {endpoint.url: endpoint.height for endpoint in self.endpoints}
+
+    async def close(self):
+        if self.check_task is not None:
+            self.check_task.cancel()
+        for endpoint in self.endpoints:
+            await endpoint.transport.close()
@@ -0,0 +1,51 @@
+# pyCosmicWrap is a Cosmos API/RPC python Wrapper
+# ChihuahuaChain - https://github.com/ChihuahuaChain/pyCosmicWrap
+#
+# License GNU General Public License v3.0
+#
+# https://choosealicense.com/licenses/gpl-3.0/
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+from itertools import islice
+
+# number of calls packed in a single POST when no chunk size is given.
+DEFAULT_CHUNK_SIZE = 100
+
+
+# splits calls into lists of at most size calls.
+def chunks(calls, size: int):
+    calls = iter(calls)
+    chunk = list(islice(calls, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(calls, size))
+
+
+# builds the body of a JSON-RPC 2.0 batch, calls are (method, params) pairs and ids are their positions.
+def batch_body(calls):
+    return json.dumps([{'jsonrpc': '2.0', 'id': i, 'method': method, 'params': params or {}}
+                       for i, (method, params) in enumerate(calls)])
+
+
+# puts the responses of a batch back in the order of its calls, nodes are free to answer in any order.
+def match_responses(calls, responses):
+    if isinstance(responses, dict):
+        responses = [responses]
+    by_id = {response.get('id'): response for response in responses}
+    try:
+        return [by_id[i] for i in range(len(calls))]
+    except KeyError as missing:
+        raise Exception('no JSON-RPC response for call ' + str(missing))
+
+
+# call of the block, block_results or commit method at a given height.
+def height_call(method: str, height):
+    return method, {'height': str(height)}
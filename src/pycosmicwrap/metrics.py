@@ -0,0 +1,312 @@
+# pyCosmicWrap is a Cosmos API/RPC python Wrapper
+# ChihuahuaChain - https://github.com/ChihuahuaChain/pyCosmicWrap
+#
+# License GNU General Public License v3.0
+#
+# https://choosealicense.com/licenses/gpl-3.0/
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import asyncio
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from .decoding import loads
+
+# upper bounds of the histogram buckets, in seconds for durations and in bytes for response sizes.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (1024, 10 * 1024, 100 * 1024, 1024 * 1024, 10 * 1024 * 1024, 100 * 1024 * 1024)
+
+# name of the client method running, the requests it sends are labelled with it.
+CURRENT_METHOD = ContextVar('current_method', default=None)
+
+# RequestRecord of the request being sent, the connections opened for it add their time to it.
+CURRENT_REQUEST = ContextVar('current_request', default=None)
+
+# label of the requests sent outside of any client method.
+UNKNOWN_METHOD = 'unknown'
+
+# client methods left unlabelled, batches label their requests with the method they run.
+UNLABELLED = ('at_height', 'batch', 'close', 'iter_batch')
+
+
+# counts of the observed values falling under every bucket bound, the last count being the ones above all.
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    # upper bound of the bucket holding the given share of the values, None when empty or above every bound.
+    def quantile(self, share: float):
+        if not self.count:
+            return None
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= share * self.count:
+                return bound
+        return None
+
+    def to_dict(self):
+        return {'count': self.count, 'sum': self.sum, 'p50': self.quantile(0.5), 'p99': self.quantile(0.99),
+                'buckets': dict(zip(self.buckets + ('+Inf',), self.counts))}
+
+
+# a single HTTP attempt as handed to the hooks, durations are in seconds. connect is the time spent opening
+# connections, wait the time until the response headers arrived and transfer the time reading the body.
+# status stays None and error holds the exception when the host could not be reached.
+class RequestRecord:
+    __slots__ = ('method', 'host', 'verb', 'path', 'params', 'status', 'size', 'connect', 'wait', 'transfer',
+                 'error', 'started')
+
+    def __init__(self, method: str, host: str, verb: str, path: str, params=None):
+        self.method = method
+        self.host = host
+        self.verb = verb
+        self.path = path
+        self.params = params
+        self.status = None
+        self.size = 0
+        self.connect = 0.0
+        self.wait = 0.0
+        self.transfer = 0.0
+        self.error = None
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return self.connect + self.wait + self.transfer
+
+    def __repr__(self):
+        return 'RequestRecord(%s %s%s, method=%s, status=%r, size=%d, elapsed=%.3f)' % (
+            self.verb, self.host, self.path, self.method, self.status, self.size, self.elapsed)
+
+
+def _label_text(labels):
+    return ','.join('%s="%s"' % (name, str(value).replace('\\', '\\\\').replace('"', '\\"')) for name, value in labels)
+
+
+# latency histograms split in connect, wait, transfer and decode time, response sizes, request and page
+# counts of a client, labelled by client method and host. collectors are called with the metrics before
+# every export to set the gauges, such as the requests in flight. before hooks are called with the
+# RequestRecord of every attempt before it is sent and after hooks once it completed or failed.
+# a client only measures anything when it is given a Metrics, otherwise its code paths stay untouched.
+class Metrics:
+    def __init__(self, namespace: str = 'pycosmicwrap', latency_buckets=LATENCY_BUCKETS, size_buckets=SIZE_BUCKETS):
+        self.namespace = namespace
+        self.latency_buckets = latency_buckets
+        self.size_buckets = size_buckets
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+        self.collectors = []
+        self.before = []
+        self.after = []
+        self.lock = threading.Lock()
+
+    # registers callbacks called with the RequestRecord of every attempt, before and after it is sent.
+    def add_hooks(self, before=None, after=None):
+        if before is not None:
+            self.before.append(before)
+        if after is not None:
+            self.after.append(after)
+
+    def observe(self, name: str, labels, value, buckets=None):
+        key = (name, tuple(labels))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets or self.latency_buckets)
+            histogram.observe(value)
+
+    def count(self, name: str, labels, value=1):
+        key = (name, tuple(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def gauge(self, name: str, labels, value):
+        with self.lock:
+            self.gauges[(name, tuple(labels))] = value
+
+    # sets a counter kept elsewhere, such as the retries of a Scheduler.
+    def total(self, name: str, labels, value):
+        with self.lock:
+            self.counters[(name, tuple(labels))] = value
+
+    # starts the record of an attempt and calls the before hooks.
+    def start(self, host: str, verb: str, path: str, params=None):
+        record = RequestRecord(CURRENT_METHOD.get() or UNKNOWN_METHOD, host, verb, path, params)
+        for hook in self.before:
+            hook(record)
+        return record
+
+    # files the measures of a completed or failed attempt and calls the after hooks.
+    def finish(self, record: RequestRecord):
+        labels = (('method', record.method), ('host', record.host))
+        self.count('requests_total', labels + (('status', record.status or 'error'),))
+        if record.error is None:
+            self.observe('request_seconds', labels, record.elapsed)
+            if record.connect:
+                self.observe('request_phase_seconds', labels + (('phase', 'connect'),), record.connect)
+            self.observe('request_phase_seconds', labels + (('phase', 'wait'),), record.wait)
+            self.observe('request_phase_seconds', labels + (('phase', 'transfer'),), record.transfer)
+            self.observe('response_bytes', labels, record.size, self.size_buckets)
+            self.count('response_bytes_total', labels, record.size)
+        for hook in self.after:
+            hook(record)
+
+    # decodes a response body like decoding.loads, timing it under the running client method.
+    def loads(self, body):
+        started = time.perf_counter()
+        result = loads(body)
+        self.observe('decode_seconds', (('method', CURRENT_METHOD.get() or UNKNOWN_METHOD),),
+                     time.perf_counter() - started)
+        return result
+
+    # wraps the fetch of a paginated walk so that its pages are counted and labelled with the client
+    # method that started it, wherever they are fetched.
+    def paged(self, fetch):
+        method = CURRENT_METHOD.get() or UNKNOWN_METHOD
+
+        if inspect.iscoroutinefunction(getattr(fetch, 'func', fetch)):
+            async def fetch_page(*args, **kwargs):
+                token = CURRENT_METHOD.set(method)
+                try:
+                    page = await fetch(*args, **kwargs)
+                finally:
+                    CURRENT_METHOD.reset(token)
+                self.count('pages_total', (('method', method),))
+                return page
+        else:
+            def fetch_page(*args, **kwargs):
+                token = CURRENT_METHOD.set(method)
+                try:
+                    page = fetch(*args, **kwargs)
+                finally:
+                    CURRENT_METHOD.reset(token)
+                self.count('pages_total', (('method', method),))
+                return page
+        return fetch_page
+
+    def _collect(self):
+        for collector in self.collectors:
+            collector(self)
+
+    # every measure as a dict of metric names to lists of their labels with the value, or with the count,
+    # sum, approximate p50 and p99 and buckets of histograms.
+    def snapshot(self):
+        self._collect()
+        with self.lock:
+            stats = {}
+            for kind in (self.counters, self.gauges):
+                for (name, labels), value in kind.items():
+                    stats.setdefault(name, []).append(dict(labels, value=value))
+            for (name, labels), histogram in self.histograms.items():
+                stats.setdefault(name, []).append(dict(labels, **histogram.to_dict()))
+        return stats
+
+    # every measure in the Prometheus text exposition format.
+    def prometheus(self):
+        self._collect()
+        lines = []
+        with self.lock:
+            for kind, entries in (('counter', self.counters), ('gauge', self.gauges)):
+                for name in sorted({name for name, _ in entries}):
+                    lines.append('# TYPE %s_%s %s' % (self.namespace, name, kind))
+                    for (entry, labels), value in entries.items():
+                        if entry == name:
+                            lines.append('%s_%s{%s} %s' % (self.namespace, name, _label_text(labels), value))
+            for name in sorted({name for name, _ in self.histograms}):
+                lines.append('# TYPE %s_%s histogram' % (self.namespace, name))
+                for (entry, labels), histogram in self.histograms.items():
+                    if entry != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+                        cumulative += count
+                        lines.append('%s_%s_bucket{%s} %d' % (self.namespace, name,
+                                                              _label_text(labels + (('le', bound),)), cumulative))
+                    lines.append('%s_%s_sum{%s} %s' % (self.namespace, name, _label_text(labels), histogram.sum))
+                    lines.append('%s_%s_count{%s} %d' % (self.namespace, name, _label_text(labels), histogram.count))
+        return '\n'.join(lines) + '\n'
+
+    # clears every measure, the hooks and collectors are kept.
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.counters.clear()
+            self.gauges.clear()
+
+
+# sets the gauges and counters of a Scheduler pacing the requests to host, role telling the lcd from the rpc
+# when both are served by the same url.
+def collect_scheduler(metrics, role: str, host: str, scheduler):
+    labels = (('role', role), ('host', host))
+    metrics.gauge('in_flight', labels, scheduler.in_flight)
+    if scheduler.limit is not None:
+        metrics.gauge('concurrency_limit', labels, scheduler.limit)
+    metrics.total('retries_total', labels, scheduler.retried)
+    metrics.total('throttled_total', labels, scheduler.throttled)
+
+
+# collector of the transports of a client given as (role, transport) pairs, the ones of every endpoint of
+# its pools included.
+def transport_collector(*transports):
+    def collect(metrics):
+        for role, transport in transports:
+            endpoints = getattr(transport, 'endpoints', None)
+            for each in [endpoint.transport for endpoint in endpoints] if endpoints is not None else [transport]:
+                if hasattr(each, 'collect'):
+                    each.collect(metrics, role)
+
+    return collect
+
+
+# labels the requests sent by fn with name, fn being a function or a coroutine function. the outermost
+# label wins, so the requests of query_all_validators keep its name rather than the one of iter_validators.
+def labelled(name: str, fn):
+    if asyncio.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def method(*args, **kwargs):
+            if CURRENT_METHOD.get() is not None:
+                return await fn(*args, **kwargs)
+            token = CURRENT_METHOD.set(name)
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                CURRENT_METHOD.reset(token)
+    else:
+        @functools.wraps(fn)
+        def method(*args, **kwargs):
+            if CURRENT_METHOD.get() is not None:
+                return fn(*args, **kwargs)
+            token = CURRENT_METHOD.set(name)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                CURRENT_METHOD.reset(token)
+    return method
+
+
+# replaces the public methods of a client by ones labelling their requests with the method name.
+def instrument(client):
+    for name, fn in inspect.getmembers(type(client), inspect.isfunction):
+        if not name.startswith('_') and name not in UNLABELLED:
+            setattr(client, name, labelled(name, getattr(client, name)))
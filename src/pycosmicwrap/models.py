@@ -0,0 +1,221 @@
+# pyCosmicWrap is a Cosmos API/RPC python Wrapper
+# ChihuahuaChain - https://github.com/ChihuahuaChain/pyCosmicWrap
+#
+# License GNU General Public License v3.0
+#
+# https://choosealicense.com/licenses/gpl-3.0/
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import re
+from decimal import Decimal
+
+COIN = re.compile(r'^([0-9.]+)(.+)$')
+
+
+# amount of a Coin, an int, or of a DecCoin, a Decimal.
+def parse_amount(text: str):
+    return Decimal(text) if '.' in text else int(text)
+
+
+# field of a model kept as the string found in the response and parsed on first access only,
+# the parsed value then replaces the string in its slot.
+class Lazy:
+    def __init__(self, parse):
+        self.parse = parse
+        self.slot = None
+
+    def __set_name__(self, owner, name):
+        self.slot = '_' + name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = getattr(instance, self.slot)
+        if isinstance(value, str):
+            value = self.parse(value)
+            setattr(instance, self.slot, value)
+        return value
+
+
+# compact models of the most common query results. they hold only the fields analytics use, amounts and
+# decimals being parsed lazily, and take a fraction of the memory of the decoded response dicts.
+class Coin:
+    __slots__ = ('denom', '_amount')
+    amount = Lazy(parse_amount)
+
+    def __init__(self, denom: str, amount):
+        self.denom = denom
+        self._amount = amount
+
+    # builds a coin out of {'denom': ..., 'amount': ...}.
+    @classmethod
+    def from_dict(cls, coin):
+        return cls(coin['denom'], coin['amount'])
+
+    # builds a coin out of a string such as 123456uhuahua.
+    @classmethod
+    def parse(cls, text: str):
+        match = COIN.match(text.strip())
+        if match is None:
+            raise ValueError('invalid coin: ' + text)
+        return cls(match.group(2), match.group(1))
+
+    def __eq__(self, other):
+        return isinstance(other, Coin) and (self.denom, self.amount) == (other.denom, other.amount)
+
+    def __repr__(self):
+        return 'Coin(%r, %r)' % (self.denom, self.amount)
+
+
+# delegation of a delegator to a validator, with the tokens its shares are worth.
+class Delegation:
+    __slots__ = ('delegator_address', 'validator_address', '_shares', 'denom', '_amount')
+    shares = Lazy(Decimal)
+    amount = Lazy(int)
+
+    def __init__(self, delegator_address: str, validator_address: str, shares, denom: str, amount):
+        self.delegator_address = delegator_address
+        self.validator_address = validator_address
+        self._shares = shares
+        self.denom = denom
+        self._amount = amount
+
+    # builds a delegation out of an entry of delegation_responses.
+    @classmethod
+    def from_dict(cls, response):
+        delegation = response['delegation']
+        balance = response.get('balance') or {}
+        return cls(delegation['delegator_address'], delegation['validator_address'], delegation['shares'],
+                   balance.get('denom'), balance.get('amount') or '0')
+
+    def __repr__(self):
+        return 'Delegation(%r, %r, shares=%s, amount=%s%s)' % (
+            self.delegator_address, self.validator_address, self.shares, self.amount, self.denom)
+
+
+# validator with its bonded tokens, shares and commission rate.
+class Validator:
+    __slots__ = ('operator_address', 'moniker', 'jailed', 'status', '_tokens', '_delegator_shares',
+                 '_commission_rate')
+    tokens = Lazy(int)
+    delegator_shares = Lazy(Decimal)
+    commission_rate = Lazy(Decimal)
+
+    def __init__(self, operator_address: str, moniker: str, jailed: bool, status: str, tokens, delegator_shares,
+                 commission_rate):
+        self.operator_address = operator_address
+        self.moniker = moniker
+        self.jailed = jailed
+        self.status = status
+        self._tokens = tokens
+        self._delegator_shares = delegator_shares
+        self._commission_rate = commission_rate
+
+    # builds a validator out of an entry of validators.
+    @classmethod
+    def from_dict(cls, validator):
+        rates = (validator.get('commission') or {}).get('commission_rates') or {}
+        return cls(validator['operator_address'], (validator.get('description') or {}).get('moniker'),
+                   validator.get('jailed', False), validator.get('status'), validator['tokens'],
+                   validator['delegator_shares'], rates.get('rate') or '0')
+
+    # tokens one share is worth.
+    def token_ratio(self):
+        return Decimal(self.tokens) / self.delegator_shares if self.delegator_shares else Decimal(0)
+
+    def __repr__(self):
+        return 'Validator(%r, %r, tokens=%s, jailed=%r)' % (self.operator_address, self.moniker, self.tokens,
+                                                           self.jailed)
+
+
+# weighted options of a vote as (option, weight) pairs.
+def parse_options(options):
+    return tuple((option['option'], Decimal(option['weight'])) for option in options)
+
+
+# vote of an address on a proposal, options being (option, weight) pairs.
+class Vote:
+    __slots__ = ('_proposal_id', 'voter', 'options')
+    proposal_id = Lazy(int)
+
+    def __init__(self, proposal_id, voter: str, options):
+        self._proposal_id = proposal_id
+        self.voter = voter
+        self.options = options
+
+    # builds a vote out of an entry of votes, the deprecated single option counting with a weight of 1.
+    @classmethod
+    def from_dict(cls, vote):
+        options = vote.get('options') or [{'option': vote['option'], 'weight': '1'}]
+        return cls(vote['proposal_id'], vote['voter'], parse_options(options))
+
+    # option carrying the most weight.
+    @property
+    def option(self):
+        return max(self.options, key=lambda option: option[1])[0] if self.options else None
+
+    def __repr__(self):
+        return 'Vote(%s, %r, %r)' % (self.proposal_id, self.voter, self.option)
+
+
+# tokens unbonding since creation_height until completion_time.
+class UnbondingEntry:
+    __slots__ = ('_creation_height', 'completion_time', '_initial_balance', '_balance')
+    creation_height = Lazy(int)
+    initial_balance = Lazy(int)
+    balance = Lazy(int)
+
+    def __init__(self, creation_height, completion_time: str, initial_balance, balance):
+        self._creation_height = creation_height
+        self.completion_time = completion_time
+        self._initial_balance = initial_balance
+        self._balance = balance
+
+    # builds an entry out of one of the entries of an unbonding response.
+    @classmethod
+    def from_dict(cls, entry):
+        return cls(entry['creation_height'], entry['completion_time'], entry['initial_balance'], entry['balance'])
+
+    def __repr__(self):
+        return 'UnbondingEntry(%s, %r, balance=%s)' % (self.creation_height, self.completion_time, self.balance)
+
+
+# unbonding delegations of a delegator from a validator.
+class Unbonding:
+    __slots__ = ('delegator_address', 'validator_address', 'entries')
+
+    def __init__(self, delegator_address: str, validator_address: str, entries):
+        self.delegator_address = delegator_address
+        self.validator_address = validator_address
+        self.entries = entries
+
+    # builds the unbonding delegations of a delegator from a validator out of an entry of unbonding_responses.
+    @classmethod
+    def from_dict(cls, unbonding):
+        return cls(unbonding['delegator_address'], unbonding['validator_address'],
+                   tuple(UnbondingEntry.from_dict(entry) for entry in unbonding['entries']))
+
+    # tokens still unbonding over every entry.
+    @property
+    def balance(self):
+        return sum(entry.balance for entry in self.entries)
+
+    def __repr__(self):
+        return 'Unbonding(%r, %r, balance=%s)' % (self.delegator_address, self.validator_address, self.balance)
+
+
+# model every entry of a paginated field is turned into when a client is built with models=True.
+FIELD_MODELS = {
+    'balances': Coin.from_dict,
+    'delegation_responses': Delegation.from_dict,
+    'unbonding_responses': Unbonding.from_dict,
+    'validators': Validator.from_dict,
+    'votes': Vote.from_dict,
+}
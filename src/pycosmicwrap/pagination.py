@@ -0,0 +1,175 @@
+# pyCosmicWrap is a Cosmos API/RPC python Wrapper
+# ChihuahuaChain - https://github.com/ChihuahuaChain/pyCosmicWrap
+#
+# License GNU General Public License v3.0
+#
+# https://choosealicense.com/licenses/gpl-3.0/
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from .concurrency import async_bounded_map, bounded_map
+
+# page size used by parallel pagination when no limit is given, the default of the Cosmos SDK.
+DEFAULT_PAGE_LIMIT = 100
+
+
+# builds the query string of a single page request.
+def page_params(params, limit=None, key=None):
+    params = dict(params or {})
+    if limit is not None:
+        params['pagination.limit'] = str(limit)
+    if key is not None:
+        params['pagination.key'] = key
+    return params
+
+
+# reads the cursor of the following page, None once the last page has been read.
+def next_page_key(results):
+    return (results.get('pagination') or {}).get('next_key')
+
+
+# reads pagination.total, 0 when the node did not count the entries.
+def page_total(results):
+    return int((results.get('pagination') or {}).get('total') or 0)
+
+
+# builds the query string of the first page of a parallel walk, asking the node to count the entries.
+def first_page_params(params, limit):
+    params = page_params(params, limit)
+    params['pagination.count_total'] = 'true'
+    return params
+
+
+# builds the query string of the page starting at offset.
+def offset_params(params, limit, offset):
+    params = page_params(params, limit)
+    params['pagination.offset'] = str(offset)
+    return params
+
+
+# lazily walks a paginated LCD endpoint one page at a time, so only a single page is held in memory.
+# key is the cursor of the page being read and next_key the cursor of the following one,
+# passing either of them back as key resumes the walk from that page.
+# with a concurrency above 1 a fresh walk counts the entries on the first request and fetches the
+# remaining pages by offset on that many threads, in order or as they complete when ordered is False.
+# nodes that do not return pagination.total are walked with the cursor instead.
+# model, when given, is called on every entry.
+class PageIterator:
+    def __init__(self, fetch, path: str, field: str, params=None, limit=None, key=None, concurrency=None,
+                 ordered: bool = True, model=None):
+        self.fetch = fetch
+        self.path = path
+        self.field = field
+        self.params = params
+        self.limit = limit
+        self.key = None
+        self.next_key = key
+        self.done = False
+        self.concurrency = concurrency
+        self.ordered = ordered
+        self.model = model
+
+    # entries of a page, turned into models when a model is given.
+    def _entries(self, results):
+        if self.model is None:
+            return results[self.field]
+        return [self.model(entry) for entry in results[self.field]]
+
+    # yields every page as the list of its entries.
+    def pages(self):
+        if self.concurrency and self.concurrency > 1 and self.next_key is None:
+            yield from self._parallel_pages()
+        while not self.done:
+            results = self.fetch(self.path, page_params(self.params, self.limit, self.next_key))
+            self.key = self.next_key
+            self.next_key = next_page_key(results)
+            self.done = self.next_key is None
+            yield self._entries(results)
+
+    def _parallel_pages(self):
+        limit = self.limit or DEFAULT_PAGE_LIMIT
+        results = self.fetch(self.path, first_page_params(self.params, limit))
+        self.next_key = next_page_key(results)
+        self.done = self.next_key is None
+        yield self._entries(results)
+        total = page_total(results)
+        if self.done or total <= limit:
+            return
+        for _, future in bounded_map(self._fetch_offset, range(limit, total, limit), self.concurrency,
+                                     ordered=self.ordered):
+            yield future.result()
+        self.key = self.next_key = None
+        self.done = True
+
+    def _fetch_offset(self, offset):
+        limit = self.limit or DEFAULT_PAGE_LIMIT
+        return self._entries(self.fetch(self.path, offset_params(self.params, limit, offset)))
+
+    def __iter__(self):
+        for page in self.pages():
+            yield from page
+
+
+# asyncio counterpart of PageIterator, to be used with async for.
+class AsyncPageIterator:
+    def __init__(self, fetch, path: str, field: str, params=None, limit=None, key=None, concurrency=None,
+                 ordered: bool = True, model=None):
+        self.fetch = fetch
+        self.path = path
+        self.field = field
+        self.params = params
+        self.limit = limit
+        self.key = None
+        self.next_key = key
+        self.done = False
+        self.concurrency = concurrency
+        self.ordered = ordered
+        self.model = model
+
+    # entries of a page, turned into models when a model is given.
+    def _entries(self, results):
+        if self.model is None:
+            return results[self.field]
+        return [self.model(entry) for entry in results[self.field]]
+
+    # yields every page as the list of its entries.
+    async def pages(self):
+        if self.concurrency and self.concurrency > 1 and self.next_key is None:
+            async for page in self._parallel_pages():
+                yield page
+        while not self.done:
+            results = await self.fetch(self.path, page_params(self.params, self.limit, self.next_key))
+            self.key = self.next_key
+            self.next_key = next_page_key(results)
+            self.done = self.next_key is None
+            yield self._entries(results)
+
+    async def _parallel_pages(self):
+        limit = self.limit or DEFAULT_PAGE_LIMIT
+        results = await self.fetch(self.path, first_page_params(self.params, limit))
+        self.next_key = next_page_key(results)
+        self.done = self.next_key is None
+        yield self._entries(results)
+        total = page_total(results)
+        if self.done or total <= limit:
+            return
+        async for _, task in async_bounded_map(self._fetch_offset, range(limit, total, limit), self.concurrency,
+                                               ordered=self.ordered):
+            yield task.result()
+        self.key = self.next_key = None
+        self.done = True
+
+    async def _fetch_offset(self, offset):
+        limit = self.limit or DEFAULT_PAGE_LIMIT
+        return self._entries(await self.fetch(self.path, offset_params(self.params, limit, offset)))
+
+    async def __aiter__(self):
+        async for page in self.pages():
+            for entry in page:
+                yield entry
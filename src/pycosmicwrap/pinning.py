@@ -0,0 +1,55 @@
+# pyCosmicWrap is a Cosmos API/RPC python Wrapper
+# ChihuahuaChain - https://github.com/ChihuahuaChain/pyCosmicWrap
+#
+# License GNU General Public License v3.0
+#
+# https://choosealicense.com/licenses/gpl-3.0/
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from contextvars import ContextVar
+
+# header asking the LCD to answer with the state of a given height.
+HEIGHT_HEADER = 'x-cosmos-block-height'
+
+# height the LCD queries of the current context are pinned to, None for the latest one.
+PINNED_HEIGHT = ContextVar('pinned_height', default=None)
+
+
+# headers of an LCD request pinned to height.
+def height_headers(height):
+    return {HEIGHT_HEADER: str(height)}
+
+
+# pins every LCD query run in its scope to a height, the threads of the batches and paginated queries
+# and the asyncio tasks started in it included. without a height the latest one of the LCD is read
+# when entering the scope, latest being the function or coroutine function reading it. entering the
+# scope returns the height.
+class HeightPin:
+    def __init__(self, height=None, latest=None):
+        self.height = height
+        self.latest = latest
+        self.token = None
+
+    def __enter__(self):
+        if self.height is None:
+            self.height = self.latest()
+        self.token = PINNED_HEIGHT.set(int(self.height))
+        return self.height
+
+    def __exit__(self, *exc_info):
+        PINNED_HEIGHT.reset(self.token)
+
+    async def __aenter__(self):
+        if self.height is None:
+            self.height = await self.latest()
+        return self.__enter__()
+
+    async def __aexit__(self, *exc_info):
+        self.__exit__()
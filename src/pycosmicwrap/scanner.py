@@ -0,0 +1,176 @@
+# pyCosmicWrap is a Cosmos API/RPC python Wrapper
+# ChihuahuaChain - https://github.com/ChihuahuaChain/pyCosmicWrap
+#
+# License GNU General Public License v3.0
+#
+# https://choosealicense.com/licenses/gpl-3.0/
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import asyncio
+import json
+import os
+import time
+
+from .concurrency import async_bounded_map, bounded_map
+from .jsonrpc import chunks, height_call
+
+
+# reads the latest height out of a query_status response.
+def latest_height(status):
+    return int(status['result']['sync_info']['latest_block_height'])
+
+
+# a block or block_results response of height, raising when it is a JSON-RPC error or holds no result so
+# that the scan stops, and its checkpoint stays, before a height it did not get.
+def checked_response(height, response):
+    if response is None:
+        return None
+    if 'error' in response:
+        raise Exception('height %s: the node answered with an error: %s' % (height, json.dumps(response['error'])))
+    if 'result' not in response:
+        raise Exception('height %s: no result in the response' % height)
+    return response
+
+
+# reads the last height processed from a checkpoint file, None when there is none yet.
+def read_checkpoint(path):
+    if path is None or not os.path.exists(path):
+        return None
+    with open(path) as checkpoint:
+        content = checkpoint.read().strip()
+    return int(content) if content else None
+
+
+# atomically replaces the checkpoint file so an interrupted write never loses the previous one.
+def write_checkpoint(path, height):
+    with open(path + '.tmp', 'w') as checkpoint:
+        checkpoint.write(str(height))
+    os.replace(path + '.tmp', path)
+
+
+# yields (height, block, block_results) tuples from start to end included, strictly in height order.
+# heights are fetched concurrently in a sliding window that only moves forward as the consumer reads,
+# so a slow consumer throttles the scan. block_results is None unless include_results is set and
+# block is None when include_blocks is not.
+# when checkpoint is a file path the last height handed to the consumer is saved there every
+# checkpoint_every blocks and a new scan resumes right after it. without an end the scanner
+# follows the chain tip, polling query_status every poll_interval seconds once it caught up.
+# with a batch_size the heights are fetched batch_size at a time in a single JSON-RPC batch POST.
+class BlockScanner:
+    def __init__(self, client, start: int, end=None, include_results: bool = True, concurrency: int = 8,
+                 window=None, checkpoint=None, checkpoint_every: int = 100, poll_interval: float = 5,
+                 batch_size=None, include_blocks: bool = True):
+        self.client = client
+        self.start = start
+        self.end = end
+        self.include_results = include_results
+        self.concurrency = concurrency
+        self.window = window
+        self.checkpoint = checkpoint
+        self.checkpoint_every = checkpoint_every
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.include_blocks = include_blocks
+        self.height = None
+
+    # first height to scan, right after the checkpoint when there is one.
+    def _first_height(self):
+        saved = read_checkpoint(self.checkpoint)
+        return self.start if saved is None else max(self.start, saved + 1)
+
+    def _save(self, height, force=False):
+        if self.checkpoint is not None and (force or (height - self.start + 1) % self.checkpoint_every == 0):
+            write_checkpoint(self.checkpoint, height)
+
+    # splits the heights from start to end into the units of work handed to the workers.
+    def _units(self, start, end):
+        return chunks(range(start, end + 1), self.batch_size or 1)
+
+    # the JSON-RPC calls fetching a unit in one batch, blocks first then block results.
+    def _batch_calls(self, heights):
+        calls = [height_call('block', height) for height in heights] if self.include_blocks else []
+        if self.include_results:
+            calls += [height_call('block_results', height) for height in heights]
+        return calls
+
+    def _batch_blocks(self, heights, responses):
+        blocks = responses[:len(heights)] if self.include_blocks else [None] * len(heights)
+        results = responses[-len(heights):] if self.include_results else [None] * len(heights)
+        return [(height, checked_response(height, block), checked_response(height, results))
+                for height, block, results in zip(heights, blocks, results)]
+
+    def _fetch(self, heights):
+        if self.batch_size:
+            calls = self._batch_calls(heights)
+            return self._batch_blocks(heights, self.client.rpc_batch(calls, len(calls)))
+        blocks = []
+        for height in heights:
+            results = self.client.query_block_results(height) if self.include_results else None
+            block = self.client.query_block(height) if self.include_blocks else None
+            blocks.append((height, checked_response(height, block), checked_response(height, results)))
+        return blocks
+
+    def __iter__(self):
+        height = self._first_height()
+        try:
+            while True:
+                end = self.end if self.end is not None else latest_height(self.client.query_status())
+                if height > end:
+                    if self.end is not None:
+                        return
+                    time.sleep(self.poll_interval)
+                    continue
+                for _, future in bounded_map(self._fetch, self._units(height, end), self.concurrency, self.window):
+                    for height, block, results in future.result():
+                        yield height, block, results
+                        self.height = height
+                        self._save(height)
+                height = end + 1
+        finally:
+            if self.height is not None:
+                self._save(self.height, force=True)
+
+
+# asyncio counterpart of BlockScanner, to be used with async for.
+class AsyncBlockScanner(BlockScanner):
+    async def _fetch(self, heights):
+        if self.batch_size:
+            calls = self._batch_calls(heights)
+            return self._batch_blocks(heights, await self.client.rpc_batch(calls, len(calls)))
+        blocks = []
+        for height in heights:
+            results = await self.client.query_block_results(height) if self.include_results else None
+            block = await self.client.query_block(height) if self.include_blocks else None
+            blocks.append((height, checked_response(height, block), checked_response(height, results)))
+        return blocks
+
+    def __iter__(self):
+        raise TypeError('AsyncBlockScanner is consumed with async for')
+
+    async def __aiter__(self):
+        height = self._first_height()
+        try:
+            while True:
+                end = self.end if self.end is not None else latest_height(await self.client.query_status())
+                if height > end:
+                    if self.end is not None:
+                        return
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+                async for _, task in async_bounded_map(self._fetch, self._units(height, end), self.concurrency,
+                                                       self.window):
+                    for height, block, results in task.result():
+                        yield height, block, results
+                        self.height = height
+                        self._save(height)
+                height = end + 1
+        finally:
+            if self.height is not None:
+                self._save(self.height, force=True)
@@ -0,0 +1,227 @@
+# pyCosmicWrap is a Cosmos API/RPC python Wrapper
+# ChihuahuaChain - https://github.com/ChihuahuaChain/pyCosmicWrap
+#
+# License GNU General Public License v3.0
+#
+# https://choosealicense.com/licenses/gpl-3.0/
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+# statuses telling the host is overloaded or unreachable, the requests failing with them are retried.
+RETRY_STATUSES = (429, 502, 503, 504)
+
+
+# seconds to wait from a Retry-After header, given in seconds or as an HTTP date, None without one.
+def retry_after(headers):
+    value = headers.get('Retry-After') if headers is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+# raised once the retries of a request failing with one of RETRY_STATUSES are spent.
+class RequestFailed(Exception):
+    def __init__(self, status: int, retry_after=None):
+        super().__init__('request failed with status %d' % status)
+        self.status = status
+        self.retry_after = retry_after
+
+
+# paces the requests sent to a single host. rate is the number of requests per second let through by a
+# token bucket holding up to burst of them, None for no limit. the number of requests in flight follows
+# an AIMD scheme: it is halved, down to min_concurrency, when the host answers with one of RETRY_STATUSES
+# or cannot be reached, then grows back by one every limit healthy responses up to max_concurrency, None
+# for no limit. a response with a 5xx status, or slower than latency_target, is not healthy. a Retry-After pauses the host.
+# GETs are retried up to retries times, waiting a random delay up to backoff * 2 ** attempt seconds,
+# bounded by max_backoff, or what Retry-After asked for. without retry_errors a host that cannot be reached
+# is not retried, the EndpointPool a transport belongs to fails over to the next endpoint instead.
+class Scheduler:
+    def __init__(self, rate=None, burst=None, max_concurrency=None, min_concurrency: int = 1, retries: int = 3,
+                 backoff: float = 0.5, max_backoff: float = 30, latency_target=None, retry_errors: bool = True):
+        self.rate = rate
+        self.burst = burst or max(1.0, rate or 1.0)
+        self.tokens = self.burst
+        self.refilled_at = time.monotonic()
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.limit = max_concurrency
+        self.in_flight = 0
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.latency_target = latency_target
+        self.retry_errors = retry_errors
+        self.paused_until = 0.0
+        self.decreased_at = 0.0
+        self.throttled = 0
+        self.retried = 0
+        self.lock = threading.Lock()
+        self.released = threading.Condition(self.lock)
+
+    # takes a token, and a slot in flight when slot, returning 0. otherwise returns the seconds to wait
+    # for a token, or None to wait for a slot. called with the lock held.
+    def _enter(self, slot: bool):
+        now = time.monotonic()
+        if now < self.paused_until:
+            return self.paused_until - now
+        if slot and self.limit is not None and self.in_flight + 1 > self.limit:
+            return None
+        if self.rate is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self.refilled_at) * self.rate)
+            self.refilled_at = now
+            if self.tokens < 1:
+                return (1 - self.tokens) / self.rate
+            self.tokens -= 1
+        if slot:
+            self.in_flight += 1
+        return 0
+
+    # waits until a request can be sent, with slot it then counts as in flight until released.
+    def acquire(self, slot: bool = True):
+        with self.released:
+            while True:
+                delay = self._enter(slot)
+                if delay == 0:
+                    return
+                self.released.wait(delay)
+
+    # waits for a token without taking a slot, for streams which stay open long.
+    def throttle(self):
+        self.acquire(False)
+
+    # frees the slot of a request sent at started, adjusting the concurrency limit to its outcome,
+    # status being None when the host could not be reached and 0 when the request was abandoned.
+    def release(self, started: float, status=None, wait=None):
+        now = time.monotonic()
+        healthy = status is not None and status < 500 and (
+            self.latency_target is None or now - started <= self.latency_target)
+        with self.released:
+            self.in_flight -= 1
+            if status is None or status in RETRY_STATUSES:
+                self.throttled += 1
+                if wait is not None:
+                    self.paused_until = max(self.paused_until, now + wait)
+                if started >= self.decreased_at:
+                    current = self.limit if self.limit is not None else self.in_flight + 1
+                    self.limit = max(self.min_concurrency, current / 2)
+                    self.decreased_at = now
+            elif status and self.limit is not None and healthy:
+                self.limit += 1 / self.limit
+                if self.max_concurrency is not None:
+                    self.limit = min(self.limit, self.max_concurrency)
+            self.released.notify_all()
+
+    # seconds before the next attempt of a request, attempt counting from 0.
+    def _backoff(self, attempt: int, wait=None):
+        if wait is not None:
+            return wait
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    # sends a request through the limits and returns what send returned after its status and headers.
+    # send returns a (status, headers, result) tuple and raises one of errors when the host cannot be
+    # reached. without retry the request is sent once.
+    def call(self, send, errors, retry: bool = True):
+        attempt = 0
+        while True:
+            self.acquire()
+            started = time.monotonic()
+            try:
+                status, headers, result = send()
+            except errors:
+                self.release(started)
+                if not retry or not self.retry_errors or attempt >= self.retries:
+                    raise
+                wait = None
+            except BaseException:
+                self.release(started, 0)
+                raise
+            else:
+                wait = retry_after(headers) if status in RETRY_STATUSES else None
+                self.release(started, status, wait)
+                if status not in RETRY_STATUSES:
+                    return result
+                if not retry or attempt >= self.retries:
+                    raise RequestFailed(status, wait)
+            self.retried += 1
+            time.sleep(self._backoff(attempt, wait))
+            attempt += 1
+
+    def __repr__(self):
+        return 'Scheduler(rate=%r, limit=%r, in_flight=%d, throttled=%d, retried=%d)' % (
+            self.rate, self.limit, self.in_flight, self.throttled, self.retried)
+
+
+# asyncio counterpart of Scheduler, the waits are coroutines.
+class AsyncScheduler(Scheduler):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.waiters = deque()
+
+    async def acquire(self, slot: bool = True):
+        while True:
+            with self.lock:
+                delay = self._enter(slot)
+            if delay == 0:
+                return
+            if delay is None:
+                waiter = asyncio.get_event_loop().create_future()
+                self.waiters.append(waiter)
+                await waiter
+            else:
+                await asyncio.sleep(delay)
+
+    async def throttle(self):
+        await self.acquire(False)
+
+    def release(self, started: float, status=None, wait=None):
+        super().release(started, status, wait)
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def call(self, send, errors, retry: bool = True):
+        attempt = 0
+        while True:
+            await self.acquire()
+            started = time.monotonic()
+            try:
+                status, headers, result = await send()
+            except errors:
+                self.release(started)
+                if not retry or not self.retry_errors or attempt >= self.retries:
+                    raise
+                wait = None
+            except BaseException:
+                self.release(started, 0)
+                raise
+            else:
+                wait = retry_after(headers) if status in RETRY_STATUSES else None
+                self.release(started, status, wait)
+                if status not in RETRY_STATUSES:
+                    return result
+                if not retry or attempt >= self.retries:
+                    raise RequestFailed(status, wait)
+            self.retried += 1
+            await asyncio.sleep(self._backoff(attempt, wait))
+            attempt += 1
@@ -0,0 +1,281 @@
+# pyCosmicWrap is a Cosmos API/RPC python Wrapper
+# ChihuahuaChain - https://github.com/ChihuahuaChain/pyCosmicWrap
+#
+# License GNU General Public License v3.0
+#
+# https://choosealicense.com/licenses/gpl-3.0/
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from array import array
+from decimal import Context, Decimal
+
+from .concurrency import async_bounded_map, bounded_map
+from .pinning import PINNED_HEIGHT
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+BONDED = 'BOND_STATUS_BONDED'
+
+# shares are decimals with 18 digits after the point, kept as integers of 10 ** -18 shares.
+SHARES_DECIMALS = 18
+SHARES_SCALE = 10 ** SHARES_DECIMALS
+EXACT = Context(prec=100)
+
+
+# operator address, moniker, tokens and bonded status of a validator, a dict or a Validator model.
+def validator_fields(validator):
+    if isinstance(validator, dict):
+        return (validator['operator_address'], (validator.get('description') or {}).get('moniker'),
+                int(validator['tokens']), validator.get('status') == BONDED)
+    return validator.operator_address, validator.moniker, int(validator.tokens), validator.status == BONDED
+
+
+# delegator address, shares and balance of an entry of delegation_responses, a dict or a Delegation model.
+def delegation_fields(entry):
+    if isinstance(entry, dict):
+        delegation = entry['delegation']
+        return (delegation['delegator_address'], delegation['shares'],
+                (entry.get('balance') or {}).get('amount') or '0')
+    return entry.delegator_address, entry.shares, entry.amount
+
+
+# shares, a decimal string or a Decimal, as an exact integer of 10 ** -18 shares.
+def scaled_shares(shares):
+    if isinstance(shares, str) and 'e' not in shares.lower():
+        whole, _, fraction = shares.partition('.')
+        return int(whole or '0') * SHARES_SCALE + int(fraction[:SHARES_DECIMALS].ljust(SHARES_DECIMALS, '0'))
+    return int(Decimal(shares).scaleb(SHARES_DECIMALS, EXACT))
+
+
+# integer column of values, as int64 unless one of them does not fit, float64 then.
+def int_column(values):
+    try:
+        return numpy.array(values, dtype=numpy.int64)
+    except OverflowError:
+        return numpy.array([float(value) for value in values], dtype=numpy.float64)
+
+
+# compact columns of the delegations of a single validator, read entry by entry.
+def delegation_columns(entries):
+    addresses, shares, balances = [], [], []
+    for entry in entries:
+        address, entry_shares, balance = delegation_fields(entry)
+        addresses.append(address)
+        shares.append(scaled_shares(entry_shares))
+        balances.append(int(balance))
+    return addresses, shares, balances
+
+
+# asyncio counterpart of delegation_columns, entries being an async iterable.
+async def async_delegation_columns(entries):
+    addresses, shares, balances = [], [], []
+    async for entry in entries:
+        address, entry_shares, balance = delegation_fields(entry)
+        addresses.append(address)
+        shares.append(scaled_shares(entry_shares))
+        balances.append(int(balance))
+    return addresses, shares, balances
+
+
+# gathers the delegations of every validator into flat columns, delegators being numbered
+# in the order they are first seen.
+class SnapshotBuilder:
+    def __init__(self, validators):
+        if numpy is None:
+            raise ImportError('snapshots require numpy, install it with pip install pycosmicwrap[analytics]')
+        fields = [validator_fields(validator) for validator in validators]
+        self.validators = [field[0] for field in fields]
+        self.monikers = [field[1] for field in fields]
+        self.tokens = [field[2] for field in fields]
+        self.bonded = [field[3] for field in fields]
+        self.delegators = []
+        self.delegator_index = {}
+        self.delegator_ids = array('i')
+        self.validator_ids = array('i')
+        self.shares = []
+        self.balances = array('q')
+
+    # appends the delegations of validator_id.
+    def add(self, validator_id: int, addresses, shares, balances):
+        index = self.delegator_index
+        for address in addresses:
+            delegator_id = index.get(address)
+            if delegator_id is None:
+                delegator_id = index[address] = len(self.delegators)
+                self.delegators.append(address)
+            self.delegator_ids.append(delegator_id)
+        self.validator_ids.extend([validator_id] * len(addresses))
+        self.shares.extend(shares)
+        count = len(self.balances)
+        try:
+            self.balances.extend(balances)
+        except OverflowError:
+            self.balances = array('d', self.balances[:count].tolist() + [float(balance) for balance in balances])
+
+    def snapshot(self, height=None):
+        return DelegationSnapshot(
+            self.validators, self.monikers, int_column(self.tokens), numpy.array(self.bonded, dtype=bool),
+            self.delegators, numpy.frombuffer(self.delegator_ids, dtype=numpy.int32),
+            numpy.frombuffer(self.validator_ids, dtype=numpy.int32), numpy.array(self.shares, dtype=object),
+            numpy.frombuffer(self.balances, dtype=numpy.int64 if self.balances.typecode == 'q' else numpy.float64),
+            height)
+
+
+# builds the DelegationSnapshot of every validator of the chain, the delegations of concurrency
+# validators being fetched at once. every query is pinned to the same height, the pinned one if any
+# or else the latest one, so that the snapshot is consistent.
+def build_snapshot(client, concurrency: int = 8):
+    with client.at_height(PINNED_HEIGHT.get()) as height:
+        builder = SnapshotBuilder(client.query_all_validators())
+
+        def fetch(validator_id):
+            return delegation_columns(client.iter_delegators(builder.validators[validator_id]))
+
+        for validator_id, future in bounded_map(fetch, range(len(builder.validators)), concurrency):
+            builder.add(validator_id, *future.result())
+    return builder.snapshot(height)
+
+
+# asyncio counterpart of build_snapshot.
+async def async_build_snapshot(client, concurrency: int = 8):
+    async with client.at_height(PINNED_HEIGHT.get()) as height:
+        builder = SnapshotBuilder(await client.query_all_validators())
+
+        async def fetch(validator_id):
+            return await async_delegation_columns(client.iter_delegators(builder.validators[validator_id]))
+
+        async for validator_id, task in async_bounded_map(fetch, range(len(builder.validators)), concurrency):
+            builder.add(validator_id, *task.result())
+    return builder.snapshot(height)
+
+
+# every delegation of the chain as columns, one row per delegation. delegator and validator are
+# dictionary encoded, delegator_ids and validator_ids indexing the delegators and validators lists.
+# shares are exact python integers of 10 ** -18 shares in an object column, float_shares being a float64
+# view of them. balances are int64, or float64 on chains where an amount does not fit in 64 bits.
+# validator_tokens and bonded hold the bonded tokens and the status of every validator, height the
+# height the snapshot was read at.
+class DelegationSnapshot:
+    def __init__(self, validators, monikers, validator_tokens, bonded, delegators, delegator_ids, validator_ids,
+                 shares, balances, height=None):
+        self.validators = validators
+        self.monikers = monikers
+        self.validator_tokens = validator_tokens
+        self.bonded = bonded
+        self.delegators = delegators
+        self.delegator_ids = delegator_ids
+        self.validator_ids = validator_ids
+        self.shares = shares
+        self.balances = balances
+        self.height = height
+
+    def __len__(self):
+        return len(self.delegator_ids)
+
+    def __repr__(self):
+        return 'DelegationSnapshot(%d delegations, %d delegators, %d validators)' % (
+            len(self), len(self.delegators), len(self.validators))
+
+    # the shares of every delegation as float64, which is enough for analytics but not exact.
+    def float_shares(self):
+        return self.shares.astype(numpy.float64) / SHARES_SCALE
+
+    # tokens delegated to every validator, in the order of validators.
+    def stake_by_validator(self):
+        return numpy.bincount(self.validator_ids, weights=self.balances, minlength=len(self.validators))
+
+    # tokens delegated by every delegator, in the order of delegators.
+    def stake_by_delegator(self):
+        return numpy.bincount(self.delegator_ids, weights=self.balances, minlength=len(self.delegators))
+
+    # share of the voting power of every validator, only the bonded ones holding some unless bonded_only is False.
+    def voting_power(self, bonded_only: bool = True):
+        tokens = self.validator_tokens.astype(numpy.float64)
+        if bonded_only:
+            tokens = numpy.where(self.bonded, tokens, 0.0)
+        total = tokens.sum()
+        return tokens / total if total else tokens
+
+    # smallest number of validators holding more than threshold of the voting power, a third halts the chain.
+    def nakamoto_coefficient(self, threshold: float = 1 / 3):
+        power = numpy.sort(self.voting_power())[::-1]
+        if not power.any():
+            return 0
+        return int(numpy.searchsorted(numpy.cumsum(power), threshold, side='right')) + 1
+
+    # the n validators with the most voting power as (address, moniker, share) tuples.
+    def top_validators(self, n: int = 10):
+        power = self.voting_power()
+        return [(self.validators[i], self.monikers[i], float(power[i])) for i in _top(power, n)]
+
+    # the n delegators with the most tokens delegated as (address, tokens) pairs.
+    def top_delegators(self, n: int = 10):
+        stake = self.stake_by_delegator()
+        return [(self.delegators[i], float(stake[i])) for i in _top(stake, n)]
+
+    # concentration of the stake by delegator or by validator: its gini coefficient, its
+    # herfindahl-hirschman index and the share held by the top percent of holders.
+    def concentration(self, by: str = 'delegator', percent: float = 1):
+        stake = self.stake_by_delegator() if by == 'delegator' else self.stake_by_validator()
+        stake = numpy.sort(stake[stake > 0])
+        total = stake.sum()
+        if not total:
+            return {'gini': 0.0, 'hhi': 0.0, 'top_share': 0.0}
+        count = len(stake)
+        gini = 2 * numpy.dot(numpy.arange(1, count + 1), stake) / (count * total) - (count + 1) / count
+        top = max(1, int(count * percent / 100))
+        return {'gini': float(gini), 'hhi': float(numpy.sum((stake / total) ** 2)),
+                'top_share': float(stake[-top:].sum() / total)}
+
+    # the columns and the dictionaries of the snapshot as numpy arrays.
+    def to_numpy(self):
+        return {'delegator_id': self.delegator_ids, 'validator_id': self.validator_ids, 'shares': self.shares,
+                'balance': self.balances, 'delegators': numpy.array(self.delegators, dtype=object),
+                'validators': numpy.array(self.validators, dtype=object)}
+
+    # the delegations as a pyarrow Table, delegator and validator being dictionary columns and shares an
+    # exact decimal128 column, decimal256 when a value needs more than 38 digits.
+    def to_arrow(self):
+        try:
+            import pyarrow
+        except ImportError:
+            raise ImportError('arrow exports require pyarrow, install it with pip install pycosmicwrap[analytics]')
+        return pyarrow.table({
+            'delegator': pyarrow.DictionaryArray.from_arrays(self.delegator_ids, pyarrow.array(self.delegators)),
+            'validator': pyarrow.DictionaryArray.from_arrays(self.validator_ids, pyarrow.array(self.validators)),
+            'shares': pyarrow.array([Decimal(value).scaleb(-SHARES_DECIMALS, EXACT) for value in self.shares],
+                                    type=_decimal_type(pyarrow, self.shares)),
+            'balance': self.balances,
+        })
+
+    # writes the delegations to a parquet file, options going to pyarrow.parquet.write_table.
+    def to_parquet(self, path, **options):
+        import pyarrow.parquet
+        pyarrow.parquet.write_table(self.to_arrow(), path, **options)
+
+
+# arrow decimal type holding every scaled shares value with its 18 decimals.
+def _decimal_type(pyarrow, shares):
+    largest = max((abs(value) for value in shares), default=0)
+    if largest < 10 ** 38:
+        return pyarrow.decimal128(38, SHARES_DECIMALS)
+    return pyarrow.decimal256(76, SHARES_DECIMALS)
+
+
+# indexes of the n largest values, largest first.
+def _top(values, n):
+    n = min(n, len(values))
+    if n == 0:
+        return []
+    top = numpy.argpartition(-values, n - 1)[:n]
+    return top[numpy.argsort(-values[top], kind='stable')]
@@ -0,0 +1,107 @@
+# pyCosmicWrap is a Cosmos API/RPC python Wrapper
+# ChihuahuaChain - https://github.com/ChihuahuaChain/pyCosmicWrap
+#
+# License GNU General Public License v3.0
+#
+# https://choosealicense.com/licenses/gpl-3.0/
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import sqlite3
+import threading
+import zlib
+
+from .decoding import loads
+
+# kind of record stored for each path prefix, the rest of the path is its height or its hash.
+STORED_PATHS = (
+    ('/block?height=', 'block'),
+    ('/block_results?height=', 'block_results'),
+    ('/cosmos/tx/v1beta1/txs/', 'tx'),
+)
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS block (height INTEGER PRIMARY KEY, data BLOB NOT NULL);
+CREATE TABLE IF NOT EXISTS block_results (height INTEGER PRIMARY KEY, data BLOB NOT NULL);
+CREATE TABLE IF NOT EXISTS tx (hash TEXT PRIMARY KEY, height INTEGER, data BLOB NOT NULL);
+CREATE INDEX IF NOT EXISTS tx_height ON tx (height);
+'''
+
+
+# persistent store of finalized blocks, block results and transactions in a local SQLite file.
+# payloads are the zlib compressed response bodies. the database runs in WAL mode, so any number
+# of processes can read it while another one writes, and every thread gets its own connection.
+class BlockStore:
+    def __init__(self, path: str, compression: int = 6, timeout: float = 30):
+        self.path = path
+        self.compression = compression
+        self.timeout = timeout
+        self.local = threading.local()
+        self._db().executescript(SCHEMA)
+
+    def _db(self):
+        db = getattr(self.local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            self.local.db = db
+        return db
+
+    # kind and key of the record a request path maps to, None when the path is not stored.
+    def locate(self, path: str):
+        for prefix, kind in STORED_PATHS:
+            if path.startswith(prefix):
+                key = path[len(prefix):]
+                if kind == 'tx':
+                    return (kind, key.upper()) if key else None
+                return (kind, int(key)) if key.isdigit() else None
+        return None
+
+    # raw response body of a record, None when it is not stored.
+    def get(self, kind: str, key):
+        column = 'hash' if kind == 'tx' else 'height'
+        row = self._db().execute('SELECT data FROM ' + kind + ' WHERE ' + column + ' = ?', (key,)).fetchone()
+        return zlib.decompress(row[0]) if row is not None else None
+
+    # stores the raw response body of a record, result is its decoded body.
+    def put(self, kind: str, key, body: bytes, result=None):
+        data = zlib.compress(body, self.compression)
+        if kind == 'tx':
+            height = int(((result or {}).get('tx_response') or {}).get('height') or 0) or None
+            self._db().execute('INSERT OR REPLACE INTO tx VALUES (?, ?, ?)', (key, height, data))
+        else:
+            self._db().execute('INSERT OR REPLACE INTO ' + kind + ' VALUES (?, ?)', (key, data))
+
+    # yields (height, response) of the stored blocks or block results from start to end included,
+    # for transactions (height, hash, response), in height order.
+    def read_range(self, kind: str, start: int, end: int):
+        if kind == 'tx':
+            rows = self._db().execute('SELECT height, hash, data FROM tx WHERE height BETWEEN ? AND ? '
+                                      'ORDER BY height', (start, end))
+            for height, tx_hash, data in rows:
+                yield height, tx_hash, loads(zlib.decompress(data))
+            return
+        rows = self._db().execute('SELECT height, data FROM ' + kind + ' WHERE height BETWEEN ? AND ? '
+                                  'ORDER BY height', (start, end))
+        for height, data in rows:
+            yield height, loads(zlib.decompress(data))
+
+    # heights between start and end included that are not stored yet.
+    def missing_heights(self, kind: str, start: int, end: int):
+        rows = self._db().execute('SELECT height FROM ' + kind + ' WHERE height BETWEEN ? AND ?', (start, end))
+        stored = {row[0] for row in rows}
+        return [height for height in range(start, end + 1) if height not in stored]
+
+    # closes the connection of the calling thread.
+    def close(self):
+        db = getattr(self.local, 'db', None)
+        if db is not None:
+            db.close()
+            self.local.db = None
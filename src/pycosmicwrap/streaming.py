@@ -0,0 +1,325 @@
+# pyCosmicWrap is a Cosmos API/RPC python Wrapper
+# ChihuahuaChain - https://github.com/ChihuahuaChain/pyCosmicWrap
+#
+# License GNU General Public License v3.0
+#
+# https://choosealicense.com/licenses/gpl-3.0/
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import codecs
+import json
+import os
+import re
+
+# size of the chunks a response body is read by.
+DEFAULT_STREAM_CHUNK = 1024 * 1024
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+STRING = re.compile(r'"((?:[^"\\]|\\.)*)"', re.S)
+STRING_PART = re.compile(r'(?:[^"\\]|\\.)*', re.S)
+STRUCTURE = re.compile(r'["{}\[\]]')
+SCALAR = re.compile(r'[^ \t\n\r,\]}]*')
+DECODER = json.JSONDecoder()
+
+
+# splits a dotted path such as app_state.bank.balances in its keys, an empty path is the whole document.
+def split_path(path):
+    if isinstance(path, str):
+        return path.split('.') if path else []
+    return list(path)
+
+
+# incremental JSON reader fed with chunks of a document, it only keeps the value being read in memory.
+# it yields the items of the array found at path one by one, the (key, value) members when it is an
+# object and the value itself otherwise. with raw it yields the text of that value piece by piece instead.
+# a top-level error_key member, such as the error of a JSON-RPC response, is raised as an Exception.
+class JSONPathReader:
+    def __init__(self, path, raw: bool = False, error_key: str = None):
+        self.path = split_path(path)
+        self.raw = raw
+        self.error_key = error_key
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.pos = 0
+        self.level = 0
+        self.state = 'value'
+        self.target = None
+        self.key = None
+        self.start = None
+        self.depth = 0
+        self.in_string = False
+        self.scanning = False
+        self.final = False
+
+    # feeds the next chunk of the document, bytes or text, and yields what became available as it is
+    # parsed. the generator has to be exhausted before the next chunk is fed.
+    def feed(self, chunk):
+        if isinstance(chunk, bytes):
+            chunk = self.decoder.decode(chunk)
+        self.buffer += chunk
+        yield from self._advance()
+        self._compact()
+
+    # tells the document is complete and yields what was still pending.
+    def close(self):
+        self.buffer += self.decoder.decode(b'', final=True)
+        self.final = True
+        yield from self._advance()
+        self.buffer = ''
+        self.pos = 0
+
+    def _compact(self):
+        keep = self.pos if self.start is None else self.start
+        if keep:
+            self.buffer = self.buffer[keep:]
+            self.pos -= keep
+            if self.start is not None:
+                self.start -= keep
+
+    def _skip_whitespace(self):
+        self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+        return self.buffer[self.pos] if self.pos < len(self.buffer) else None
+
+    # end of the object or array starting at start when the buffer holds all of it, None otherwise.
+    # it is handed to the C decoder, which goes much faster than scanning it.
+    def _decoded_end(self, start):
+        try:
+            return DECODER.raw_decode(self.buffer, start)[1]
+        except ValueError:
+            return None
+
+    # moves pos to the end of the value starting at pos, returns False while it is incomplete.
+    # the nested objects and arrays that are complete in the buffer are decoded at once, the others
+    # are scanned for their closing bracket.
+    def _scan(self):
+        buffer = self.buffer
+        if not self.scanning:
+            first = buffer[self.pos]
+            if first not in '{["':
+                end = SCALAR.match(buffer, self.pos).end()
+                if end == len(buffer) and not self.final:
+                    return False
+                self.pos = end
+                return True
+            self.depth = 0 if first == '"' else 1
+            self.in_string = first == '"'
+            self.scanning = True
+            self.pos += 1
+        while True:
+            if self.in_string:
+                self.pos = STRING_PART.match(buffer, self.pos).end()
+                if self.pos >= len(buffer) or buffer[self.pos] != '"':
+                    return False
+                self.pos += 1
+                self.in_string = False
+                if self.depth == 0:
+                    self.scanning = False
+                    return True
+                continue
+            found = STRUCTURE.search(buffer, self.pos)
+            if found is None:
+                self.pos = len(buffer)
+                return False
+            self.pos = found.end()
+            char = found.group()
+            if char == '"':
+                self.in_string = True
+            elif char in '{[':
+                end = self._decoded_end(self.pos - 1)
+                if end is None:
+                    self.depth += 1
+                else:
+                    self.pos = end
+            else:
+                self.depth -= 1
+                if self.depth == 0:
+                    self.scanning = False
+                    return True
+
+    # decodes the value starting at start once it is complete. objects, arrays and strings are handed to
+    # the C decoder first and only scanned while incomplete, numbers and literals are always scanned as
+    # their end is only known once a delimiter follows.
+    def _capture(self):
+        if not self.scanning and self.buffer[self.start] in '{["':
+            try:
+                value, self.pos = DECODER.raw_decode(self.buffer, self.start)
+                return True, value
+            except ValueError:
+                pass
+        if not self._scan():
+            return False, None
+        return True, json.loads(self.buffer[self.start:self.pos])
+
+    def _advance(self):
+        while self.state != 'done':
+            char = True if self.scanning else self._skip_whitespace()
+            if char is None:
+                return
+            if self.state == 'value':
+                if self.level == len(self.path):
+                    self.start = self.pos
+                    if self.raw:
+                        self.state = 'raw'
+                    elif char in '[{':
+                        self.target = char
+                        self.pos += 1
+                        self.start = None
+                        self.state = 'item' if char == '[' else 'key'
+                    else:
+                        self.state = 'capture'
+                elif char == '{':
+                    self.pos += 1
+                    self.state = 'key'
+                else:
+                    self.state = 'done'
+            elif self.state == 'key':
+                if char == ',':
+                    self.pos += 1
+                elif char == '}':
+                    self.state = 'done'
+                else:
+                    found = STRING.match(self.buffer, self.pos)
+                    if found is None:
+                        return
+                    self.key = json.loads(found.group())
+                    self.pos = found.end()
+                    self.state = 'colon'
+            elif self.state == 'colon':
+                self.pos += 1
+                if self.target == '{':
+                    self.state = 'member'
+                elif self.level == 0 and self.key == self.error_key:
+                    self.state = 'error'
+                elif self.key == self.path[self.level]:
+                    self.level += 1
+                    self.state = 'value'
+                else:
+                    self.state = 'skip'
+            elif self.state == 'member':
+                self.start = self.pos
+                self.state = 'capture'
+            elif self.state == 'item':
+                if char == ',':
+                    self.pos += 1
+                elif char == ']':
+                    self.state = 'done'
+                else:
+                    self.start = self.pos
+                    self.state = 'capture'
+            elif self.state == 'skip':
+                end = None if self.scanning or char not in '{[' else self._decoded_end(self.pos)
+                if end is not None:
+                    self.pos = end
+                elif not self._scan():
+                    return
+                self.state = 'key'
+            elif self.state == 'capture':
+                complete, value = self._capture()
+                if not complete:
+                    return
+                self.start = None
+                if self.target == '{':
+                    yield (self.key, value)
+                    self.state = 'key'
+                elif self.target == '[':
+                    yield value
+                    self.state = 'item'
+                else:
+                    yield value
+                    self.state = 'done'
+            elif self.state == 'error':
+                if self.start is None:
+                    self.start = self.pos
+                complete, value = self._capture()
+                if not complete:
+                    return
+                raise Exception('the node answered with an error: ' + json.dumps(value))
+            elif self.state == 'raw':
+                emitted = self.pos
+                complete = self._scan()
+                yield self.buffer[emitted:self.pos]
+                self.start = self.pos
+                if not complete:
+                    return
+                self.start = None
+                self.state = 'done'
+
+
+# yields the items found at path of a JSON document read from an iterable of chunks.
+def iter_json_items(chunks, path, error_key: str = None):
+    reader = JSONPathReader(path, error_key=error_key)
+    for chunk in chunks:
+        yield from reader.feed(chunk)
+    yield from reader.close()
+
+
+# yields the text of the value found at path of a JSON document read from an iterable of chunks.
+def iter_json_raw(chunks, path, error_key: str = None):
+    reader = JSONPathReader(path, True, error_key)
+    for chunk in chunks:
+        for text in reader.feed(chunk):
+            if text:
+                yield text
+    for text in reader.close():
+        if text:
+            yield text
+
+
+# asyncio counterpart of iter_json_items, chunks being an async iterable.
+async def async_iter_json_items(chunks, path, error_key: str = None):
+    reader = JSONPathReader(path, error_key=error_key)
+    async for chunk in chunks:
+        for item in reader.feed(chunk):
+            yield item
+    for item in reader.close():
+        yield item
+
+
+# asyncio counterpart of iter_json_raw, chunks being an async iterable.
+async def async_iter_json_raw(chunks, path, error_key: str = None):
+    reader = JSONPathReader(path, True, error_key)
+    async for chunk in chunks:
+        for text in reader.feed(chunk):
+            if text:
+                yield text
+    for text in reader.close():
+        if text:
+            yield text
+
+
+# writes chunks to sink and returns the number of bytes written. sink is a file path, written to a
+# temporary file moved in place once complete, anything with a write method or a callable.
+def write_stream(chunks, sink):
+    if isinstance(sink, (str, os.PathLike)):
+        with open(str(sink) + '.tmp', 'wb') as file:
+            written = write_stream(chunks, file)
+        os.replace(str(sink) + '.tmp', sink)
+        return written
+    write = getattr(sink, 'write', sink)
+    written = 0
+    for chunk in chunks:
+        write(chunk)
+        written += len(chunk)
+    return written
+
+
+# asyncio counterpart of write_stream, chunks being an async iterable.
+async def async_write_stream(chunks, sink):
+    if isinstance(sink, (str, os.PathLike)):
+        with open(str(sink) + '.tmp', 'wb') as file:
+            written = await async_write_stream(chunks, file)
+        os.replace(str(sink) + '.tmp', sink)
+        return written
+    write = getattr(sink, 'write', sink)
+    written = 0
+    async for chunk in chunks:
+        write(chunk)
+        written += len(chunk)
+    return written
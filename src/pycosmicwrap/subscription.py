@@ -0,0 +1,193 @@
+# pyCosmicWrap is a Cosmos API/RPC python Wrapper
+# ChihuahuaChain - https://github.com/ChihuahuaChain/pyCosmicWrap
+#
+# License GNU General Public License v3.0
+#
+# https://choosealicense.com/licenses/gpl-3.0/
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import asyncio
+import json
+import time
+
+from .decoding import loads
+
+try:
+    import websockets
+    from websockets.sync.client import connect
+except ImportError:
+    websockets = None
+
+# event queries of every new block and of every new transaction.
+NEW_BLOCK = "tm.event='NewBlock'"
+TX = "tm.event='Tx'"
+
+
+# websocket endpoint of an RPC url.
+def websocket_url(rpc: str):
+    if rpc.startswith('https://'):
+        rpc = 'wss://' + rpc[len('https://'):]
+    elif rpc.startswith('http://'):
+        rpc = 'ws://' + rpc[len('http://'):]
+    return rpc.rstrip('/') + '/websocket'
+
+
+# url of the RPC a subscription connects to, the best ranked one of an endpoint pool.
+def subscription_url(client):
+    if isinstance(client.rpc, str):
+        return websocket_url(client.rpc)
+    return websocket_url(client.rpc_transport.ranked()[0].url)
+
+
+def subscribe_message(query: str):
+    return json.dumps({'jsonrpc': '2.0', 'method': 'subscribe', 'id': 0, 'params': {'query': query}})
+
+
+# decodes a websocket message, returning its event or None for the acknowledgement of the subscription.
+def read_event(message):
+    message = loads(message)
+    if 'error' in message:
+        raise Exception('subscription failed: ' + json.dumps(message['error']))
+    result = message.get('result') or {}
+    return result if 'data' in result else None
+
+
+# height of a NewBlock or Tx event, None for other events.
+def event_height(event):
+    value = event['data'].get('value') or {}
+    if 'block' in value:
+        return int(value['block']['header']['height'])
+    if 'TxResult' in value:
+        return int(value['TxResult']['height'])
+    if 'height' in value:
+        return int(value['height'])
+    return None
+
+
+# NewBlock event rebuilt from a query_block response.
+def block_event(query: str, block):
+    return {'query': query, 'data': {'type': 'tendermint/event/NewBlock', 'value': {'block': block['result']['block']}},
+            'events': {}, 'backfilled': True}
+
+
+# Tx events rebuilt from query_block and query_block_results responses of the same height.
+def tx_events(query: str, block, block_results):
+    height = block_results['result']['height']
+    txs = block['result']['block']['data']['txs'] or []
+    results = block_results['result']['txs_results'] or []
+    return [{'query': query, 'data': {'type': 'tendermint/event/Tx', 'value': {
+        'TxResult': {'height': height, 'index': index, 'tx': tx, 'result': result}}}, 'events': {}, 'backfilled': True}
+        for index, (tx, result) in enumerate(zip(txs, results))]
+
+
+# iterator over the events matching query, delivered by the /websocket endpoint of the RPC.
+# the connection is opened again after any failure or after idle_timeout seconds without a message,
+# waiting from reconnect_delay up to max_reconnect_delay seconds between attempts. for NEW_BLOCK and
+# TX subscriptions the heights missed while disconnected are backfilled through query_block and
+# query_block_results, those events carry 'backfilled': True.
+class Subscription:
+    def __init__(self, client, query: str = NEW_BLOCK, backfill: bool = True, reconnect_delay: float = 1,
+                 max_reconnect_delay: float = 30, idle_timeout: float = 60):
+        if websockets is None:
+            raise ImportError('subscriptions require websockets, install it with pip install pycosmicwrap[websocket]')
+        self.client = client
+        self.query = query
+        self.backfill = backfill and query in (NEW_BLOCK, TX)
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.idle_timeout = idle_timeout
+        self.height = None
+        self.reconnects = 0
+        self.closed = False
+
+    def _missed(self, resumed_from, height):
+        if not self.backfill or resumed_from is None or height is None:
+            return range(0)
+        return range(resumed_from + 1, height)
+
+    def _backfill(self, heights):
+        for height in heights:
+            block = self.client.query_block(height)
+            if self.query == NEW_BLOCK:
+                yield block_event(self.query, block)
+            else:
+                yield from tx_events(self.query, block, self.client.query_block_results(height))
+
+    def __iter__(self):
+        delay = self.reconnect_delay
+        resumed_from = None
+        while not self.closed:
+            try:
+                with connect(subscription_url(self.client), max_size=None) as connection:
+                    connection.send(subscribe_message(self.query))
+                    delay = self.reconnect_delay
+                    while not self.closed:
+                        event = read_event(connection.recv(timeout=self.idle_timeout))
+                        if event is None:
+                            continue
+                        height = event_height(event)
+                        yield from self._backfill(self._missed(resumed_from, height))
+                        resumed_from = None
+                        yield event
+                        if height is not None:
+                            self.height = height
+            except (OSError, TimeoutError, websockets.WebSocketException):
+                if self.closed:
+                    return
+                resumed_from = self.height if resumed_from is None else resumed_from
+                self.reconnects += 1
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+
+    # stops the subscription once the current event has been handled.
+    def close(self):
+        self.closed = True
+
+
+# asyncio counterpart of Subscription, to be used with async for.
+class AsyncSubscription(Subscription):
+    def __iter__(self):
+        raise TypeError('AsyncSubscription is consumed with async for')
+
+    async def _backfill(self, heights):
+        for height in heights:
+            block = await self.client.query_block(height)
+            if self.query == NEW_BLOCK:
+                yield block_event(self.query, block)
+            else:
+                for event in tx_events(self.query, block, await self.client.query_block_results(height)):
+                    yield event
+
+    async def __aiter__(self):
+        delay = self.reconnect_delay
+        resumed_from = None
+        while not self.closed:
+            try:
+                async with websockets.connect(subscription_url(self.client), max_size=None) as connection:
+                    await connection.send(subscribe_message(self.query))
+                    delay = self.reconnect_delay
+                    while not self.closed:
+                        event = read_event(await asyncio.wait_for(connection.recv(), self.idle_timeout))
+                        if event is None:
+                            continue
+                        height = event_height(event)
+                        async for missed in self._backfill(self._missed(resumed_from, height)):
+                            yield missed
+                        resumed_from = None
+                        yield event
+                        if height is not None:
+                            self.height = height
+            except (OSError, asyncio.TimeoutError, websockets.WebSocketException):
+                if self.closed:
+                    return
+                resumed_from = self.height if resumed_from is None else resumed_from
+                self.reconnects += 1
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
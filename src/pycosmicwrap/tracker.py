@@ -0,0 +1,511 @@
+# pyCosmicWrap is a Cosmos API/RPC python Wrapper
+# ChihuahuaChain - https://github.com/ChihuahuaChain/pyCosmicWrap
+#
+# License GNU General Public License v3.0
+#
+# https://choosealicense.com/licenses/gpl-3.0/
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import base64
+import binascii
+import json
+import os
+import random
+import re
+import sqlite3
+from collections import deque
+from decimal import Decimal
+
+from .concurrency import async_bounded_map, bounded_map
+
+COINS = re.compile(r'(\d+)([a-zA-Z][a-zA-Z0-9/:._-]*)')
+
+# staking events moving delegated tokens, the delegator is an attribute of them since Cosmos SDK 0.47.
+STAKING_EVENTS = ('delegate', 'unbond', 'redelegate', 'cancel_unbonding_delegation')
+
+BECH32_CHARSET = 'qpzry9x8gf2tvdw0s3jn54khce6mua7l'
+BECH32_GENERATOR = (0x3b6a57b2, 0x26508e6d, 0x1ea119fa, 0x3d4233dd, 0x2a1462b3)
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS delegation (delegator TEXT, validator TEXT, amount TEXT NOT NULL,
+                                       PRIMARY KEY (delegator, validator));
+CREATE TABLE IF NOT EXISTS balance (address TEXT, denom TEXT, amount TEXT NOT NULL, PRIMARY KEY (address, denom));
+CREATE TABLE IF NOT EXISTS tracked (address TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+'''
+
+
+def _bech32_polymod(values):
+    checksum = 1
+    for value in values:
+        top = checksum >> 25
+        checksum = (checksum & 0x1ffffff) << 5 ^ value
+        for i, generator in enumerate(BECH32_GENERATOR):
+            if (top >> i) & 1:
+                checksum ^= generator
+    return checksum
+
+
+# bech32 address of data, a list of 5 bit values, under the human readable part hrp.
+def bech32_encode(hrp: str, data):
+    values = [ord(char) >> 5 for char in hrp] + [0] + [ord(char) & 31 for char in hrp] + list(data)
+    checksum = _bech32_polymod(values + [0] * 6) ^ 1
+    data = list(data) + [(checksum >> 5 * (5 - i)) & 31 for i in range(6)]
+    return hrp + '1' + ''.join(BECH32_CHARSET[value] for value in data)
+
+
+# account address of a validator operator address, chihuahuavaloper1... to chihuahua1..., the
+# account that signed create_validator and holds its self-delegation.
+def account_address(operator: str):
+    hrp, data = operator.rsplit('1', 1)
+    if hrp.endswith('valoper'):
+        hrp = hrp[:-len('valoper')]
+    return bech32_encode(hrp, [BECH32_CHARSET.index(char) for char in data[:-6]])
+
+
+# tells whether an attribute key is base64 encoded, as Tendermint 0.34 does with every key and value.
+def encoded_key(key):
+    try:
+        return base64.b64decode(key, validate=True).decode().isidentifier()
+    except (binascii.Error, ValueError):
+        return False
+
+
+# attributes of an event as a dict.
+def event_attributes(event):
+    attributes = event.get('attributes') or []
+    if attributes and encoded_key(attributes[0].get('key') or ''):
+        return {base64.b64decode(attribute.get('key') or '').decode():
+                base64.b64decode(attribute.get('value') or '').decode() for attribute in attributes}
+    return {attribute.get('key'): attribute.get('value') or '' for attribute in attributes}
+
+
+# (type, attributes) of the events of a transaction. before Cosmos SDK 0.47 staking events carry no
+# delegator, it is the sender of the staking message event emitted right after them.
+def tx_events(events):
+    pending = []
+    for event in events:
+        kind, attributes = event.get('type'), event_attributes(event)
+        if kind in STAKING_EVENTS and 'delegator' not in attributes:
+            pending.append((kind, attributes))
+            continue
+        if kind == 'message' and pending and attributes.get('module') == 'staking' and 'sender' in attributes:
+            for staking_kind, staking_attributes in pending:
+                staking_attributes['delegator'] = attributes['sender']
+                yield staking_kind, staking_attributes
+            pending = []
+        yield kind, attributes
+    yield from pending
+
+
+# (type, attributes) of every event of a query_block_results response in execution order. an error
+# response, from a pruned node or one behind the others, raises rather than reading as an empty block.
+def block_events(block_results):
+    if 'error' in block_results:
+        raise Exception('the node answered with an error: ' + json.dumps(block_results['error']))
+    if 'result' not in block_results and 'height' not in block_results:
+        raise Exception('no block results in the response')
+    result = block_results.get('result', block_results)
+    for event in result.get('begin_block_events') or []:
+        yield event.get('type'), event_attributes(event)
+    for tx in result.get('txs_results') or []:
+        yield from tx_events(tx.get('events') or [])
+    for event in (result.get('end_block_events') or []) + (result.get('finalize_block_events') or []):
+        yield event.get('type'), event_attributes(event)
+
+
+# amounts by denom of a list of coins such as 100uhuahua,5ibc/27394FB0.
+def parse_coins(text):
+    coins = {}
+    for amount, denom in COINS.findall(text or ''):
+        coins[denom] = coins.get(denom, 0) + int(amount)
+    return coins
+
+
+# delegator, validator and tokens of an entry of delegation_responses, a dict or a Delegation model.
+def delegation_entry(entry):
+    if isinstance(entry, dict):
+        delegation = entry['delegation']
+        return (delegation['delegator_address'], delegation['validator_address'],
+                int((entry.get('balance') or {}).get('amount') or 0))
+    return entry.delegator_address, entry.validator_address, int(entry.amount)
+
+
+# operator address and tokens per share of a validator, a dict or a Validator model.
+def validator_rate(validator):
+    if isinstance(validator, dict):
+        address, tokens, shares = validator['operator_address'], validator['tokens'], validator['delegator_shares']
+    else:
+        address, tokens, shares = validator.operator_address, validator.tokens, validator.delegator_shares
+    shares = Decimal(shares)
+    return address, Decimal(tokens) / shares if shares else Decimal(0)
+
+
+# amounts by denom of query_balances results, dicts or Coin models.
+def balance_entries(coins):
+    return {coin['denom']: int(coin['amount']) if isinstance(coin, dict) else int(coin.amount)
+            for coin in coins}
+
+
+# amounts by denom of every address of a query_balances_many result, raising when some of them could not
+# be read rather than leaving them out.
+def complete_balances(balances):
+    if balances.errors:
+        address, error = next(iter(balances.errors.items()))
+        raise Exception('could not read the balances of %d addresses, %s: %s'
+                        % (len(balances.errors), address, error)) from error
+    return {address: balance_entries(coins) for address, coins in balances.items()}
+
+
+# keeps the delegations of the whole chain, and the balances of the addresses tracked, current at the
+# latest height without pulling them again. start takes a full snapshot, or loads the state saved at path,
+# then follow applies the delegate, unbond, redelegate, cancel_unbonding_delegation and create_validator
+# events of every new block to the delegations and the coin_spent and coin_received events, transfer ones on chains without
+# them, to the balances. withdraw_rewards events only move coins from the distribution module, which the
+# coin events already cover. after a slash the delegations of the validators whose tokens per share dropped
+# are read again, as every one of them lost tokens. every reconcile_every blocks a sample of sample_size
+# delegators and addresses is compared with the LCD, differences above tolerance tokens are corrected and
+# kept in drift.
+class StateTracker:
+    def __init__(self, client, addresses=None, path=None, concurrency: int = 8, reconcile_every: int = 100,
+                 sample_size: int = 20, tolerance: int = 1, checkpoint_every: int = 100, poll_interval: float = 5):
+        self.client = client
+        self.addresses = set(addresses or ())
+        self.path = path
+        self.concurrency = concurrency
+        self.reconcile_every = reconcile_every
+        self.sample_size = sample_size
+        self.tolerance = tolerance
+        self.checkpoint_every = checkpoint_every
+        self.poll_interval = poll_interval
+        self.delegations = {}
+        self.balances = {}
+        self.height = None
+        self.reconciled_at = None
+        self.drift = deque(maxlen=1000)
+        self.events = {}
+        self.rates = {}
+        self.dirty_delegations = set()
+        self.dirty_balances = set()
+
+    # tokens delegated by a delegator to a validator.
+    def delegation(self, delegator: str, validator: str):
+        return self.delegations.get((delegator, validator), 0)
+
+    # delegations of a delegator by validator.
+    def delegations_of(self, delegator: str):
+        return {validator: amount for (address, validator), amount in self.delegations.items()
+                if address == delegator}
+
+    def _add_delegation(self, delegator, validator, amount):
+        key = (delegator, validator)
+        amount += self.delegations.get(key, 0)
+        if amount > 0:
+            self.delegations[key] = amount
+        else:
+            self.delegations.pop(key, None)
+        self.dirty_delegations.add(key)
+
+    def _add_balance(self, address, coins, sign):
+        if address not in self.addresses:
+            return
+        balance = self.balances.setdefault(address, {})
+        for denom, amount in coins.items():
+            balance[denom] = balance.get(denom, 0) + sign * amount
+            if balance[denom] <= 0:
+                del balance[denom]
+            self.dirty_balances.add((address, denom))
+
+    # tokens of the staking denom in the amount of a staking event, a bare number before Cosmos SDK 0.47.
+    def _staked(self, amount):
+        if amount.isdigit():
+            return int(amount)
+        coins = parse_coins(amount)
+        return coins.get(self.client.denom, sum(coins.values()) if len(coins) == 1 else 0)
+
+    # applies the events of a block to the state and tells whether a validator was slashed in it.
+    def apply(self, height: int, block_results):
+        events = list(block_events(block_results))
+        coin_events = any(kind in ('coin_spent', 'coin_received') for kind, _ in events)
+        slashed = False
+        for kind, attributes in events:
+            self.events[kind] = self.events.get(kind, 0) + 1
+            delegator = attributes.get('delegator')
+            if kind in ('delegate', 'cancel_unbonding_delegation') and delegator:
+                self._add_delegation(delegator, attributes['validator'], self._staked(attributes['amount']))
+            elif kind == 'create_validator':
+                validator = attributes['validator']
+                self._add_delegation(account_address(validator), validator, self._staked(attributes['amount']))
+            elif kind == 'unbond' and delegator:
+                self._add_delegation(delegator, attributes['validator'], -self._staked(attributes['amount']))
+            elif kind == 'redelegate' and delegator:
+                amount = self._staked(attributes['amount'])
+                self._add_delegation(delegator, attributes['source_validator'], -amount)
+                self._add_delegation(delegator, attributes['destination_validator'], amount)
+            elif kind == 'slash':
+                slashed = True
+            elif not self.addresses:
+                continue
+            elif kind == 'coin_spent':
+                self._add_balance(attributes.get('spender'), parse_coins(attributes.get('amount')), -1)
+            elif kind == 'coin_received':
+                self._add_balance(attributes.get('receiver'), parse_coins(attributes.get('amount')), 1)
+            elif kind == 'transfer' and not coin_events:
+                coins = parse_coins(attributes.get('amount'))
+                self._add_balance(attributes.get('sender'), coins, -1)
+                self._add_balance(attributes.get('recipient'), coins, 1)
+        self.height = height
+        return slashed
+
+    # reads the tokens per share of every validator and returns the ones that dropped since the last time.
+    def _update_rates(self, validators):
+        rates = dict(validator_rate(validator) for validator in validators)
+        dropped = [address for address, rate in rates.items() if rate < self.rates.get(address, rate)]
+        self.rates = rates
+        return dropped
+
+    def _set_delegations(self, validator, entries):
+        for key in [key for key in self.delegations if key[1] == validator]:
+            del self.delegations[key]
+            self.dirty_delegations.add(key)
+        for delegator, _, amount in entries:
+            if amount > 0:
+                self.delegations[(delegator, validator)] = amount
+                self.dirty_delegations.add((delegator, validator))
+
+    def _set_balance(self, address, balance):
+        for denom in set(self.balances.get(address, {})) | set(balance):
+            self.dirty_balances.add((address, denom))
+        self.balances[address] = balance
+
+    def _validator_delegations(self, validator):
+        return [delegation_entry(entry) for entry in self.client.iter_delegators(validator)]
+
+    # takes the full snapshot the events are applied to, pinned to the latest height, or loads the state
+    # saved at path. the tokens per share of the validators are not saved, they are read again at the
+    # height of the state so that the next slash is noticed.
+    def start(self):
+        if self.path is not None and os.path.exists(self.path):
+            self.load()
+            with self.client.at_height(self.height):
+                self._update_rates(self.client.query_all_validators())
+            self.track(self.addresses)
+            return self
+        with self.client.at_height() as height:
+            self._update_rates(self.client.query_all_validators())
+            validators = list(self.rates)
+            for validator, future in bounded_map(self._validator_delegations, validators, self.concurrency):
+                self._set_delegations(validator, future.result())
+            balances = complete_balances(self.client.query_balances_many(sorted(self.addresses), self.concurrency))
+        for address, balance in balances.items():
+            self._set_balance(address, balance)
+        self.height = self.reconciled_at = height
+        self.save()
+        return self
+
+    # reads again every delegation to a validator, at the height of the state.
+    def refresh_validator(self, validator: str):
+        with self.client.at_height(self.height):
+            self._set_delegations(validator, self._validator_delegations(validator))
+
+    # starts tracking the balance of more addresses, read at the height of the state.
+    def track(self, addresses):
+        addresses = [address for address in addresses if address not in self.balances]
+        with self.client.at_height(self.height):
+            balances = complete_balances(self.client.query_balances_many(addresses, self.concurrency))
+        self.addresses.update(addresses)
+        for address, balance in balances.items():
+            self._set_balance(address, balance)
+
+    def _sample(self, sample_size):
+        delegators = list({delegator for delegator, _ in random.sample(list(self.delegations),
+                                                                       min(sample_size, len(self.delegations)))})
+        addresses = random.sample(sorted(self.addresses), min(sample_size, len(self.addresses)))
+        return delegators, addresses
+
+    # corrects the state of the sampled delegators and addresses with what the LCD returned.
+    def _compare(self, height, delegations, balances):
+        found = []
+        sampled = set(delegations)
+        tracked = {}
+        for (delegator, validator), amount in self.delegations.items():
+            if delegator in sampled:
+                tracked[(delegator, validator)] = amount
+        actual = {}
+        for delegator, entries in delegations.items():
+            for entry in entries:
+                delegator, validator, amount = delegation_entry(entry)
+                actual[(delegator, validator)] = amount
+        for key in set(tracked) | set(actual):
+            if abs(tracked.get(key, 0) - actual.get(key, 0)) > self.tolerance:
+                found.append((height, key, tracked.get(key, 0), actual.get(key, 0)))
+            if tracked.get(key, 0) != actual.get(key, 0):
+                self._add_delegation(key[0], key[1], actual.get(key, 0) - tracked.get(key, 0))
+        for address, coins in balances.items():
+            balance = balance_entries(coins)
+            current = self.balances.get(address, {})
+            for denom in set(current) | set(balance):
+                if abs(current.get(denom, 0) - balance.get(denom, 0)) > self.tolerance:
+                    found.append((height, (address, denom), current.get(denom, 0), balance.get(denom, 0)))
+            self._set_balance(address, balance)
+        self.drift.extend(found)
+        self.reconciled_at = height
+        return found
+
+    # compares the state with the LCD for a sample of delegators and addresses, corrects what drifted and
+    # returns the differences found as (height, key, tracked, actual) tuples. the LCD is queried at the
+    # height of the state, so it runs while catching up too.
+    def reconcile(self, sample_size=None):
+        delegators, addresses = self._sample(sample_size or self.sample_size)
+        with self.client.at_height(self.height) as height:
+            delegations = self.client.query_delegations_by_address_many(delegators, self.concurrency)
+            balances = self.client.query_balances_many(addresses, self.concurrency)
+        return self._compare(height, delegations, balances)
+
+    def _reconcile_due(self):
+        return self.reconcile_every and self.height - (self.reconciled_at or 0) >= self.reconcile_every
+
+    # applies every new block as the chain grows and yields the heights applied, until end when given.
+    # the state is saved at path every checkpoint_every blocks and when following stops.
+    def follow(self, end=None):
+        if self.height is None:
+            self.start()
+        scanner = self.client.scan_blocks(self.height + 1, end, include_results=True, concurrency=self.concurrency,
+                                          poll_interval=self.poll_interval, include_blocks=False)
+        try:
+            for height, _, results in scanner:
+                if self.apply(height, results):
+                    with self.client.at_height(height):
+                        validators = self.client.query_all_validators()
+                    for validator in self._update_rates(validators):
+                        self.refresh_validator(validator)
+                if self._reconcile_due():
+                    self.reconcile()
+                if height % self.checkpoint_every == 0:
+                    self.save()
+                yield height
+        finally:
+            self.save()
+
+    def _db(self):
+        db = sqlite3.connect(self.path, isolation_level=None)
+        db.execute('PRAGMA journal_mode=WAL')
+        db.executescript(SCHEMA)
+        return db
+
+    # writes what changed since the last save to the SQLite file at path, if any.
+    def save(self):
+        if self.path is None or self.height is None:
+            return
+        db = self._db()
+        try:
+            db.execute('BEGIN')
+            for delegator, validator in self.dirty_delegations:
+                amount = self.delegations.get((delegator, validator))
+                if amount is None:
+                    db.execute('DELETE FROM delegation WHERE delegator = ? AND validator = ?', (delegator, validator))
+                else:
+                    db.execute('INSERT OR REPLACE INTO delegation VALUES (?, ?, ?)',
+                               (delegator, validator, str(amount)))
+            for address, denom in self.dirty_balances:
+                amount = self.balances.get(address, {}).get(denom)
+                if amount is None:
+                    db.execute('DELETE FROM balance WHERE address = ? AND denom = ?', (address, denom))
+                else:
+                    db.execute('INSERT OR REPLACE INTO balance VALUES (?, ?, ?)', (address, denom, str(amount)))
+            db.executemany('INSERT OR IGNORE INTO tracked VALUES (?)', [(address,) for address in self.addresses])
+            db.executemany('INSERT OR REPLACE INTO state VALUES (?, ?)',
+                           [('height', str(self.height)), ('reconciled_at', str(self.reconciled_at or 0))])
+            db.execute('COMMIT')
+        finally:
+            db.close()
+        self.dirty_delegations.clear()
+        self.dirty_balances.clear()
+
+    # reads the state saved at path.
+    def load(self):
+        db = self._db()
+        try:
+            state = dict(db.execute('SELECT key, value FROM state'))
+            self.delegations = {(delegator, validator): int(amount) for delegator, validator, amount in
+                                db.execute('SELECT delegator, validator, amount FROM delegation')}
+            self.balances = {row[0]: {} for row in db.execute('SELECT address FROM tracked')}
+            self.addresses.update(self.balances)
+            for address, denom, amount in db.execute('SELECT address, denom, amount FROM balance'):
+                self.balances.setdefault(address, {})[denom] = int(amount)
+        finally:
+            db.close()
+        self.height = int(state['height'])
+        self.reconciled_at = int(state.get('reconciled_at') or 0)
+
+
+# asyncio counterpart of StateTracker, follow being consumed with async for.
+class AsyncStateTracker(StateTracker):
+    async def _validator_delegations(self, validator):
+        return [delegation_entry(entry) async for entry in self.client.iter_delegators(validator)]
+
+    async def start(self):
+        if self.path is not None and os.path.exists(self.path):
+            self.load()
+            async with self.client.at_height(self.height):
+                self._update_rates(await self.client.query_all_validators())
+            await self.track(self.addresses)
+            return self
+        async with self.client.at_height() as height:
+            self._update_rates(await self.client.query_all_validators())
+            async for validator, task in async_bounded_map(self._validator_delegations, list(self.rates),
+                                                           self.concurrency):
+                self._set_delegations(validator, task.result())
+            balances = complete_balances(await self.client.query_balances_many(sorted(self.addresses),
+                                                                               self.concurrency))
+        for address, balance in balances.items():
+            self._set_balance(address, balance)
+        self.height = self.reconciled_at = height
+        self.save()
+        return self
+
+    async def refresh_validator(self, validator: str):
+        with self.client.at_height(self.height):
+            self._set_delegations(validator, await self._validator_delegations(validator))
+
+    async def track(self, addresses):
+        addresses = [address for address in addresses if address not in self.balances]
+        async with self.client.at_height(self.height):
+            balances = complete_balances(await self.client.query_balances_many(addresses, self.concurrency))
+        self.addresses.update(addresses)
+        for address, balance in balances.items():
+            self._set_balance(address, balance)
+
+    async def reconcile(self, sample_size=None):
+        delegators, addresses = self._sample(sample_size or self.sample_size)
+        with self.client.at_height(self.height) as height:
+            delegations = await self.client.query_delegations_by_address_many(delegators, self.concurrency)
+            balances = await self.client.query_balances_many(addresses, self.concurrency)
+        return self._compare(height, delegations, balances)
+
+    async def follow(self, end=None):
+        if self.height is None:
+            await self.start()
+        scanner = self.client.scan_blocks(self.height + 1, end, include_results=True, concurrency=self.concurrency,
+                                          poll_interval=self.poll_interval, include_blocks=False)
+        try:
+            async for height, _, results in scanner:
+                if self.apply(height, results):
+                    with self.client.at_height(height):
+                        validators = await self.client.query_all_validators()
+                    for validator in self._update_rates(validators):
+                        await self.refresh_validator(validator)
+                if self._reconcile_due():
+                    await self.reconcile()
+                if height % self.checkpoint_every == 0:
+                    self.save()
+                yield height
+        finally:
+            self.save()
@@ -0,0 +1,143 @@
+# pyCosmicWrap is a Cosmos API/RPC python Wrapper
+# ChihuahuaChain - https://github.com/ChihuahuaChain/pyCosmicWrap
+#
+# License GNU General Public License v3.0
+#
+# https://choosealicense.com/licenses/gpl-3.0/
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import functools
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from .metrics import CURRENT_REQUEST, collect_scheduler
+from .scheduler import RequestFailed, Scheduler, retry_after
+from .streaming import DEFAULT_STREAM_CHUNK
+
+# failures to reach the host, the GETs failing with them are retried.
+NETWORK_ERRORS = (requests.ConnectionError, requests.Timeout)
+
+
+# adds the time spent opening the connection to the request being measured, if any.
+class TimedConnection:
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        record = CURRENT_REQUEST.get()
+        if record is not None:
+            record.connect += time.perf_counter() - started
+
+
+class TimedHTTPConnection(TimedConnection, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(TimedConnection, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+# pooled, keep-alive HTTP session bound to a single LCD or RPC host.
+# timeout accepts either seconds or a (connect, read) tuple like requests does.
+# every request is paced by a Scheduler built with scheduler_options, which retries the GETs.
+# with metrics every attempt is measured and handed to its hooks.
+class Transport:
+    network_errors = NETWORK_ERRORS
+
+    def __init__(self, base_url: str, pool_size: int = 10, timeout=60, keep_alive: bool = True, gzip: bool = True,
+                 scheduler_options=None, metrics=None):
+        self.base_url = base_url.rstrip('/')
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['Accept-Encoding'] = 'gzip, deflate' if gzip else 'identity'
+        self.session.headers['Connection'] = 'keep-alive' if keep_alive else 'close'
+        self.scheduler = Scheduler(**(scheduler_options or {}))
+        self.metrics = metrics
+        if metrics is not None:
+            adapter.poolmanager.pool_classes_by_scheme = {'http': TimedHTTPConnectionPool,
+                                                          'https': TimedHTTPSConnectionPool}
+
+    def _send(self, method: str, path: str, retry: bool, **kwargs):
+        if self.metrics is not None:
+            send = functools.partial(self._measured, method, path, kwargs)
+        else:
+            send = functools.partial(self._request, method, path, kwargs)
+        return self.scheduler.call(send, NETWORK_ERRORS, retry)
+
+    def _request(self, method: str, path: str, kwargs):
+        response = self.session.request(method, self.base_url + path, **kwargs)
+        return response.status_code, response.headers, response.content
+
+    # sends a request like _send does, reading the body apart from the headers to time both.
+    def _measured(self, method: str, path: str, kwargs):
+        record = self.metrics.start(self.base_url, method, path, kwargs.get('params'))
+        token = CURRENT_REQUEST.set(record)
+        try:
+            response = self.session.request(method, self.base_url + path, stream=True, **kwargs)
+            received = time.perf_counter()
+            body = response.content
+        except Exception as error:
+            record.error = error
+            self.metrics.finish(record)
+            raise
+        finally:
+            CURRENT_REQUEST.reset(token)
+        record.wait = received - record.started - record.connect
+        record.transfer = time.perf_counter() - received
+        record.status = response.status_code
+        record.size = len(body)
+        self.metrics.finish(record)
+        return response.status_code, response.headers, body
+
+    # sets the gauges of the host in metrics, pool_size bounding the connections kept open.
+    def collect(self, metrics, role: str):
+        collect_scheduler(metrics, role, self.base_url, self.scheduler)
+        metrics.gauge('pool_size', (('role', role), ('host', self.base_url)), self.pool_size)
+
+    # sends a GET to the host and returns the raw response body.
+    def get(self, path: str, params=None, timeout=None, headers=None):
+        timeout = self.timeout if timeout is None else timeout
+        return self._send('GET', path, True, params=params, headers=headers, timeout=timeout)
+
+    # sends a POST with a JSON body to the host and returns the raw response body, it is never retried.
+    def post(self, path: str, data, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        headers = {'Content-Type': 'application/json'}
+        return self._send('POST', path, False, data=data, headers=headers, timeout=timeout)
+
+    # sends a GET to the host and yields the raw response body in chunks of up to chunk_size bytes
+    # as they arrive, the body is never held whole. timeout bounds every read, not the whole download.
+    # RequestFailed is raised when the host does not answer with a 2xx status.
+    def stream(self, path: str, params=None, timeout=None, chunk_size: int = DEFAULT_STREAM_CHUNK):
+        timeout = self.timeout if timeout is None else timeout
+        self.scheduler.throttle()
+        with self.session.get(self.base_url + path, params=params, timeout=timeout, stream=True) as response:
+            if not 200 <= response.status_code < 300:
+                raise RequestFailed(response.status_code, retry_after(response.headers))
+            yield from response.iter_content(chunk_size)
+
+    # releases every pooled connection.
+    def close(self):
+        self.session.close()
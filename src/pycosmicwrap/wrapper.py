@@ -13,481 +13,550 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-import json
-from urllib.parse import quote
-
-import requests
+import base64
+import functools
+
+from .batch import DEFAULT_BATCH_CONCURRENCY, BatchItem, BatchResult, batch_args
+from .cache import PERMANENT, ResponseCache, cache_key, cacheable
+from .concurrency import bounded_map
+from .decoding import loads
+from .endpoints import LCD_STATUS, RPC_STATUS, host_transport
+from .jsonrpc import DEFAULT_CHUNK_SIZE, batch_body, chunks, height_call, match_responses
+from .metrics import Metrics, instrument, transport_collector
+from .models import FIELD_MODELS
+from .pagination import PageIterator
+from .pinning import PINNED_HEIGHT, HeightPin, height_headers
+from .scanner import BlockScanner
+from .snapshot import build_snapshot
+from .streaming import DEFAULT_STREAM_CHUNK, iter_json_items, iter_json_raw, split_path, write_stream
+from .subscription import NEW_BLOCK, Subscription
+from .tracker import StateTracker
+from .transport import Transport
+
+PROPOSAL_STATUSES = {
+    'PROPOSAL_STATUS_UNSPECIFIED': '0',
+    'PROPOSAL_STATUS_DEPOSIT_PERIOD': '1',
+    'PROPOSAL_STATUS_VOTING_PERIOD': '2',
+    'PROPOSAL_STATUS_PASSED': '3',
+    'PROPOSAL_STATUS_REJECTED': '4',
+    'PROPOSAL_STATUS_FAILED': '5',
+}
 
 
 class CosmicWrap:
-    def __init__(self, lcd: str, rpc: str, denom: str):
+    # lcd and rpc are a url or a list of urls serving the same chain, spread by an EndpointPool
+    # configured with endpoint_options (max_lag, hedge_percentile, ...).
+    # transport is any callable building an object with get(path, params, timeout), post(path, data, timeout)
+    # and close(), it is called once per url so every query reuses the same pooled connections.
+    # cache is an optional ResponseCache, or True for one with the default policies, and store an optional
+    # BlockStore keeping blocks, block results and transactions on disk across runs.
+    # with models the entries of balances, validators, delegations, votes and unbondings are returned as
+    # the compact objects of pycosmicwrap.models instead of dicts.
+    # scheduler_options configure the Scheduler pacing and retrying the requests of every url (rate, retries, ...).
+    # metrics is an optional Metrics, or True for a new one, measuring every request by method and host.
+    def __init__(self, lcd, rpc, denom: str, timeout=60, pool_size: int = 10, keep_alive: bool = True,
+                 gzip: bool = True, transport=Transport, cache=None, store=None, endpoint_options=None,
+                 models: bool = False, scheduler_options=None, metrics=None):
         self.lcd = lcd
         self.rpc = rpc
         self.denom = denom
+        self.cache = ResponseCache() if cache is True else cache
+        self.store = store
+        self.models = models
+        self.metrics = Metrics() if metrics is True else metrics
+        self._loads = loads if self.metrics is None else self.metrics.loads
+        options = dict(pool_size=pool_size, timeout=timeout, keep_alive=keep_alive, gzip=gzip)
+        if scheduler_options is not None:
+            options['scheduler_options'] = scheduler_options
+        if self.metrics is not None:
+            options['metrics'] = self.metrics
+        self.lcd_transport = host_transport(lcd, transport, LCD_STATUS, endpoint_options, **options)
+        self.rpc_transport = host_transport(rpc, transport, RPC_STATUS, endpoint_options, **options)
+        if self.metrics is not None:
+            self.metrics.collectors.append(transport_collector(('lcd', self.lcd_transport),
+                                                               ('rpc', self.rpc_transport)))
+            instrument(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # closes the pooled connections of both hosts.
+    def close(self):
+        self.lcd_transport.close()
+        self.rpc_transport.close()
+
+    # compares the latest heights of the endpoints of each host given as a list of urls, leaving aside
+    # the lagging ones, and returns the height of every endpoint by host.
+    def check_endpoints(self):
+        return {host: transport.check_heights() for host, transport in
+                (('lcd', self.lcd_transport), ('rpc', self.rpc_transport)) if hasattr(transport, 'check_heights')}
+
+    # sends a GET to the LCD and decodes the JSON body, pinned to height or else to the height of at_height.
+    def _lcd_get(self, path, params=None, timeout=None, height=None):
+        height = PINNED_HEIGHT.get() if height is None else height
+        return self._get(self.lcd, self.lcd_transport, path, params, timeout, height)
+
+    # sends a GET to the RPC and decodes the JSON body.
+    def _rpc_get(self, path, params=None, timeout=None):
+        return self._get(self.rpc, self.rpc_transport, path, params, timeout)
+
+    # serves the request from the cache when its path has a policy, then from the store when the path
+    # is a stored record, before asking the node. successful responses are kept in both, the ones pinned
+    # to a height for good as the state of a past height never changes.
+    def _get(self, host, transport, path, params, timeout, height=None):
+        ttl = None if self.cache is None else PERMANENT if height is not None else self.cache.policy(path)
+        record = self.store.locate(path) if self.store is not None and not params else None
+        if ttl is None and record is None:
+            return self._loads(self._fetch(transport, path, params, timeout, height))
+        key = cache_key(host, path, params, height)
+        body = self.cache.get(key) if ttl is not None else None
+        if body is None and record is not None:
+            body = self.store.get(*record)
+            if body is not None and ttl is not None:
+                self.cache.put(key, body, ttl)
+        if body is not None:
+            return self._loads(body)
+        body = self._fetch(transport, path, params, timeout, height)
+        result = self._loads(body)
+        if cacheable(result):
+            if ttl is not None:
+                self.cache.put(key, body, ttl)
+            if record is not None:
+                self.store.put(record[0], record[1], body, result)
+        return result
+
+    # the headers are only passed when pinned so that custom transports without them keep working.
+    @staticmethod
+    def _fetch(transport, path, params, timeout, height):
+        if height is None:
+            return transport.get(path, params, timeout)
+        return transport.get(path, params, timeout, height_headers(height))
+
+    # lazily walks a paginated LCD endpoint, yielding the entries listed under field.
+    # the pages are read at the height pinned when it is created, wherever it is consumed.
+    def _paginate(self, path, field, params=None, limit=None, key=None, concurrency=None, ordered=True,
+                  timeout=None):
+        model = FIELD_MODELS.get(field) if self.models else None
+        get = functools.partial(self._lcd_get, timeout=timeout, height=PINNED_HEIGHT.get())
+        if self.metrics is not None:
+            get = self.metrics.paged(get)
+        return PageIterator(get, path, field, params, limit, key, concurrency, ordered, model)
+
+    # runs method once per item of args on concurrency threads and returns a BatchResult keyed by item,
+    # method is the name of a query or any callable and an item is a single argument or a tuple of arguments.
+    def batch(self, method, args, concurrency=DEFAULT_BATCH_CONCURRENCY):
+        return BatchResult(self.iter_batch(method, args, concurrency))
+
+    # same as batch, yielding a BatchItem per item as soon as its call completes.
+    def iter_batch(self, method, args, concurrency=DEFAULT_BATCH_CONCURRENCY, ordered=False):
+        method = getattr(self, method) if isinstance(method, str) else method
+        for item, future in bounded_map(lambda item: method(*batch_args(item)), args, concurrency, ordered=ordered):
+            yield BatchItem.from_future(item, future)
 
     # queries the balance of all coins for a single account.
-    def query_balances(self, address: str):
-        responses = []
+    def query_balances(self, address: str, concurrency=None, timeout=None):
+        return list(self.iter_balances(address, concurrency=concurrency, timeout=timeout))
+
+    # iterates over the balance of all coins for a single account page by page.
+    def iter_balances(self, address: str, limit=None, key=None, concurrency=None, ordered=True, timeout=None):
         endpoint = '/cosmos/bank/v1beta1/balances/'
-        try:
-            results = json.loads(requests.get(self.lcd + endpoint + address, timeout=60).content)
-            responses += results['balances']
-            pagination = results['pagination']['next_key']
-            while pagination is not None:
-                results = json.loads(
-                    requests.get(self.lcd + endpoint + '?pagination.key=' + quote(str(pagination)), timeout=60).content)
-                responses += results['balances']
-                pagination = results['pagination']['next_key']
-            return responses
-        except Exception:
-            raise Exception
+        return self._paginate(endpoint + address, 'balances',
+                              limit=limit, key=key, concurrency=concurrency, ordered=ordered, timeout=timeout)
+
+    # queries the balances of many addresses concurrently, returning a BatchResult keyed by address.
+    def query_balances_many(self, addresses, concurrency=DEFAULT_BATCH_CONCURRENCY, timeout=None):
+        return self.batch(functools.partial(self.query_balances, timeout=timeout), addresses, concurrency)
 
     # queries the balance of a given denom for a single account.
-    def query_balances_by_denom(self, address, denom):
+    def query_balances_by_denom(self, address, denom, timeout=None):
         endpoint = '/cosmos/bank/v1beta1/balances/'
-        try:
-            return json.loads(requests.get(self.lcd + endpoint + address + '/by_denom?denom=' + denom, timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._lcd_get(endpoint + address + '/by_denom?denom=' + denom, timeout=timeout)
 
     # queries the total supply of all coins.
-    def query_supply(self):
+    def query_supply(self, timeout=None):
         endpoint = '/cosmos/bank/v1beta1/supply'
-        try:
-            return json.loads(requests.get(self.lcd + endpoint, timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._lcd_get(endpoint, timeout=timeout)
 
     # queries the total supply of a given denom.
-    def query_supply_by_denom(self, denom):
+    def query_supply_by_denom(self, denom, timeout=None):
         denom = self.denom if denom is None else denom
         endpoint = '/cosmos/bank/v1beta1/supply/'
-        try:
-            return json.loads(requests.get(self.lcd + endpoint + denom, timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._lcd_get(endpoint + denom, timeout=timeout)
 
     # queries the community pool coins.
-    def query_community_pool(self):
+    def query_community_pool(self, timeout=None):
         endpoint = '/cosmos/distribution/v1beta1/community_pool'
-        try:
-            return json.loads(requests.get(self.lcd + endpoint, timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._lcd_get(endpoint, timeout=timeout)
 
     # queries the total rewards accrued by every validator.
-    def query_rewards(self, address):
+    def query_rewards(self, address, timeout=None):
         endpoint = '/cosmos/distribution/v1beta1/delegators/'
-        try:
-            return json.loads(requests.get(self.lcd + endpoint + address + '/rewards', timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._lcd_get(endpoint + address + '/rewards', timeout=timeout)
+
+    # queries the rewards of many addresses concurrently, returning a BatchResult keyed by address.
+    def query_rewards_many(self, addresses, concurrency=DEFAULT_BATCH_CONCURRENCY, timeout=None):
+        return self.batch(functools.partial(self.query_rewards, timeout=timeout), addresses, concurrency)
 
     # queries the total rewards accrued by a given validator.
-    def query_rewards_by_validator(self, address, validator):
+    def query_rewards_by_validator(self, address, validator, timeout=None):
         endpoint = '/cosmos/distribution/v1beta1/delegators/'
-        try:
-            return json.loads(requests.get(self.lcd + endpoint + address + '/rewards/' + validator, timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._lcd_get(endpoint + address + '/rewards/' + validator, timeout=timeout)
 
     # queries the validators of a delegator.
-    def query_delegator_validators(self, address):
+    def query_delegator_validators(self, address, timeout=None):
         endpoint = '/cosmos/distribution/v1beta1/delegators/'
-        try:
-            return json.loads(requests.get(self.lcd + endpoint + address + '/validators', timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._lcd_get(endpoint + address + '/validators', timeout=timeout)
 
     # queries withdraw address of a delegator.
-    def query_withdraw_address(self, address):
+    def query_withdraw_address(self, address, timeout=None):
         endpoint = '/cosmos/distribution/v1beta1/delegators/'
-        try:
-            return json.loads(requests.get(self.lcd + endpoint + address + '/withdraw_address', timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._lcd_get(endpoint + address + '/withdraw_address', timeout=timeout)
 
     # queries params of the distribution module.
-    def query_distribution_params(self):
+    def query_distribution_params(self, timeout=None):
         endpoint = '/cosmos/distribution/v1beta1/params'
-        try:
-            return json.loads(requests.get(self.lcd + endpoint, timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._lcd_get(endpoint, timeout=timeout)
 
     # queries accumulated commission for a validator.
-    def query_commission(self, validator):
+    def query_commission(self, validator, timeout=None):
         endpoint = '/cosmos/distribution/v1beta1/validators/'
-        try:
-            return json.loads(requests.get(self.lcd + endpoint + validator + '/commission', timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._lcd_get(endpoint + validator + '/commission', timeout=timeout)
 
     # queries accumulated rewards for a validator.
-    def query_outstanding_rewards(self, address):
+    def query_outstanding_rewards(self, address, timeout=None):
         endpoint = '/cosmos/distribution/v1beta1/validators/'
-        try:
-            return json.loads(requests.get(self.lcd + endpoint + address + '/outstanding_rewards', timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._lcd_get(endpoint + address + '/outstanding_rewards', timeout=timeout)
 
     # queries all proposals
-    def query_proposals(self, status=None):
-        responses = []
+    def query_proposals(self, status=None, concurrency=None, timeout=None):
+        return list(self.iter_proposals(status, concurrency=concurrency, timeout=timeout))
+
+    # iterates over all proposals page by page, optionally filtered by status
+    def iter_proposals(self, status=None, limit=None, key=None, concurrency=None, ordered=True, timeout=None):
         endpoint = '/cosmos/gov/v1beta1/proposals'
-        if status == 'PROPOSAL_STATUS_UNSPECIFIED':
-            endpoint += '?proposalStatus=0'
-        elif status == 'PROPOSAL_STATUS_DEPOSIT_PERIOD':
-            endpoint += '?proposalStatus=1'
-        elif status == 'PROPOSAL_STATUS_VOTING_PERIOD':
-            endpoint += '?proposalStatus=2'
-        elif status == 'PROPOSAL_STATUS_PASSED':
-            endpoint += '?proposalStatus=3'
-        elif status == 'PROPOSAL_STATUS_REJECTED':
-            endpoint += '?proposalStatus=4'
-        elif status == 'PROPOSAL_STATUS_FAILED':
-            endpoint += '?proposalStatus=5'
-        try:
-            results = json.loads(requests.get(self.lcd + endpoint, timeout=60).content)
-            responses += results['proposals']
-            pagination = results['pagination']['next_key']
-            while pagination is not None:
-                results = json.loads(
-                    requests.get(self.lcd + endpoint + '?pagination.key=' + quote(str(pagination)), timeout=60).content)
-                responses += results['proposals']
-                pagination = results['pagination']['next_key']
-            return responses
-        except Exception:
-            raise Exception
+        params = {'proposalStatus': PROPOSAL_STATUSES[status]} if status in PROPOSAL_STATUSES else None
+        return self._paginate(endpoint, 'proposals', params,
+                              limit=limit, key=key, concurrency=concurrency, ordered=ordered, timeout=timeout)
 
     # queries a proposal by a given id
-    def query_proposals_by_id(self, proposal_id):
+    def query_proposals_by_id(self, proposal_id, timeout=None):
         endpoint = '/cosmos/gov/v1beta1/proposals/'
-        try:
-            return json.loads(requests.get(self.lcd + endpoint + str(proposal_id), timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._lcd_get(endpoint + str(proposal_id), timeout=timeout)
 
     # queries the tally of a proposal by a given id
-    def query_tally(self, proposal_id):
+    def query_tally(self, proposal_id, timeout=None):
         endpoint = '/cosmos/gov/v1beta1/proposals/'
-        try:
-            return json.loads(requests.get(self.lcd + endpoint + str(proposal_id) + '/tally', timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._lcd_get(endpoint + str(proposal_id) + '/tally', timeout=timeout)
 
     # queries the votes of a proposal by a given id
-    def query_votes(self, proposal_id):
-        responses = []
+    def query_votes(self, proposal_id, concurrency=None, timeout=None):
+        return list(self.iter_votes(proposal_id, concurrency=concurrency, timeout=timeout))
+
+    # iterates over the votes of a proposal by a given id page by page.
+    def iter_votes(self, proposal_id, limit=None, key=None, concurrency=None, ordered=True, timeout=None):
         endpoint = '/cosmos/gov/v1beta1/proposals/'
-        try:
-            results = json.loads(requests.get(self.lcd + endpoint + str(proposal_id) + '/votes', timeout=60).content)
-            responses += results['votes']
-            pagination = results['pagination']['next_key']
-            while pagination is not None:
-                results = json.loads(
-                    requests.get(self.lcd + endpoint + str(proposal_id) + '/votes' + '?pagination.key=' + quote(
-                        str(pagination)), timeout=60).content)
-                responses += results['votes']
-                pagination = results['pagination']['next_key']
-            return responses
-        except Exception:
-            raise Exception
+        return self._paginate(endpoint + str(proposal_id) + '/votes', 'votes',
+                              limit=limit, key=key, concurrency=concurrency, ordered=ordered, timeout=timeout)
 
     # queries a voter of a given proposal.
-    def query_votes_by_address(self, proposal_id, address):
+    def query_votes_by_address(self, proposal_id, address, timeout=None):
         endpoint = '/cosmos/gov/v1beta1/proposals/'
-        try:
-            return json.loads(requests.get(self.lcd + endpoint + str(proposal_id) + '/votes/' + address, timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._lcd_get(endpoint + str(proposal_id) + '/votes/' + address, timeout=timeout)
 
     # queries the slashing parameters
-    def query_slashing_params(self):
+    def query_slashing_params(self, timeout=None):
         endpoint = '/cosmos/slashing/v1beta1/params'
-        try:
-            return json.loads(requests.get(self.lcd + endpoint, timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._lcd_get(endpoint, timeout=timeout)
 
     # queries delegations of a given address
-    def query_delegations_by_address(self, address):
+    def query_delegations_by_address(self, address, concurrency=None, timeout=None):
+        return list(self.iter_delegations_by_address(address, concurrency=concurrency, timeout=timeout))
+
+    # iterates over delegations of a given address page by page.
+    def iter_delegations_by_address(self, address, limit=None, key=None, concurrency=None, ordered=True, timeout=None):
         endpoint = '/cosmos/staking/v1beta1/delegations/'
-        responses = []
-        try:
-            results = json.loads(requests.get(self.lcd + endpoint + address, timeout=60).content)
-            responses += results['delegation_responses']
-            pagination = results['pagination']['next_key']
-            while pagination is not None:
-                results = json.loads(
-                    requests.get(self.lcd + endpoint + address + '?pagination.key=' + quote(str(pagination)), timeout=60).content)
-                responses += results['delegation_responses']
-                pagination = results['pagination']['next_key']
-            return responses
-        except Exception:
-            raise Exception
+        return self._paginate(endpoint + address, 'delegation_responses',
+                              limit=limit, key=key, concurrency=concurrency, ordered=ordered, timeout=timeout)
+
+    # queries the delegations of many addresses concurrently, returning a BatchResult keyed by address.
+    def query_delegations_by_address_many(self, addresses, concurrency=DEFAULT_BATCH_CONCURRENCY, timeout=None):
+        return self.batch(functools.partial(self.query_delegations_by_address, timeout=timeout), addresses, concurrency)
 
     # queries redelegations by a given address
-    def query_redelegation_by_address(self, address):
+    def query_redelegation_by_address(self, address, concurrency=None, timeout=None):
+        return list(self.iter_redelegation_by_address(address, concurrency=concurrency, timeout=timeout))
+
+    # iterates over redelegations by a given address page by page.
+    def iter_redelegation_by_address(self, address, limit=None, key=None, concurrency=None, ordered=True, timeout=None):
         endpoint = '/cosmos/staking/v1beta1/delegators/'
-        responses = []
-        try:
-            results = json.loads(requests.get(self.lcd + endpoint + address + '/redelegations', timeout=60).content)
-            responses += results['redelegation_responses']
-            pagination = results['pagination']['next_key']
-            while pagination is not None:
-                results = json.loads(requests.get(
-                    self.lcd + endpoint + address + '/redelegations?pagination.key=' + quote(str(pagination)), timeout=60).content)
-                responses += results['delegation_responses']
-                pagination = results['pagination']['next_key']
-            return responses
-        except Exception:
-            raise Exception
+        return self._paginate(endpoint + address + '/redelegations', 'redelegation_responses',
+                              limit=limit, key=key, concurrency=concurrency, ordered=ordered, timeout=timeout)
 
     # queries unbondings by a given address
-    def query_unbonding_by_address(self, address):
+    def query_unbonding_by_address(self, address, concurrency=None, timeout=None):
+        return list(self.iter_unbonding_by_address(address, concurrency=concurrency, timeout=timeout))
+
+    # iterates over unbondings by a given address page by page.
+    def iter_unbonding_by_address(self, address, limit=None, key=None, concurrency=None, ordered=True, timeout=None):
         endpoint = '/cosmos/staking/v1beta1/delegators/'
-        responses = []
-        try:
-            results = json.loads(requests.get(self.lcd + endpoint + address + '/unbonding_delegations', timeout=60).content)
-            responses += results['unbonding_responses']
-            pagination = results['pagination']['next_key']
-            while pagination is not None:
-                results = json.loads(requests.get(
-                    self.lcd + endpoint + address + '/unbonding_delegations?pagination.key=' + quote(
-                        str(pagination)), timeout=60).content)
-                responses += results['unbonding_responses']
-                pagination = results['pagination']['next_key']
-            return responses
-        except Exception:
-            raise Exception
+        return self._paginate(endpoint + address + '/unbonding_delegations', 'unbonding_responses',
+                              limit=limit, key=key, concurrency=concurrency, ordered=ordered, timeout=timeout)
+
+    # queries the unbondings of many addresses concurrently, returning a BatchResult keyed by address.
+    def query_unbonding_by_address_many(self, addresses, concurrency=DEFAULT_BATCH_CONCURRENCY, timeout=None):
+        return self.batch(functools.partial(self.query_unbonding_by_address, timeout=timeout), addresses, concurrency)
 
     # queries delegator data
-    def query_delegator_data(self, address):
+    def query_delegator_data(self, address, concurrency=None, timeout=None):
+        return list(self.iter_delegator_data(address, concurrency=concurrency, timeout=timeout))
+
+    # iterates over delegator data page by page.
+    def iter_delegator_data(self, address, limit=None, key=None, concurrency=None, ordered=True, timeout=None):
         endpoint = '/cosmos/staking/v1beta1/delegators/'
-        responses = []
-        try:
-            results = json.loads(requests.get(self.lcd + endpoint + address + '/validators', timeout=60).content)
-            responses += results['validators']
-            pagination = results['pagination']['next_key']
-            while pagination is not None:
-                results = json.loads(requests.get(
-                    self.lcd + endpoint + address + '/validators?pagination.key=' + quote(str(pagination)), timeout=60).content)
-                responses += results['validators']
-                pagination = results['pagination']['next_key']
-            return responses
-        except Exception:
-            raise Exception
+        return self._paginate(endpoint + address + '/validators', 'validators',
+                              limit=limit, key=key, concurrency=concurrency, ordered=ordered, timeout=timeout)
 
     # queries delegator data of a given address on a given validator
-    def query_delegator_data_by_validator(self, address, validator):
+    def query_delegator_data_by_validator(self, address, validator, timeout=None):
         endpoint = '/cosmos/staking/v1beta1/delegators/'
-        try:
-            return json.loads(requests.get(self.lcd + endpoint + address + '/validators/' + validator, timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._lcd_get(endpoint + address + '/validators/' + validator, timeout=timeout)
 
     # queries staking parameters
-    def query_staking_params(self):
+    def query_staking_params(self, timeout=None):
         endpoint = '/cosmos/staking/v1beta1/params'
-        try:
-            return json.loads(requests.get(self.lcd + endpoint, timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._lcd_get(endpoint, timeout=timeout)
 
     # queries staking pool
-    def query_staking_pool(self):
+    def query_staking_pool(self, timeout=None):
         endpoint = '/cosmos/staking/v1beta1/pool'
-        try:
-            return json.loads(requests.get(self.lcd + endpoint, timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._lcd_get(endpoint, timeout=timeout)
 
     # queries all the validators
-    def query_all_validators(self):
+    def query_all_validators(self, concurrency=None, timeout=None):
+        return list(self.iter_all_validators(concurrency=concurrency, timeout=timeout))
+
+    # iterates over all the validators page by page.
+    def iter_all_validators(self, limit=None, key=None, concurrency=None, ordered=True, timeout=None):
         endpoint = '/cosmos/staking/v1beta1/validators'
-        responses = []
-        try:
-            results = json.loads(requests.get(self.lcd + endpoint, timeout=60).content)
-            responses += results['validators']
-            pagination = results['pagination']['next_key']
-            while pagination is not None:
-                results = json.loads(
-                    requests.get(self.lcd + endpoint + '?pagination.key=' + quote(str(pagination)), timeout=60).content)
-                responses += results['validators']
-                pagination = results['pagination']['next_key']
-            return responses
-        except Exception:
-            raise Exception
+        return self._paginate(endpoint, 'validators',
+                              limit=limit, key=key, concurrency=concurrency, ordered=ordered, timeout=timeout)
 
     # queries a validator by a given address
-    def query_validator_by_address(self, address):
+    def query_validator_by_address(self, address, timeout=None):
         endpoint = '/cosmos/staking/v1beta1/validators/'
-        try:
-            return json.loads(requests.get(self.lcd + endpoint + address, timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._lcd_get(endpoint + address, timeout=timeout)
 
     # queries delegators of a given validator
-    def query_delegators(self, validator):
+    def query_delegators(self, validator, concurrency=None, timeout=None):
+        return list(self.iter_delegators(validator, concurrency=concurrency, timeout=timeout))
+
+    # iterates over delegators of a given validator page by page.
+    def iter_delegators(self, validator, limit=None, key=None, concurrency=None, ordered=True, timeout=None):
         endpoint = '/cosmos/staking/v1beta1/validators/'
-        responses = []
-        try:
-            results = json.loads(requests.get(self.lcd + endpoint + validator + '/delegations', timeout=60).content)
-            responses += results['delegation_responses']
-            pagination = results['pagination']['next_key']
-            while pagination is not None:
-                results = json.loads(requests.get(
-                    self.lcd + endpoint + validator + '/delegations?pagination.key=' + quote(str(pagination)), timeout=60).content)
-                responses += results['delegation_responses']
-                pagination = results['pagination']['next_key']
-            return responses
-        except Exception:
-            raise Exception
+        return self._paginate(endpoint + validator + '/delegations', 'delegation_responses',
+                              limit=limit, key=key, concurrency=concurrency, ordered=ordered, timeout=timeout)
 
     # queries a validator for a specific delegator address
-    def query_delegators_by_address(self, validator, address):
+    def query_delegators_by_address(self, validator, address, timeout=None):
         endpoint = '/cosmos/staking/v1beta1/validators/'
-        try:
-            return json.loads(requests.get(self.lcd + endpoint + validator + '/delegations/' + address, timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._lcd_get(endpoint + validator + '/delegations/' + address, timeout=timeout)
 
     # queries a validator for a specific unbonding address
-    def query_validator_unbonding_by_address(self, validator, address):
+    def query_validator_unbonding_by_address(self, validator, address, timeout=None):
         endpoint = '/cosmos/staking/v1beta1/validators/'
-        try:
-            return json.loads(requests.get(
-                self.lcd + endpoint + validator + '/delegations/' + address + '/unbonding_delegation', timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._lcd_get(endpoint + validator + '/delegations/' + address + '/unbonding_delegation',
+                             timeout=timeout)
 
     # queries all the unbonding of a give validator
-    def query_unbonding_from(self, validator):
+    def query_unbonding_from(self, validator, concurrency=None, timeout=None):
+        return list(self.iter_unbonding_from(validator, concurrency=concurrency, timeout=timeout))
+
+    # iterates over all the unbonding of a given validator page by page.
+    def iter_unbonding_from(self, validator, limit=None, key=None, concurrency=None, ordered=True, timeout=None):
         endpoint = '/cosmos/staking/v1beta1/validators/'
-        responses = []
-        try:
-            results = json.loads(requests.get(self.lcd + endpoint + validator + '/unbonding_delegations', timeout=60).content)
-            responses += results['unbonding_responses']
-            pagination = results['pagination']['next_key']
-            while pagination is not None:
-                results = json.loads(requests.get(
-                    self.lcd + endpoint + validator + '/unbonding_delegations?pagination.key=' + quote(
-                        str(pagination)), timeout=60).content)
-                responses += results['unbonding_responses']
-                pagination = results['pagination']['next_key']
-            return responses
-        except Exception:
-            raise Exception
+        return self._paginate(endpoint + validator + '/unbonding_delegations', 'unbonding_responses',
+                              limit=limit, key=key, concurrency=concurrency, ordered=ordered, timeout=timeout)
 
     # queries params of the mint module.
-    def query_mint_params(self):
+    def query_mint_params(self, timeout=None):
         endpoint = '/cosmos/mint/v1beta1/params'
-        try:
-            return json.loads(requests.get(self.lcd + endpoint, timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._lcd_get(endpoint, timeout=timeout)
 
     # queries inflation.
-    def query_inflation(self):
+    def query_inflation(self, timeout=None):
         endpoint = '/cosmos/mint/v1beta1/inflation'
-        try:
-            return json.loads(requests.get(self.lcd + endpoint, timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._lcd_get(endpoint, timeout=timeout)
 
     # queries annual provisions.
-    def query_annual_provisions(self):
+    def query_annual_provisions(self, timeout=None):
         endpoint = '/cosmos/mint/v1beta1/annual_provisions'
-        try:
-            return json.loads(requests.get(self.lcd + endpoint, timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._lcd_get(endpoint, timeout=timeout)
 
     # queries a given transaction hash
-    def query_tx(self, tx):
+    def query_tx(self, tx, timeout=None):
         endpoint = '/cosmos/tx/v1beta1/txs/'
-        try:
-            return json.loads(requests.get(self.lcd + endpoint + tx, timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._lcd_get(endpoint + tx, timeout=timeout)
+
+    # sends many JSON-RPC calls packed in POSTs of at most chunk_size calls, calls are (method, params) pairs
+    # and the responses come back in the same order. concurrency chunks are sent at once.
+    def rpc_batch(self, calls, chunk_size=DEFAULT_CHUNK_SIZE, concurrency=1, timeout=None):
+        post = functools.partial(self._rpc_post_batch, timeout=timeout)
+        responses = []
+        for _, future in bounded_map(post, chunks(calls, chunk_size), concurrency):
+            responses += future.result()
+        return responses
+
+    def _rpc_post_batch(self, calls, timeout=None):
+        return match_responses(calls, self._loads(self.rpc_transport.post('/', batch_body(calls), timeout)))
 
     # queries abci info.
-    def query_abci_info(self):
+    def query_abci_info(self, timeout=None):
         endpoint = '/abci_info?'
-        try:
-            return json.loads(requests.get(self.rpc + endpoint, timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._rpc_get(endpoint, timeout=timeout)
 
     # queries block by height.
-    def query_block(self, height):
+    def query_block(self, height, timeout=None):
         endpoint = '/block?height='
-        try:
-            return json.loads(requests.get(self.rpc + endpoint + str(height), timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._rpc_get(endpoint + str(height), timeout=timeout)
+
+    # queries many blocks by height with batched JSON-RPC calls, in the order of heights.
+    def query_block_many(self, heights, chunk_size=DEFAULT_CHUNK_SIZE, concurrency=1, timeout=None):
+        return self.rpc_batch([height_call('block', height) for height in heights], chunk_size, concurrency, timeout)
 
     # queries block results by height.
-    def query_block_results(self, height):
+    def query_block_results(self, height, timeout=None):
         endpoint = '/block_results?height='
-        try:
-            return json.loads(requests.get(self.rpc + endpoint + str(height), timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._rpc_get(endpoint + str(height), timeout=timeout)
+
+    # queries many block results by height with batched JSON-RPC calls, in the order of heights.
+    def query_block_results_many(self, heights, chunk_size=DEFAULT_CHUNK_SIZE, concurrency=1, timeout=None):
+        return self.rpc_batch([height_call('block_results', height) for height in heights], chunk_size, concurrency,
+                              timeout)
+
+    # scans blocks from start to end included in height order, fetching them concurrently.
+    # without an end it follows the chain tip, see BlockScanner for the checkpoint, window and batch options.
+    def scan_blocks(self, start, end=None, include_results=True, concurrency=8, window=None, checkpoint=None,
+                    checkpoint_every=100, poll_interval=5, batch_size=None, include_blocks=True):
+        return BlockScanner(self, start, end, include_results, concurrency, window, checkpoint, checkpoint_every,
+                            poll_interval, batch_size, include_blocks)
 
     # queries a commit.
-    def query_commit(self, height):
+    def query_commit(self, height, timeout=None):
         endpoint = '/commit?height='
-        try:
-            return json.loads(requests.get(self.rpc + endpoint + height, timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._rpc_get(endpoint + str(height), timeout=timeout)
+
+    # queries many commits by height with batched JSON-RPC calls, in the order of heights.
+    def query_commit_many(self, heights, chunk_size=DEFAULT_CHUNK_SIZE, concurrency=1, timeout=None):
+        return self.rpc_batch([height_call('commit', height) for height in heights], chunk_size, concurrency, timeout)
 
     # queries consensus state.
-    def query_consensus_state(self):
+    def query_consensus_state(self, timeout=None):
         endpoint = '/consensus_state?'
-        try:
-            return json.loads(requests.get(self.rpc + endpoint, timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._rpc_get(endpoint, timeout=timeout)
 
     # queries dump consensus state.
-    def query_dump_consensus_state(self):
+    def query_dump_consensus_state(self, timeout=None):
         endpoint = '/dump_consensus_state?'
-        try:
-            return json.loads(requests.get(self.rpc + endpoint, timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._rpc_get(endpoint, timeout=timeout)
 
     # queries genesis.
-    def query_genesis(self):
+    def query_genesis(self, timeout=None):
         endpoint = '/genesis?'
-        try:
-            return json.loads(requests.get(self.rpc + endpoint, timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._rpc_get(endpoint, timeout=timeout)
+
+    # where the genesis document is read from, the chunks of /genesis_chunked when the node serves it
+    # and the /genesis response otherwise, along with the path of the document in what is read.
+    def _genesis_source(self, chunk_size):
+        try:
+            first = self._rpc_get('/genesis_chunked?chunk=0')
+        except Exception:
+            first = None
+        if not isinstance(first, dict) or 'result' not in first:
+            return self.rpc_transport.stream('/genesis', None, None, chunk_size), ['result', 'genesis']
+        return self._genesis_chunks(first['result'], chunk_size), []
+
+    # the decoded /genesis_chunked chunks cut in pieces of up to chunk_size bytes.
+    def _genesis_chunks(self, first, chunk_size):
+        response = {'result': first}
+        for chunk in range(int(first['total'])):
+            if chunk:
+                response = self._rpc_get('/genesis_chunked?chunk=' + str(chunk))
+            data = base64.b64decode(response['result']['data'])
+            for start in range(0, len(data), chunk_size):
+                yield data[start:start + chunk_size]
+
+    # streams the raw genesis document without ever holding it whole, up to chunk_size bytes at a time of
+    # /genesis_chunked or of the /genesis response.
+    def stream_genesis(self, chunk_size: int = DEFAULT_STREAM_CHUNK):
+        source, path = self._genesis_source(chunk_size)
+        if not path:
+            yield from source
+            return
+        empty = True
+        for text in iter_json_raw(source, path, 'error'):
+            empty = False
+            yield text.encode()
+        if empty:
+            raise Exception('no genesis in the /genesis response')
+
+    # downloads the genesis document to sink, a file path or anything with a write method,
+    # and returns its size in bytes.
+    def download_genesis(self, sink, chunk_size: int = DEFAULT_STREAM_CHUNK):
+        return write_stream(self.stream_genesis(chunk_size), sink)
+
+    # yields one by one the items of the genesis section at path, such as app_state.bank.balances or
+    # app_state.staking.delegations, memory staying proportional to a single item. sections that are
+    # objects yield (key, value) pairs.
+    def iter_genesis(self, path: str, chunk_size: int = DEFAULT_STREAM_CHUNK):
+        source, prefix = self._genesis_source(chunk_size)
+        return iter_json_items(source, prefix + split_path(path), 'error' if prefix else None)
+
+    # yields one by one the transactions of a block without decoding the whole block.
+    def iter_block_txs(self, height, chunk_size: int = DEFAULT_STREAM_CHUNK):
+        source = self.rpc_transport.stream('/block', {'height': str(height)}, None, chunk_size)
+        return iter_json_items(source, 'result.block.data.txs', 'error')
 
     # queries network info.
-    def query_net_info(self):
+    def query_net_info(self, timeout=None):
         endpoint = '/net_info?'
-        try:
-            return json.loads(requests.get(self.rpc + endpoint, timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._rpc_get(endpoint, timeout=timeout)
 
     # queries the number of unconfirmed transactions.
-    def query_num_unconfirmed_txs(self):
+    def query_num_unconfirmed_txs(self, timeout=None):
         endpoint = '/num_unconfirmed_txs?'
-        try:
-            return json.loads(requests.get(self.rpc + endpoint, timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._rpc_get(endpoint, timeout=timeout)
 
     # queries the node status.
-    def query_status(self):
+    def query_status(self, timeout=None):
         endpoint = '/status?'
-        try:
-            return json.loads(requests.get(self.rpc + endpoint, timeout=60).content)
-        except Exception:
-            raise Exception
+        return self._rpc_get(endpoint, timeout=timeout)
+
+    # subscribes to the events matching query through the RPC websocket, NEW_BLOCK and TX being the most common
+    # ones, and returns an iterator over them that reconnects on failures and backfills the missed heights.
+    def subscribe(self, query=NEW_BLOCK, backfill=True, reconnect_delay=1, max_reconnect_delay=30, idle_timeout=60):
+        return Subscription(self, query, backfill, reconnect_delay, max_reconnect_delay, idle_timeout)
+
+    # pins the LCD queries run in the with block, in its threads and paginated queries included, to height so
+    # that they all read the same state, whichever endpoint answers them. without a height the latest one
+    # is read first. the with statement returns the height.
+    def at_height(self, height=None):
+        return HeightPin(height, self._latest_height)
+
+    # latest height of the LCD, never pinned.
+    def _latest_height(self):
+        return LCD_STATUS[1](self._get(self.lcd, self.lcd_transport, LCD_STATUS[0], None, None))
+
+    # builds a DelegationSnapshot of every delegation on the chain as numpy columns, reading the delegations
+    # of concurrency validators at once, for vectorized analytics and arrow or parquet exports.
+    def snapshot_delegations(self, concurrency=8):
+        return build_snapshot(self, concurrency)
+
+    # keeps the delegations of the chain, and the balances of addresses, current block after block by applying
+    # the events of block results to a first full snapshot. see StateTracker for the options.
+    def track_state(self, addresses=None, path=None, concurrency=8, reconcile_every=100, sample_size=20, tolerance=1,
+                    checkpoint_every=100, poll_interval=5):
+        return StateTracker(self, addresses, path, concurrency, reconcile_every, sample_size, tolerance,
+                            checkpoint_every, poll_interval)
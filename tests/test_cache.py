@@ -0,0 +1,133 @@
+# pyCosmicWrap is a Cosmos API/RPC python Wrapper
+# ChihuahuaChain - https://github.com/ChihuahuaChain/pyCosmicWrap
+#
+# License GNU General Public License v3.0
+#
+# https://choosealicense.com/licenses/gpl-3.0/
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+
+import pytest
+
+from pycosmicwrap import PERMANENT, CosmicWrap, ResponseCache
+from pycosmicwrap.cache import cache_key, cacheable
+
+HOST = 'http://127.0.0.1:1317'
+
+
+# clock moved by hand.
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def key(path, host=HOST):
+    return cache_key(host, path)
+
+
+def test_entries_expire_after_their_ttl():
+    clock = Clock()
+    cache = ResponseCache(clock=clock)
+    cache.put(key('/cosmos/staking/v1beta1/pool'), b'{}', 60)
+    cache.put(key('/block?height=5'), b'{"result": {}}', PERMANENT)
+    clock.now = 59.9
+    assert cache.get(key('/cosmos/staking/v1beta1/pool')) == b'{}'
+    clock.now = 60
+    assert cache.get(key('/cosmos/staking/v1beta1/pool')) is None
+    clock.now = 10 ** 9
+    assert cache.get(key('/block?height=5')) == b'{"result": {}}'
+    assert cache.stats()['entries'] == 1
+
+
+def test_least_recently_used_entries_are_evicted_by_count():
+    cache = ResponseCache(max_entries=2)
+    cache.put(key('/a'), b'a', 60)
+    cache.put(key('/b'), b'b', 60)
+    cache.get(key('/a'))
+    cache.put(key('/c'), b'c', 60)
+    assert cache.get(key('/b')) is None
+    assert cache.get(key('/a')) == b'a' and cache.get(key('/c')) == b'c'
+    assert cache.stats()['evictions'] == 1
+
+
+def test_entries_are_evicted_by_bytes():
+    cache = ResponseCache(max_bytes=10)
+    cache.put(key('/a'), b'aaaa', 60)
+    cache.put(key('/b'), b'bbbb', 60)
+    cache.put(key('/c'), b'cccc', 60)
+    assert cache.get(key('/a')) is None
+    assert cache.stats()['bytes'] == 8
+    cache.put(key('/huge'), b'x' * 11, 60)
+    assert cache.get(key('/huge')) is None
+    assert cache.stats()['entries'] == 2
+    cache.put(key('/b'), b'b', 60)
+    assert cache.stats()['bytes'] == 5
+
+
+def test_invalidate_by_prefix_and_host():
+    cache = ResponseCache()
+    other = 'http://127.0.0.1:26657'
+    cache.put(key('/block?height=1'), b'1', PERMANENT)
+    cache.put(key('/block?height=2', other), b'2', PERMANENT)
+    cache.put(key('/cosmos/staking/v1beta1/pool'), b'3', 60)
+    assert cache.invalidate('/block', host=HOST) == 1
+    assert cache.get(key('/block?height=2', other)) == b'2'
+    assert cache.invalidate() == 2
+    assert cache.stats()['entries'] == 0 and cache.stats()['bytes'] == 0
+
+
+def test_policies():
+    cache = ResponseCache()
+    assert cache.policy('/cosmos/staking/v1beta1/pool') == 60
+    assert cache.policy('/cosmos/bank/v1beta1/balances/chihuahua1') is None
+    cache.set_policy('/cosmos/bank/v1beta1/supply', 5)
+    assert cache.policy('/cosmos/bank/v1beta1/supply/uhuahua') == 5
+    cache.set_policy('/cosmos/staking/v1beta1/pool', None)
+    assert cache.policy('/cosmos/staking/v1beta1/pool') is None
+
+
+@pytest.mark.parametrize('result, expected', [
+    ({'result': {}}, True),
+    ([{'id': 0, 'result': {}}], True),
+    ({'code': 0, 'pool': {}}, True),
+    ({'jsonrpc': '2.0', 'error': {'code': -32603}}, False),
+    ({'code': 5, 'message': 'not found'}, False),
+    ('text', False),
+])
+def test_cacheable(result, expected):
+    assert cacheable(result) is expected
+
+
+# transport answering the bodies in turn and counting the requests.
+class Transport:
+    def __init__(self, url, **options):
+        self.bodies = [json.dumps({'jsonrpc': '2.0', 'id': -1, 'error': {'code': -32603}}).encode(),
+                       json.dumps({'jsonrpc': '2.0', 'id': -1, 'result': {'block': {}}}).encode()]
+        self.requests = 0
+
+    def get(self, path, params=None, timeout=None):
+        self.requests += 1
+        return self.bodies[min(self.requests, len(self.bodies)) - 1]
+
+    def close(self):
+        pass
+
+
+def test_error_bodies_are_not_cached():
+    client = CosmicWrap(HOST, HOST, 'uhuahua', transport=Transport, cache=True)
+    assert 'error' in client.query_block(5)
+    assert 'result' in client.query_block(5)
+    assert 'result' in client.query_block(5)
+    assert client.rpc_transport.requests == 2
+    assert client.cache.stats()['hits'] == 1
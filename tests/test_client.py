@@ -0,0 +1,115 @@
+# pyCosmicWrap is a Cosmos API/RPC python Wrapper
+# ChihuahuaChain - https://github.com/ChihuahuaChain/pyCosmicWrap
+#
+# License GNU General Public License v3.0
+#
+# https://choosealicense.com/licenses/gpl-3.0/
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import asyncio
+
+import pytest
+import requests
+
+from mock_server import Fixtures, serve
+from pycosmicwrap import AsyncCosmicWrap, CosmicWrap, RequestFailed
+from pycosmicwrap.pinning import PINNED_HEIGHT
+
+RETRY_FAST = {'retries': 1, 'backoff': 0.01}
+
+
+# url of a mock node answering every request with a 503.
+@pytest.fixture(scope='module')
+def unavailable():
+    server, url = serve(Fixtures(validators=2, delegations=10), error_rate=1, error_status=503)
+    yield url
+    server.shutdown()
+
+
+def test_request_failed_reaches_the_caller(unavailable):
+    client = CosmicWrap(unavailable, unavailable, 'uhuahua', scheduler_options=RETRY_FAST)
+    with pytest.raises(RequestFailed) as failure:
+        client.query_supply()
+    assert failure.value.status == 503
+    client.close()
+
+
+# url of a mock node taking half a second to answer.
+@pytest.fixture(scope='module')
+def slow():
+    server, url = serve(Fixtures(validators=2, delegations=10), latency=0.5)
+    yield url
+    server.shutdown()
+
+
+def test_timeout_of_a_single_query(slow):
+    client = CosmicWrap(slow, slow, 'uhuahua', scheduler_options={'retries': 0})
+    for query in (client.query_staking_params, client.query_all_validators, client.query_status,
+                  lambda timeout: client.query_block_many([1, 2], timeout=timeout)):
+        with pytest.raises(requests.exceptions.Timeout):
+            query(timeout=0.1)
+    assert client.query_staking_params(timeout=5)
+    assert len(client.query_all_validators()) == 2
+    client.close()
+
+
+# url of a mock node serving a small chain.
+@pytest.fixture(scope='module')
+def node():
+    server, url = serve(Fixtures(validators=3, delegations=250, balances=5, txs=2, height=5000))
+    yield url
+    server.shutdown()
+
+
+# runs query with an AsyncCosmicWrap of url and returns its result.
+def run_async(url, query):
+    pytest.importorskip('aiohttp')
+
+    async def run():
+        async with AsyncCosmicWrap(url, url, 'uhuahua') as client:
+            return await query(client)
+
+    return asyncio.run(run())
+
+
+def test_async_query(node):
+    status = run_async(node, lambda client: client.query_status())
+    assert status['result']['sync_info']['latest_block_height'] == '5000'
+
+
+def test_async_paginated_query(node):
+    async def query(client):
+        validator = (await client.query_all_validators())[0]['operator_address']
+        return [entry async for entry in client.iter_delegators(validator, limit=100, concurrency=3)]
+
+    delegations = run_async(node, query)
+    assert [int(entry['balance']['amount']) for entry in delegations] == list(range(1000000, 1000250))
+
+
+def test_async_batch(node):
+    blocks = run_async(node, lambda client: client.query_block_many([10, 11, 12]))
+    assert [block['result']['block']['header']['height'] for block in blocks] == ['10', '11', '12']
+    balances = run_async(node, lambda client: client.query_balances_many(['chihuahua1a', 'chihuahua1b']))
+    assert not balances.errors
+    assert sorted(balances) == ['chihuahua1a', 'chihuahua1b']
+    assert all(len(entries) == 5 for entries in balances.values())
+
+
+def test_async_at_height(node):
+    async def query(client):
+        async with client.at_height() as height:
+            assert PINNED_HEIGHT.get() == height
+            validators = await client.query_all_validators()
+        assert PINNED_HEIGHT.get() is None
+        return height, validators
+
+    height, validators = run_async(node, query)
+    assert height == 5000
+    assert len(validators) == 3
@@ -0,0 +1,43 @@
+# pyCosmicWrap is a Cosmos API/RPC python Wrapper
+# ChihuahuaChain - https://github.com/ChihuahuaChain/pyCosmicWrap
+#
+# License GNU General Public License v3.0
+#
+# https://choosealicense.com/licenses/gpl-3.0/
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from pycosmicwrap.endpoints import EndpointPool
+
+
+# transport answering every GET with the same body, it never fails.
+class Transport:
+    def __init__(self, url):
+        self.url = url
+
+    def get(self, path, params=None, timeout=None, headers=None):
+        return b'{}'
+
+
+def test_unmeasured_endpoints_rank_after_measured_ones():
+    pool = EndpointPool(['new', 'slow', 'fast', 'failing'], Transport, check_interval=None)
+    new, slow, fast, failing = pool.endpoints
+    assert pool.ranked() == [new, slow, fast, failing]
+    slow.record(0.5, True)
+    fast.record(0.1, True)
+    failing.record(1.0, False)
+    assert pool.ranked() == [fast, slow, new, failing]
+
+
+def test_requests_go_to_the_fastest_endpoint():
+    pool = EndpointPool(['new', 'fast'], Transport, check_interval=None)
+    pool.endpoints[1].record(0.1, True)
+    pool.get('/status')
+    assert pool.endpoints[0].latency is None
+    assert len(pool.endpoints[1].samples) == 2
@@ -0,0 +1,28 @@
+# pyCosmicWrap is a Cosmos API/RPC python Wrapper
+# ChihuahuaChain - https://github.com/ChihuahuaChain/pyCosmicWrap
+#
+# License GNU General Public License v3.0
+#
+# https://choosealicense.com/licenses/gpl-3.0/
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from pycosmicwrap import CosmicWrap
+
+NODE = 'http://127.0.0.1:26657'
+
+
+def test_lcd_and_rpc_on_the_same_url_are_collected_apart():
+    client = CosmicWrap(NODE, NODE, 'uhuahua', metrics=True)
+    client.rpc_transport.scheduler.retried = 2
+    stats = client.metrics.snapshot()
+    assert sorted((entry['role'], entry['value']) for entry in stats['retries_total']) == [('lcd', 0), ('rpc', 2)]
+    assert all(entry['host'] == NODE for entry in stats['pool_size'])
+    assert 'role="rpc",host="%s"} 2' % NODE in client.metrics.prometheus()
+    client.close()
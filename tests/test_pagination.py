@@ -0,0 +1,106 @@
+# pyCosmicWrap is a Cosmos API/RPC python Wrapper
+# ChihuahuaChain - https://github.com/ChihuahuaChain/pyCosmicWrap
+#
+# License GNU General Public License v3.0
+#
+# https://choosealicense.com/licenses/gpl-3.0/
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from pycosmicwrap.pagination import AsyncPageIterator, PageIterator
+
+ENTRIES = [{'address': 'chihuahua1' + str(i)} for i in range(1050)]
+
+
+# paginated endpoint serving ENTRIES by cursor or by offset, counting them only when count_total is asked
+# and counts is set. the pages near the start answer slowest, so that they complete last.
+class Endpoint:
+    def __init__(self, counts: bool = True, delay: float = 0.0):
+        self.counts = counts
+        self.delay = delay
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def page(self, params):
+        with self.lock:
+            self.requests.append(params)
+        limit = int(params.get('pagination.limit', 100))
+        key = params.get('pagination.key')
+        start = int(key[1:]) if key else int(params.get('pagination.offset', 0))
+        end = start + limit
+        pagination = {'next_key': 'k%d' % end if end < len(ENTRIES) else None}
+        if self.counts and params.get('pagination.count_total') == 'true':
+            pagination['total'] = str(len(ENTRIES))
+        return {'accounts': ENTRIES[start:end], 'pagination': pagination}, self.delay * (len(ENTRIES) - start)
+
+    def fetch(self, path, params):
+        results, delay = self.page(params)
+        time.sleep(delay)
+        return results
+
+    async def async_fetch(self, path, params):
+        results, delay = self.page(params)
+        await asyncio.sleep(delay)
+        return results
+
+
+def test_parallel_pages_are_read_by_offset_in_order():
+    endpoint = Endpoint(delay=0.00002)
+    entries = list(PageIterator(endpoint.fetch, '/accounts', 'accounts', concurrency=4))
+    assert entries == ENTRIES
+    assert endpoint.requests[0]['pagination.count_total'] == 'true'
+    offsets = sorted(int(params['pagination.offset']) for params in endpoint.requests[1:])
+    assert offsets == list(range(100, 1050, 100))
+    assert not any('pagination.key' in params for params in endpoint.requests)
+
+
+def test_unordered_parallel_pages_are_complete():
+    endpoint = Endpoint(delay=0.00002)
+    pages = list(PageIterator(endpoint.fetch, '/accounts', 'accounts', concurrency=4, ordered=False).pages())
+    assert sorted(entry['address'] for page in pages for entry in page) == sorted(entry['address']
+                                                                               for entry in ENTRIES)
+    assert len(pages) == 11
+    assert pages[0] == ENTRIES[:100]
+
+
+def test_cursor_is_used_without_a_total():
+    endpoint = Endpoint(counts=False)
+    iterator = PageIterator(endpoint.fetch, '/accounts', 'accounts', limit=200, concurrency=4)
+    assert list(iterator) == ENTRIES
+    assert [params.get('pagination.key') for params in endpoint.requests] == \
+        [None, 'k200', 'k400', 'k600', 'k800', 'k1000']
+    assert not any('pagination.offset' in params for params in endpoint.requests)
+    assert iterator.done and iterator.next_key is None
+
+
+def test_sequential_walk_resumes_from_a_key():
+    endpoint = Endpoint()
+    assert list(PageIterator(endpoint.fetch, '/accounts', 'accounts', key='k1000', concurrency=4)) == ENTRIES[1000:]
+    assert len(endpoint.requests) == 1
+
+
+@pytest.mark.parametrize('ordered', [True, False])
+def test_async_parallel_pages(ordered):
+    endpoint = Endpoint(delay=0.00002)
+
+    async def collect():
+        return [entry async for entry in AsyncPageIterator(endpoint.async_fetch, '/accounts', 'accounts',
+                                                           concurrency=4, ordered=ordered)]
+
+    entries = asyncio.run(collect())
+    if ordered:
+        assert entries == ENTRIES
+    else:
+        assert sorted(entry['address'] for entry in entries) == sorted(entry['address'] for entry in ENTRIES)
@@ -0,0 +1,62 @@
+# pyCosmicWrap is a Cosmos API/RPC python Wrapper
+# ChihuahuaChain - https://github.com/ChihuahuaChain/pyCosmicWrap
+#
+# License GNU General Public License v3.0
+#
+# https://choosealicense.com/licenses/gpl-3.0/
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import pytest
+
+from pycosmicwrap.scanner import BlockScanner, read_checkpoint
+
+ERROR = {'code': -32603, 'message': 'Internal error', 'data': 'height 15 is not available'}
+
+
+# node missing the heights in missing, which it answers with a JSON-RPC error.
+class Client:
+    def __init__(self, missing=()):
+        self.missing = set(missing)
+
+    def _response(self, height, kind):
+        if height in self.missing:
+            return {'jsonrpc': '2.0', 'id': -1, 'error': ERROR}
+        return {'jsonrpc': '2.0', 'id': -1, 'result': {'height': str(height), 'kind': kind}}
+
+    def query_block(self, height):
+        return self._response(height, 'block')
+
+    def query_block_results(self, height):
+        return self._response(height, 'block_results')
+
+    def rpc_batch(self, calls, chunk_size):
+        return [self._response(int(params['height']), method) for method, params in calls]
+
+
+@pytest.mark.parametrize('batch_size, saved', [(None, 14), (2, 13)])
+def test_error_responses_stop_the_scan_before_their_height(tmp_path, batch_size, saved):
+    checkpoint = str(tmp_path / 'checkpoint')
+    scanned = []
+    with pytest.raises(Exception, match='height 15'):
+        for height, block, results in BlockScanner(Client(missing=[15]), 10, 20, concurrency=1, window=1,
+                                                   checkpoint=checkpoint, checkpoint_every=1,
+                                                   batch_size=batch_size):
+            scanned.append(height)
+    assert scanned == list(range(10, saved + 1))
+    assert read_checkpoint(checkpoint) == saved
+    resumed = [height for height, _, _ in BlockScanner(Client(), 10, 20, checkpoint=checkpoint, batch_size=batch_size)]
+    assert resumed == list(range(saved + 1, 21))
+
+
+def test_responses_without_result_raise():
+    client = Client()
+    client.query_block = lambda height: {'jsonrpc': '2.0', 'id': -1}
+    with pytest.raises(Exception, match='no result'):
+        list(BlockScanner(client, 1, 3, include_results=False))
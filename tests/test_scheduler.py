@@ -0,0 +1,176 @@
+# pyCosmicWrap is a Cosmos API/RPC python Wrapper
+# ChihuahuaChain - https://github.com/ChihuahuaChain/pyCosmicWrap
+#
+# License GNU General Public License v3.0
+#
+# https://choosealicense.com/licenses/gpl-3.0/
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from email.utils import formatdate
+
+import pytest
+
+from pycosmicwrap import scheduler as scheduler_module
+from pycosmicwrap.scheduler import RequestFailed, Scheduler, retry_after
+
+
+# stands in for the time module of the scheduler, sleeping only moves the clock forward.
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return 1700000000.0 + self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(scheduler_module, 'time', clock)
+    return clock
+
+
+# send callable answering with responses in turn, an exception being raised instead of returned.
+def sender(*responses):
+    responses = list(responses)
+    calls = []
+
+    def send():
+        calls.append(len(calls))
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    return send, calls
+
+
+def test_retry_after_seconds_and_dates(clock):
+    assert retry_after({'Retry-After': '3'}) == 3.0
+    assert retry_after({'Retry-After': formatdate(clock.time() + 10, usegmt=True)}) == pytest.approx(10, abs=1)
+    assert retry_after({'Retry-After': 'soon'}) is None
+    assert retry_after({}) is None
+
+
+def test_429_is_retried_after_retry_after(clock):
+    scheduler = Scheduler(retries=3)
+    send, calls = sender((429, {'Retry-After': '2'}, None), (200, {}, 'ok'))
+    assert scheduler.call(send, ConnectionError) == 'ok'
+    assert len(calls) == 2
+    assert clock.sleeps == [2.0]
+    assert (scheduler.retried, scheduler.throttled, scheduler.in_flight) == (1, 1, 0)
+
+
+def test_retries_run_out(clock):
+    scheduler = Scheduler(retries=2, backoff=0.5)
+    send, calls = sender(*[(503, {}, None)] * 3)
+    with pytest.raises(RequestFailed) as failure:
+        scheduler.call(send, ConnectionError)
+    assert failure.value.status == 503
+    assert len(calls) == 3
+    assert len(clock.sleeps) == 2
+    assert all(0 <= delay <= 0.5 * 2 ** attempt for attempt, delay in enumerate(clock.sleeps))
+    assert scheduler.in_flight == 0
+
+
+def test_posts_are_sent_once(clock):
+    scheduler = Scheduler(retries=3)
+    send, calls = sender((503, {}, None))
+    with pytest.raises(RequestFailed):
+        scheduler.call(send, ConnectionError, retry=False)
+    assert len(calls) == 1
+
+
+def test_network_errors(clock):
+    send, calls = sender(ConnectionError(), (200, {}, 'ok'))
+    assert Scheduler(retries=1).call(send, ConnectionError) == 'ok'
+    assert len(calls) == 2
+    send, calls = sender(ConnectionError(), (200, {}, 'ok'))
+    with pytest.raises(ConnectionError):
+        Scheduler(retries=1, retry_errors=False).call(send, ConnectionError)
+    assert len(calls) == 1
+
+
+def test_other_errors_are_not_retried(clock):
+    scheduler = Scheduler(retries=3)
+    send, calls = sender(ValueError('bad body'))
+    with pytest.raises(ValueError):
+        scheduler.call(send, ConnectionError)
+    assert len(calls) == 1
+    assert scheduler.in_flight == 0
+
+
+def test_limit_halves_then_grows_back(clock):
+    scheduler = Scheduler(max_concurrency=8)
+    for _ in range(2):
+        scheduler.acquire()
+    started = clock.monotonic()
+    clock.now += 1
+    scheduler.release(started, 503)
+    scheduler.release(started, 503)
+    assert scheduler.limit == 4
+    for _ in range(4):
+        scheduler.acquire()
+        scheduler.release(clock.monotonic(), 200)
+    assert 4.9 < scheduler.limit < 5
+    for _ in range(100):
+        scheduler.acquire()
+        scheduler.release(clock.monotonic(), 200)
+    assert scheduler.limit == 8
+
+
+def test_unhealthy_responses_do_not_grow_the_limit(clock):
+    scheduler = Scheduler(max_concurrency=8, latency_target=1)
+    scheduler.limit = 4
+    for status in (500, 501, 200):
+        scheduler.acquire()
+        started = clock.monotonic()
+        if status == 200:
+            clock.now += 2
+        scheduler.release(started, status)
+    assert scheduler.limit == 4
+    assert scheduler.throttled == 0
+
+
+def test_in_flight_is_bounded_by_the_limit(clock):
+    scheduler = Scheduler(max_concurrency=2)
+    scheduler.acquire()
+    scheduler.acquire()
+    with scheduler.lock:
+        assert scheduler._enter(True) is None
+        assert scheduler._enter(False) == 0
+
+
+def test_token_bucket(clock):
+    scheduler = Scheduler(rate=2, burst=2)
+    with scheduler.lock:
+        assert scheduler._enter(False) == 0
+        assert scheduler._enter(False) == 0
+        assert scheduler._enter(False) == pytest.approx(0.5)
+        clock.now += 0.5
+        assert scheduler._enter(False) == 0
+
+
+def test_retry_after_pauses_the_host(clock):
+    scheduler = Scheduler()
+    scheduler.acquire()
+    scheduler.release(clock.monotonic(), 429, 5)
+    with scheduler.lock:
+        assert scheduler._enter(True) == pytest.approx(5)
+        clock.now += 5
+        assert scheduler._enter(True) == 0
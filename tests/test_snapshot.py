@@ -0,0 +1,66 @@
+# pyCosmicWrap is a Cosmos API/RPC python Wrapper
+# ChihuahuaChain - https://github.com/ChihuahuaChain/pyCosmicWrap
+#
+# License GNU General Public License v3.0
+#
+# https://choosealicense.com/licenses/gpl-3.0/
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from decimal import Decimal
+
+import pytest
+
+from pycosmicwrap.snapshot import SHARES_SCALE, SnapshotBuilder, delegation_columns, scaled_shares
+
+numpy = pytest.importorskip('numpy')
+
+VALIDATORS = [{'operator_address': 'valoper1', 'description': {'moniker': 'one'}, 'tokens': '100',
+               'status': 'BOND_STATUS_BONDED'}]
+
+
+# entry of delegation_responses.
+def delegation(delegator, shares, amount):
+    return {'delegation': {'delegator_address': delegator, 'validator_address': 'valoper1', 'shares': shares},
+            'balance': {'denom': 'uhuahua', 'amount': amount}}
+
+
+@pytest.mark.parametrize('shares, scaled', [
+    ('1000000.000000000000000000', 10 ** 24),
+    ('0.000000000000000001', 1),
+    ('123456789012345678.123456789012345678', 123456789012345678123456789012345678),
+    ('5', 5 * SHARES_SCALE),
+    (Decimal('999999999999999999999.999999999999999999'), 999999999999999999999999999999999999999),
+    ('1E+3', 1000 * SHARES_SCALE),
+])
+def test_scaled_shares_are_exact(shares, scaled):
+    assert scaled_shares(shares) == scaled
+
+
+def test_snapshot_keeps_exact_shares():
+    builder = SnapshotBuilder(VALIDATORS)
+    builder.add(0, *delegation_columns([delegation('a', '123456789012345678.123456789012345678', '1'),
+                                        delegation('b', '0.000000000000000001', '2')]))
+    snapshot = builder.snapshot(10)
+    assert snapshot.shares.tolist() == [123456789012345678123456789012345678, 1]
+    assert snapshot.float_shares().tolist() == [123456789012345678.123456789012345678, 1e-18]
+    assert snapshot.to_numpy()['shares'] is snapshot.shares
+
+
+def test_arrow_shares_are_decimals():
+    pyarrow = pytest.importorskip('pyarrow')
+    builder = SnapshotBuilder(VALIDATORS)
+    builder.add(0, *delegation_columns([delegation('a', '123456789012345678.123456789012345678', '1')]))
+    shares = builder.snapshot().to_arrow().column('shares')
+    assert shares.type == pyarrow.decimal128(38, 18)
+    assert shares.to_pylist() == [Decimal('123456789012345678.123456789012345678')]
+    builder.add(0, *delegation_columns([delegation('b', '1' + '0' * 25 + '.5', '1')]))
+    shares = builder.snapshot().to_arrow().column('shares')
+    assert shares.type == pyarrow.decimal256(76, 18)
+    assert shares.to_pylist()[1] == Decimal('1' + '0' * 25 + '.5')
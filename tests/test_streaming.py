@@ -0,0 +1,129 @@
+# pyCosmicWrap is a Cosmos API/RPC python Wrapper
+# ChihuahuaChain - https://github.com/ChihuahuaChain/pyCosmicWrap
+#
+# License GNU General Public License v3.0
+#
+# https://choosealicense.com/licenses/gpl-3.0/
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import asyncio
+import json
+
+import pytest
+
+from pycosmicwrap.streaming import (JSONPathReader, async_iter_json_items, iter_json_items, iter_json_raw,
+                                    split_path)
+
+GENESIS = {
+    'genesis_time': '2023-01-01T00:00:00Z',
+    'app_state': {
+        'auth': {'accounts': [{'address': 'chihuahua1' + str(i), 'nested': [[i], {'x': '}]'}]} for i in range(50)]},
+        'bank': {
+            'params': {'default_send_enabled': True},
+            'balances': [{'address': 'a"b\\c é ]}' + str(i), 'coins': [{'denom': 'uhuahua', 'amount': str(i)}]}
+                         for i in range(200)],
+            'supply': [],
+        },
+        'staking': {'params': {'unbonding_time': '1814400s', 'max_validators': 125}, 'last_total_power': '12'},
+    },
+}
+
+
+# cuts data in pieces of size, the last one possibly shorter.
+def pieces(data, size: int):
+    return [data[start:start + size] for start in range(0, len(data), size)]
+
+
+def test_split_path():
+    assert split_path('app_state.bank.balances') == ['app_state', 'bank', 'balances']
+    assert split_path('') == []
+    assert split_path(('a', 'b')) == ['a', 'b']
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 64, 4096, 1 << 20])
+@pytest.mark.parametrize('indent', [None, 2])
+def test_items_across_chunk_boundaries(size, indent):
+    document = json.dumps(GENESIS, indent=indent, ensure_ascii=False).encode()
+    balances = list(iter_json_items(pieces(document, size), 'app_state.bank.balances'))
+    assert balances == GENESIS['app_state']['bank']['balances']
+    accounts = list(iter_json_items(pieces(document, size), 'app_state.auth.accounts'))
+    assert accounts == GENESIS['app_state']['auth']['accounts']
+
+
+def test_object_members_and_scalars():
+    document = json.dumps(GENESIS).encode()
+    assert list(iter_json_items(pieces(document, 5), 'app_state.staking.params')) == \
+        [('unbonding_time', '1814400s'), ('max_validators', 125)]
+    assert list(iter_json_items(pieces(document, 5), 'app_state.staking.last_total_power')) == ['12']
+    assert list(iter_json_items(pieces(document, 5), 'app_state.bank.supply')) == []
+
+
+def test_numbers_and_literals_split_at_the_end():
+    document = b'{"a": {"b": 12345}, "c": [true, null, -1.5e3, 0]}'
+    for size in range(1, len(document)):
+        assert list(iter_json_items(pieces(document, size), 'a.b')) == [12345]
+        assert list(iter_json_items(pieces(document, size), 'c')) == [True, None, -1.5e3, 0]
+
+
+def test_multibyte_characters_split_between_chunks():
+    document = json.dumps({'memo': ['é🐶', 'ü']}, ensure_ascii=False).encode()
+    for size in range(1, len(document)):
+        assert list(iter_json_items(pieces(document, size), 'memo')) == ['é🐶', 'ü']
+
+
+def test_missing_path_yields_nothing():
+    document = json.dumps(GENESIS).encode()
+    assert list(iter_json_items(pieces(document, 9), 'app_state.missing')) == []
+    assert list(iter_json_items(pieces(document, 9), 'genesis_time.deeper')) == []
+
+
+@pytest.mark.parametrize('size', [1, 13, 4096])
+def test_raw_value(size):
+    document = json.dumps(GENESIS, indent=1).encode()
+    text = ''.join(iter_json_raw(pieces(document, size), 'app_state.bank'))
+    assert json.loads(text) == GENESIS['app_state']['bank']
+    assert json.loads(''.join(iter_json_raw(pieces(document, size), ''))) == GENESIS
+
+
+def test_feed_yields_items_lazily():
+    reader = JSONPathReader('items')
+    items = reader.feed(b'{"items": [1, 2, 3')
+    assert next(items) == 1
+    assert next(items) == 2
+    assert list(items) == []
+    assert list(reader.feed(b']}')) == [3]
+    assert list(reader.close()) == []
+
+
+def test_error_member_is_raised():
+    response = b'{"jsonrpc": "2.0", "id": -1, "error": {"code": -32603, "message": "Internal error", ' \
+               b'"data": "height 5 is not available, lowest height is 100"}}'
+    for size in (1, 8, 4096):
+        with pytest.raises(Exception, match='height 5 is not available'):
+            list(iter_json_items(pieces(response, size), 'result.block.data.txs', 'error'))
+    assert list(iter_json_items([response], 'result.block.data.txs')) == []
+
+
+def test_error_key_only_applies_at_the_top_level():
+    response = b'{"result": {"error": "not one", "txs": ["dHg="]}}'
+    assert list(iter_json_items([response], 'result.txs', 'error')) == ['dHg=']
+
+
+def test_async_items():
+    document = json.dumps(GENESIS).encode()
+
+    async def chunks():
+        for chunk in pieces(document, 100):
+            yield chunk
+
+    async def collect():
+        return [item async for item in async_iter_json_items(chunks(), 'app_state.bank.balances')]
+
+    assert asyncio.run(collect()) == GENESIS['app_state']['bank']['balances']
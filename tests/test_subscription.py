@@ -0,0 +1,128 @@
+# pyCosmicWrap is a Cosmos API/RPC python Wrapper
+# ChihuahuaChain - https://github.com/ChihuahuaChain/pyCosmicWrap
+#
+# License GNU General Public License v3.0
+#
+# https://choosealicense.com/licenses/gpl-3.0/
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import asyncio
+import json
+import threading
+
+import pytest
+
+from pycosmicwrap.subscription import NEW_BLOCK, AsyncSubscription, Subscription, read_event
+
+serve = pytest.importorskip('websockets.sync.server').serve
+
+ACKNOWLEDGEMENT = {'jsonrpc': '2.0', 'id': 0, 'result': {}}
+
+
+# NewBlock event message of the node.
+def new_block(height):
+    return {'jsonrpc': '2.0', 'id': 0, 'result': {'query': NEW_BLOCK, 'data': {
+        'type': 'tendermint/event/NewBlock', 'value': {'block': {'header': {'height': str(height)}}}}}}
+
+
+# websocket node sending the messages of one script per connection, in turn, then closing it.
+# the subscribe messages it received are kept in queries.
+class Node:
+    def __init__(self, *scripts):
+        self.scripts = list(scripts)
+        self.queries = []
+        self.server = serve(self.handle, 'localhost', 0)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.rpc = 'http://localhost:%d' % self.server.socket.getsockname()[1]
+
+    def handle(self, connection):
+        self.queries.append(json.loads(connection.recv())['params']['query'])
+        for message in self.scripts.pop(0) if self.scripts else []:
+            connection.send(json.dumps(message))
+
+    def close(self):
+        self.server.shutdown()
+
+
+# client of the node, its blocks are only read to backfill the missed heights.
+class Client:
+    def __init__(self, rpc):
+        self.rpc = rpc
+        self.blocks = []
+
+    def query_block(self, height):
+        self.blocks.append(height)
+        return {'result': {'block': {'header': {'height': str(height)}, 'data': {'txs': []}}}}
+
+
+class AsyncClient(Client):
+    async def query_block(self, height):
+        return super().query_block(height)
+
+
+def block_height(event):
+    return int(event['data']['value']['block']['header']['height'])
+
+
+# heights and backfilled flags of the events until the one at last.
+def heights(events, last):
+    seen = []
+    for event in events:
+        seen.append((block_height(event), event.get('backfilled', False)))
+        if seen[-1][0] == last:
+            return seen
+
+
+@pytest.fixture
+def node():
+    node = Node([ACKNOWLEDGEMENT, new_block(10), new_block(11)],
+                [ACKNOWLEDGEMENT, new_block(14), new_block(15)])
+    yield node
+    node.close()
+
+
+def test_read_event():
+    assert read_event(json.dumps(ACKNOWLEDGEMENT)) is None
+    assert read_event(json.dumps(new_block(3)))['data']['value']['block']['header']['height'] == '3'
+    with pytest.raises(Exception, match='subscription failed'):
+        read_event(json.dumps({'jsonrpc': '2.0', 'id': 0, 'error': {'code': -32603, 'message': 'too many clients'}}))
+
+
+def test_dropped_connection_is_backfilled(node):
+    client = Client(node.rpc)
+    subscription = Subscription(client, reconnect_delay=0.01)
+    assert heights(subscription, 15) == [(10, False), (11, False), (12, True), (13, True), (14, False), (15, False)]
+    assert client.blocks == [12, 13]
+    assert subscription.reconnects == 1
+    assert node.queries == [NEW_BLOCK, NEW_BLOCK]
+
+
+def test_async_dropped_connection_is_backfilled(node):
+    client = AsyncClient(node.rpc)
+    subscription = AsyncSubscription(client, reconnect_delay=0.01)
+
+    async def collect():
+        seen = []
+        async for event in subscription:
+            seen.append(event)
+            if block_height(event) == 15:
+                return seen
+
+    assert heights(asyncio.run(collect()), 15) == [(10, False), (11, False), (12, True), (13, True), (14, False),
+                                                   (15, False)]
+    assert client.blocks == [12, 13]
+
+
+def test_error_message_ends_the_subscription():
+    node = Node([{'jsonrpc': '2.0', 'id': 0, 'error': {'code': -32603, 'message': 'too many clients'}}])
+    with pytest.raises(Exception, match='too many clients'):
+        next(iter(Subscription(Client(node.rpc), reconnect_delay=0.01)))
+    node.close()
@@ -0,0 +1,124 @@
+# pyCosmicWrap is a Cosmos API/RPC python Wrapper
+# ChihuahuaChain - https://github.com/ChihuahuaChain/pyCosmicWrap
+#
+# License GNU General Public License v3.0
+#
+# https://choosealicense.com/licenses/gpl-3.0/
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import base64
+
+import pytest
+
+from pycosmicwrap.batch import BatchItem, BatchResult
+from pycosmicwrap.pinning import HeightPin
+from pycosmicwrap.tracker import StateTracker, account_address
+
+VALIDATOR = 'cosmosvaloper1sjllsnramtg3ewxqwwrwjxfgc4n4ef9u2lcnj0'
+
+
+# event of a block result, with keys and values base64 encoded as Tendermint 0.34 does when encoded.
+def event(kind, encoded=False, **attributes):
+    encode = (lambda text: base64.b64encode(text.encode()).decode()) if encoded else (lambda text: text)
+    return {'type': kind, 'attributes': [{'key': encode(key), 'value': encode(value)}
+                                         for key, value in attributes.items()]}
+
+
+# block result holding a single transaction with events.
+def block(*events):
+    return {'result': {'txs_results': [{'code': 0, 'events': list(events)}]}}
+
+
+# client answering from a few fixed balances, the addresses in failing cannot be read.
+class Client:
+    denom = 'uatom'
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+
+    def at_height(self, height=None):
+        return HeightPin(100 if height is None else height, lambda: 100)
+
+    def query_all_validators(self):
+        return []
+
+    def query_balances_many(self, addresses, concurrency=8):
+        return BatchResult(BatchItem(address, error=ValueError('timed out')) if address in self.failing
+                           else BatchItem(address, [{'denom': 'uatom', 'amount': '5'}]) for address in addresses)
+
+
+def test_account_address():
+    assert account_address(VALIDATOR) == 'cosmos1sjllsnramtg3ewxqwwrwjxfgc4n4ef9u0tvx7u'
+
+
+@pytest.mark.parametrize('amount, encoded', [('1000000', True), ('1000000uatom', False)])
+def test_create_validator_adds_the_self_delegation(amount, encoded):
+    tracker = StateTracker(Client())
+    tracker.apply(101, block(event('create_validator', encoded, validator=VALIDATOR, amount=amount)))
+    assert tracker.delegations == {(account_address(VALIDATOR), VALIDATOR): 1000000}
+
+
+def test_unreadable_balances_raise():
+    tracker = StateTracker(Client(failing=['cosmos1b']), addresses=['cosmos1a', 'cosmos1b'])
+    with pytest.raises(Exception, match='cosmos1b'):
+        tracker.start()
+    assert tracker.height is None
+    tracker = StateTracker(Client()).start()
+    tracker.client.failing.add('cosmos1b')
+    with pytest.raises(Exception, match='could not read the balances of 1 addresses'):
+        tracker.track(['cosmos1a', 'cosmos1b'])
+    assert tracker.addresses == set()
+    tracker.track(['cosmos1a'])
+    assert tracker.balances == {'cosmos1a': {'uatom': 5}}
+
+
+@pytest.mark.parametrize('response', [
+    {'jsonrpc': '2.0', 'id': -1, 'error': {'code': -32603, 'message': 'Internal error',
+                                          'data': 'height 101 must be less than or equal to the current height'}},
+    {'jsonrpc': '2.0', 'id': -1},
+])
+def test_error_responses_do_not_advance_the_height(response):
+    tracker = StateTracker(Client()).start()
+    with pytest.raises(Exception):
+        tracker.apply(101, response)
+    assert tracker.height == 100
+    tracker.apply(101, block(event('delegate', validator=VALIDATOR, delegator='cosmos1a', amount='5uatom')))
+    assert tracker.height == 101
+    assert tracker.delegations == {('cosmos1a', VALIDATOR): 5}
+
+
+# chain with a single validator whose tokens per share drop by a tenth when it is slashed at height 102.
+class SlashingClient(Client):
+    def __init__(self):
+        super().__init__()
+        self.slashed = False
+
+    def query_all_validators(self):
+        tokens = '900' if self.slashed else '1000'
+        return [{'operator_address': VALIDATOR, 'tokens': tokens, 'delegator_shares': '1000'}]
+
+    def iter_delegators(self, validator):
+        amount = '90' if self.slashed else '100'
+        return [{'delegation': {'delegator_address': 'cosmos1a', 'validator_address': validator, 'shares': '100'},
+                 'balance': {'denom': 'uatom', 'amount': amount}}]
+
+    def scan_blocks(self, start, end, **options):
+        self.slashed = True
+        return [(height, None, block(event('slash', address='cosmosvalcons1', power='1')) if height == 102
+                 else block()) for height in range(start, end + 1)]
+
+
+def test_slash_after_a_restart_refreshes_the_validator(tmp_path):
+    path = str(tmp_path / 'state.db')
+    StateTracker(SlashingClient(), path=path).start()
+    tracker = StateTracker(SlashingClient(), path=path).start()
+    assert tracker.rates
+    list(tracker.follow(102))
+    assert tracker.delegations == {('cosmos1a', VALIDATOR): 90}